@@ -1,19 +1,29 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for
 from database import Database
-from my_face_utils import FaceRecognition
+from face_service import FaceService, FaceStackDisabled
+from recognition_service import RecognitionService, RecognitionBusy, RecognitionTimeout
+from stream_tracker import FaceTracker
+from frame_cache import FrameCache, frame_hash
+from config import Config
+from cache import make_cache
+from rate_limiter import RateLimiter
+from validators import validate_student_id, validate_name, validate_email, sanitize_input
+from student_import import import_students, read_rows, detect_format
+from attendance_export import export_chunks, FORMATS as EXPORT_FORMATS
 import os
 from datetime import datetime
 import base64
-import cv2
-import numpy as np
 import sqlite3 
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import timedelta
 import time
 import logging
 from logging.handlers import RotatingFileHandler
-import re
 import shutil
+import uuid
+import hashlib
+import io
+from functools import wraps
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -54,59 +64,141 @@ def log_event(level, message, user_id=None):
     elif level == 'error':
         logger.error(log_message)
 
-def validate_student_id(student_id):
-    """Validate student ID format"""
-    return bool(re.match(r'^[A-Z0-9]{4,10}$', student_id))
-
-def validate_name(name):
-    """Validate name format"""
-    return bool(re.match(r'^[a-zA-Z\s]{2,50}$', name)) and len(name.strip()) >= 2
-
-def sanitize_input(data):
-    """Sanitize input data"""
-    if isinstance(data, str):
-        data = re.sub(r'[<>]', '', data)
-        data = re.sub(r'javascript:', '', data, flags=re.IGNORECASE)
-        return data.strip()
-    return data
+def valid_roi(roi):
+    """Check a (left, top, right, bottom) crop given as frame fractions"""
+    try:
+        left, top, right, bottom = (float(v) for v in roi)
+    except (TypeError, ValueError):
+        return False
+    return 0 <= left < right <= 1 and 0 <= top < bottom <= 1
+
+def detection_profile(params, default):
+    """Detection profile requested by the client, falling back to the route default"""
+    from detection import PROFILES  # imports cv2; only face routes get here
+    profile = params.get('profile') if params.get('profile') in PROFILES else default
+    roi = params.get('roi') or Config.DETECTION_ROI
+    if isinstance(roi, str):
+        roi = roi.split(',')
+    if roi and valid_roi(roi):
+        return PROFILES[profile].with_roi([float(v) for v in roi])
+    return profile
+
+def subject_roster(subject, section=None):
+    """(cache key, student ids) of the students enrolled in ``subject``, or None if nobody is.
+
+    The key carries the roster's data version, so the recognizer's cached
+    sub-index for it is rebuilt after every enrollment change.
+    """
+    students = db.get_roster(subject, section)
+    if not students:
+        return None
+    version, = db.data_versions(f'roster:{subject}')
+    return (subject, section, version), tuple(students)
+
+def request_params():
+    """Query args, form fields and JSON body merged into one dict"""
+    params = request.args.to_dict()
+    params.update(request.form.to_dict())
+    if request.is_json:
+        params.update(request.get_json(silent=True) or {})
+    return params
+
+class InvalidImageData(ValueError):
+    """Raised for an ``image`` field that is not a base64 string"""
+
+def request_image_bytes(params):
+    """Encoded image from a multipart upload, a raw image/* body or a base64 data URL"""
+    upload = request.files.get('image')
+    if upload:
+        return upload.read()
+    if request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+        return request.get_data(cache=False)
+    image_data = params.get('image')
+    if image_data:
+        if not isinstance(image_data, str):
+            raise InvalidImageData('image must be a base64 string')
+        try:
+            return base64.b64decode(image_data.split(',')[-1])
+        except ValueError as e:  # binascii.Error
+            raise InvalidImageData(str(e))
+    return None
+
+def conditional_json(entities, build):
+    """JSON response with an ETag from the data versions of ``entities``.
+
+    Answers 304 without calling ``build`` when the client's If-None-Match
+    still matches. The ETag also covers the path, query and session user.
+    Unsuccessful payloads are sent without an ETag.
+    """
+    versions = db.data_versions(*entities)
+    key = '|'.join(map(str, [request.full_path, session.get('user_id'), session.get('user_type'), *versions]))
+    etag = hashlib.sha1(key.encode()).hexdigest()[:24]
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        payload = build()
+        response = jsonify(payload)
+        if payload.get('success') is False:
+            return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def is_true(value):
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+def face_route(view):
+    """Route that needs the face stack; web-only workers answer 503"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not face.enabled:
+            raise FaceStackDisabled()
+        return view(*args, **kwargs)
+    return wrapper
 
 app = Flask(__name__)
 app.secret_key = 'smart-attendance-system-secret-key-2024'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)
 
-# Rate limiting storage
-request_times = {}
-
-def rate_limit(key, max_requests=10, time_window=60):
-    """Simple rate limiting implementation"""
-    current_time = time.time()
-    if key not in request_times:
-        request_times[key] = []
-    
-    # Remove old requests outside the time window
-    request_times[key] = [t for t in request_times[key] if current_time - t < time_window]
-    
-    # Check if limit exceeded
-    if len(request_times[key]) >= max_requests:
-        return False
-    
-    # Add current request
-    request_times[key].append(current_time)
-    return True
+# Rate limiting; counters are shared across gunicorn workers when CACHE_BACKEND is 'sqlite'
+rate_limiter = RateLimiter(make_cache(Config.CACHE_BACKEND, max_entries=Config.RATE_LIMIT_MAX_KEYS,
+                                      path=Config.SHARED_STATE_PATH, table='rate_limits'),
+                           Config.RATE_LIMITS)
 
 # Initialize database and face recognition
-db = Database()
-fr = FaceRecognition()
+db = Database(write_deadline=Config.DB_WRITE_DEADLINE,
+              cache=make_cache(Config.CACHE_BACKEND, max_entries=Config.CACHE_MAX_ENTRIES,
+                               default_ttl=Config.CACHE_TTL, path=Config.SHARED_STATE_PATH))
+if Config.DB_WRITER_ADDRESS:
+    db.use_writer_process(Config.DB_WRITER_ADDRESS, Config.SECRET_KEY.encode())
+elif Config.ATTENDANCE_GROUP_COMMIT:
+    db.start_group_commit(max_batch=Config.ATTENDANCE_BATCH_SIZE,
+                          max_delay=Config.ATTENDANCE_BATCH_DELAY_MS / 1000)
+# The face stack loads on first use (or on the first /readyz probe), and
+# never in web-only workers
+face = FaceService(enabled=Config.ENABLE_FACE_RECOGNITION)
+recognition = RecognitionService(workers=Config.RECOGNITION_WORKERS if face.enabled else 0,
+                                 max_queue=Config.RECOGNITION_QUEUE_SIZE,
+                                 timeout=Config.RECOGNITION_TIMEOUT,
+                                 inline_fr=face)
+frame_cache = FrameCache(threshold=Config.FRAME_DEDUP_THRESHOLD,
+                         ttl=Config.FRAME_DEDUP_TTL,
+                         max_entries=Config.FRAME_DEDUP_ENTRIES)
 
 @app.before_request
 def security_checks():
     # 1. Rate limiting logic
-    sensitive_endpoints = ['/login', '/register_face', '/mark_attendance', '/add_student']
-    if request.path in sensitive_endpoints:
-        client_ip = request.remote_addr
-        if not rate_limit(client_ip):
+    rule = request.url_rule.rule if request.url_rule else request.path
+    if rule in Config.RATE_LIMITS:
+        allowed, retry_after = rate_limiter.check(rule, {
+            'ip': request.remote_addr,
+            'user': session.get('user_id'),
+            'camera': (request.view_args or {}).get('stream_id') or request.headers.get('X-Camera-Id'),
+        })
+        if not allowed:
             log_event('warning', 'Rate limit exceeded', session.get('user_id'))
-            return jsonify({'success': False, 'message': 'Too many requests. Please try again later.'}), 429
+            response = jsonify({'success': False, 'message': 'Too many requests. Please try again later.'})
+            return response, 429, {'Retry-After': str(retry_after)}
     
     # 2. Session management logic
     session.permanent = True  # Make session permanent
@@ -115,7 +207,7 @@ def security_checks():
         return redirect('/')
     
     # 3. Request logging logic
-    if 'static' not in request.path and request.path != '/favicon.ico':
+    if 'static' not in request.path and request.path not in ('/favicon.ico', '/readyz'):
         log_event('info', f'{request.method} {request.path}', session.get('user_id'))
 
 
@@ -136,13 +228,16 @@ def student_dashboard():
     return render_template('student_dashboard_enhanced.html')  # Use the new template
 
 @app.route('/mark_attendance', methods=['POST'])
+@face_route
 def mark_attendance():
     if 'user_type' not in session or session['user_type'] != 'faculty':
         return jsonify({'success': False, 'message': 'Faculty access required'})
     
-    if request.json.get('test_mode'):
-        student_id = request.json.get('student_id')
-        subject = request.json.get('subject', 'General')
+    params = request_params()
+    
+    if is_true(params.get('test_mode')):
+        student_id = params.get('student_id')
+        subject = params.get('subject', 'General')
         
         if not student_id:
             return jsonify({'success': False, 'message': 'No student selected'})
@@ -158,37 +253,226 @@ def mark_attendance():
             'confidence': 0.95
         })
     
-    image_data = request.json.get('image')
-    subject = request.json.get('subject', 'General')
+    subject = params.get('subject', 'General')
+    image_bytes = request_image_bytes(params)
+    if not image_bytes:
+        return jsonify({'success': False, 'message': 'No image data received'})
+    
+    profile = detection_profile(params, Config.ATTENDANCE_PROFILE)
+    mode = 'classroom' if params.get('mode') == 'classroom' else 'single'
+    roster = subject_roster(subject, params.get('section') or None)
+    
+    # A retry of (nearly) the same frame that recognized nobody gets that
+    # answer back without another recognition pass. Frames that marked
+    # someone are never reused: another student standing where they stood
+    # hashes almost the same
+    frame = frame_hash(image_bytes)
+    context = (mode, subject, params.get('section'), params.get('profile'), str(params.get('roi')),
+               roster and roster[0])
+    cached = frame_cache.get(session['user_id'], context, frame)
+    if cached is not None:
+        return jsonify(dict(cached, cached=True))
+    
+    if mode == 'classroom':
+        response = mark_classroom_attendance(image_bytes, subject, profile, roster)
+    else:
+        response = mark_single_attendance(image_bytes, subject, profile, roster)
+    if response is None:
+        return jsonify({'success': False, 'message': 'Invalid image data'})
     
-    image_data = image_data.split(',')[1]
-    nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if not response.get('success'):
+        frame_cache.put(session['user_id'], context, frame, response)
+    return jsonify(response)
+
+def mark_single_attendance(image_bytes, subject, profile, roster=None):
+    """Recognize the main face in a frame and mark it"""
+    result = recognition.run('recognize', image_bytes, profile, roster, Config.RECOGNITION_CAMPUS_FALLBACK)
+    if not result['valid']:
+        return None
     
-    user_id, confidence = fr.recognize_face(img)
+    user_id, confidence = result['user_id'], result['confidence']
     confidence_threshold = 0.6
     
     if user_id and confidence > confidence_threshold:
         db.mark_attendance(user_id, subject, session['user_id'])
         student_name = db.get_student_name(user_id)
-        return jsonify({
+        return {
             'success': True,
             'message': f'Attendance marked for {student_name}',
             'student_id': user_id,
             'student_name': student_name,
             'confidence': round(confidence, 2)
-        })
+        }
     else:
-        return jsonify({'success': False, 'message': 'Face not recognized'})
+        return {'success': False, 'message': 'Face not recognized'}
+
+def mark_classroom_attendance(image_bytes, subject, profile, roster=None):
+    """Recognize every face in one classroom photo and mark them together"""
+    result = recognition.run('recognize_classroom', image_bytes, 0.6, profile, roster,
+                             Config.RECOGNITION_CAMPUS_FALLBACK)
+    if not result['valid']:
+        return None
+    
+    faces = result['faces']
+    student_ids = [face['student_id'] for face in faces if face['student_id']]
+    
+    try:
+        db.mark_attendance_bulk(student_ids, subject, session['user_id'])
+    except Exception as e:
+        log_event('error', f'Classroom attendance error: {str(e)}', session.get('user_id'))
+        return {'success': False, 'message': str(e)}
+    
+    for face in faces:
+        face['student_name'] = db.get_student_name(face['student_id']) if face['student_id'] else None
+        face['confidence'] = round(face['confidence'], 2)
+    
+    if not faces:
+        return {'success': False, 'message': 'No faces detected', 'faces': []}
+    
+    return {
+        'success': bool(student_ids),
+        'message': f'Attendance marked for {len(student_ids)} of {len(faces)} detected faces',
+        'marked_count': len(student_ids),
+        'faces': faces
+    }
+
+# Live camera streams: stream_id -> tracker state for one faculty capture
+# session. Kept in the shared SQLite state file whatever CACHE_BACKEND is,
+# so consecutive frames may land on different gunicorn workers; the state
+# expires after STREAM_IDLE_TIMEOUT without frames
+STREAM_IDLE_TIMEOUT = 300
+streams = make_cache('sqlite', path=Config.SHARED_STATE_PATH, table='streams', default_ttl=STREAM_IDLE_TIMEOUT)
+
+def owned_stream(stream_id):
+    """The stream's state if it belongs to the logged-in faculty member, else None"""
+    stream = streams.get(f'stream:{stream_id}')
+    if not stream or stream['owner'] != session.get('user_id'):
+        return None
+    return stream
+
+@app.route('/stream/start', methods=['POST'])
+@face_route
+def start_stream():
+    if 'user_type' not in session or session['user_type'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Faculty access required'})
+    
+    params = request_params()
+    stream_id = uuid.uuid4().hex
+    streams.set(f'stream:{stream_id}', {
+        'owner': session['user_id'],
+        'subject': params.get('subject', 'General'),
+        'section': params.get('section') or None,
+        'tracker': FaceTracker(profile=detection_profile(params, Config.ATTENDANCE_PROFILE),
+                               fallback=Config.RECOGNITION_CAMPUS_FALLBACK),
+    })
+    return jsonify({'success': True, 'stream_id': stream_id})
+
+@app.route('/stream/<stream_id>/frame', methods=['POST'])
+@face_route
+def stream_frame(stream_id):
+    stream = owned_stream(stream_id)
+    if stream is None:
+        return jsonify({'success': False, 'message': 'Unknown stream'}), 404
+    
+    image_bytes = request_image_bytes(request_params())
+    if not image_bytes:
+        return jsonify({'success': False, 'message': 'No image data received'})
+    
+    # A static scene (nobody at the door) needs no detection pass at all
+    frame = frame_hash(image_bytes)
+    cached = frame_cache.get('stream:' + stream_id, 'track', frame)
+    if cached is not None:
+        return jsonify(dict(cached, marked=[], encoded=0, cached=True))
+    
+    # Frames of one stream are tracked in order, by whichever worker holds
+    # the stream's lease; a client that sends faster than we process just
+    # has its extra frames skipped
+    lease = f'lock:{stream_id}'
+    if not streams.add(lease, 1, ttl=Config.RECOGNITION_TIMEOUT + Config.DB_WRITE_DEADLINE):
+        return jsonify({'success': False, 'skipped': True, 'message': 'Previous frame still processing'})
+    try:
+        # Re-read under the lease: the previous frame may have been tracked elsewhere
+        stream = owned_stream(stream_id)
+        if stream is None:
+            return jsonify({'success': False, 'message': 'Unknown stream'}), 404
+        stream['tracker'].roster = subject_roster(stream['subject'], stream['section'])
+        result = recognition.run('track_frame', image_bytes, stream['tracker'])
+        tracker = result.pop('tracker')
+        error = None
+        if result['valid'] and result['new_students']:
+            # The tracker only keeps students as marked once the rows are
+            # written, so a failed write is retried on the next frame
+            try:
+                db.mark_attendance_bulk(result['new_students'], stream['subject'], session['user_id'])
+            except Exception as e:
+                tracker.marked.difference_update(result['new_students'])
+                error = str(e)
+        if streams.get(f'stream:{stream_id}') is not None:  # not stopped meanwhile
+            streams.set(f'stream:{stream_id}', dict(stream, tracker=tracker))
+    finally:
+        streams.delete(lease)
+    
+    if not result['valid']:
+        return jsonify({'success': False, 'message': 'Invalid image data'})
+    if error:
+        log_event('error', f'Stream attendance error: {error}', session.get('user_id'))
+        return jsonify({'success': False, 'message': error, 'tracks': result['tracks'], 'marked': []})
+    
+    marked = [{'student_id': student_id, 'student_name': db.get_student_name(student_id)}
+              for student_id in result['new_students']]
+    
+    if not result['tracks']:
+        frame_cache.put('stream:' + stream_id, 'track', frame, {'success': True, 'tracks': []})
+    return jsonify({'success': True, 'tracks': result['tracks'], 'marked': marked,
+                    'encoded': result['encoded']})
+
+@app.route('/stream/<stream_id>/stop', methods=['POST'])
+def stop_stream(stream_id):
+    stream = owned_stream(stream_id)
+    if stream is None:
+        return jsonify({'success': False, 'message': 'Unknown stream'}), 404
+    streams.delete(f'stream:{stream_id}')
+    frame_cache.clear('stream:' + stream_id)
+    return jsonify({'success': True, 'stats': stream['tracker'].stats()})
+
+ATTENDANCE_PAGE_SIZE = 50
+ATTENDANCE_MAX_PAGE_SIZE = 200
 
 @app.route('/get_attendance')
 def get_attendance():
+    """A page of the student's history; filters: subject, from, to (YYYY-MM-DD), cursor, limit"""
     if 'user_type' not in session or session['user_type'] != 'student':
         return jsonify({'success': False, 'message': 'Student access required'})
     
     try:
-        attendance = db.get_student_attendance(session['user_id'])
-        return jsonify({'success': True, 'attendance': attendance})
+        limit = min(max(int(request.args.get('limit', ATTENDANCE_PAGE_SIZE)), 1), ATTENDANCE_MAX_PAGE_SIZE)
+        date_from, date_to = request.args.get('from'), request.args.get('to')
+        for value in (date_from, date_to):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+        cursor, subject = request.args.get('cursor'), request.args.get('subject')
+        user_id = session['user_id']
+        
+        def build():
+            page = db.get_student_attendance_page(user_id, limit=limit, cursor=cursor, subject=subject,
+                                                  date_from=date_from, date_to=date_to)
+            return {'success': True, 'attendance': page['records'], 'next_cursor': page['next_cursor']}
+        
+        return conditional_json([f'student:{user_id}'], build)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid parameter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/get_attendance_summary')
+def get_attendance_summary():
+    if 'user_type' not in session or session['user_type'] != 'student':
+        return jsonify({'success': False, 'message': 'Student access required'})
+    
+    try:
+        user_id = session['user_id']
+        return conditional_json([f'student:{user_id}', 'attendance'], lambda: {
+            'success': True, 'summary': db.get_student_attendance_summary(user_id)})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
@@ -202,75 +486,31 @@ def attendance_reports():
     if 'user_type' not in session or session['user_type'] != 'faculty':
         return redirect('/')
     
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT COUNT(DISTINCT student_id) FROM attendance')
-    total_students = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM attendance')
-    total_records = cursor.fetchone()[0]
-    
-    cursor.execute('''
-        SELECT subject, COUNT(*) as count 
-        FROM attendance 
-        GROUP BY subject 
-        ORDER BY count DESC
-    ''')
-    subject_stats = cursor.fetchall()
-    
-    cursor.execute('''
-        SELECT date, subject, COUNT(DISTINCT student_id) as present_count
-        FROM attendance 
-        WHERE date >= date('now', '-7 days')
-        GROUP BY date, subject
-        ORDER BY date DESC
-    ''')
-    recent_attendance = cursor.fetchall()
-    conn.close()
+    summary = db.get_report_summary()
     
     return render_template('reports.html',
-                           total_students=total_students,
-                           total_records=total_records,
-                           subject_stats=subject_stats,
-                           recent_attendance=recent_attendance)
+                           total_students=summary['total_students'],
+                           total_records=summary['total_records'],
+                           subject_stats=summary['subject_stats'],
+                           recent_attendance=summary['recent_attendance'])
 
 @app.route('/api/attendance_data')
 def api_attendance_data():
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT date, COUNT(DISTINCT student_id) as count
-        FROM attendance 
-        GROUP BY date 
-        ORDER BY date
-    ''')
-    daily_data = cursor.fetchall()
-    
-    cursor.execute('''
-        SELECT subject, COUNT(*) as count 
-        FROM attendance 
-        GROUP BY subject
-    ''')
-    subject_data = cursor.fetchall()
-    conn.close()
-    
-    return jsonify({
-        'daily': [{'date': row[0], 'count': row[1]} for row in daily_data],
-        'subjects': [{'subject': row[0], 'count': row[1]} for row in subject_data]
-    })
+    def build():
+        daily_data, subject_data = db.get_attendance_chart_data()
+        return {
+            'daily': [{'date': row[0], 'count': row[1]} for row in daily_data],
+            'subjects': [{'subject': row[0], 'count': row[1]} for row in subject_data]
+        }
+    
+    return conditional_json(['attendance'], build)
 
 @app.route('/manage_students')
 def manage_students():
     if 'user_type' not in session or session['user_type'] != 'faculty':
         return redirect('/')
     
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM students ORDER BY id')
-    students = cursor.fetchall()
-    conn.close()
+    students = db.get_all_students()
     
     return render_template('manage_students.html', students=students)
 
@@ -322,15 +562,11 @@ def change_password():
         if not user:
             return jsonify({'success': False, 'message': 'Current password is incorrect'})
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
         hashed_password = generate_password_hash(new_password)
         
         table = 'faculty' if session['user_type'] == 'faculty' else 'students'
-        cursor.execute(f'UPDATE {table} SET password = ? WHERE id = ?', (hashed_password, session['user_id']))
-        
-        conn.commit()
-        conn.close()
+        with db.write() as conn:
+            conn.execute(f'UPDATE {table} SET password = ? WHERE id = ?', (hashed_password, session['user_id']))
         
         return jsonify({'success': True, 'message': 'Password updated successfully'})
     
@@ -356,15 +592,59 @@ def internal_error(error):
 def forbidden_error(error):
     return render_template('403.html'), 403
 
+@app.errorhandler(RecognitionBusy)
+def recognition_busy_error(error):
+    response = jsonify({'success': False, 'message': 'Recognition service is busy. Please try again shortly.'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+@app.errorhandler(RecognitionTimeout)
+def recognition_timeout_error(error):
+    log_event('warning', str(error), session.get('user_id'))
+    return jsonify({'success': False, 'message': 'Recognition took too long. Please try again.'}), 504
+
+@app.errorhandler(FaceStackDisabled)
+def face_stack_disabled_error(error):
+    return jsonify({'success': False, 'message': str(error)}), 503
+
+@app.errorhandler(InvalidImageData)
+def invalid_image_error(error):
+    return jsonify({'success': False, 'message': 'Invalid image data'}), 400
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: 200 once the database answers and the face models are warm.
+
+    The first probe starts the warm-up (a dummy detect+encode, inline or on
+    every recognition worker) in the background; until it finishes the
+    probe answers 503. Web-only workers are ready without the face stack.
+    """
+    try:
+        with db.read() as conn:
+            conn.execute('SELECT 1')
+    except Exception as e:
+        return jsonify({'ready': False, 'message': f'Database unavailable: {e}'}), 503
+    if not face.enabled:
+        return jsonify({'ready': True, 'face_recognition': 'disabled'})
+    
+    state = recognition.start_warm_up(Config.ATTENDANCE_PROFILE)
+    if state != 'ready':
+        return jsonify({'ready': False, 'face_recognition': state,
+                        'error': recognition.warm_up_error}), 503, {'Retry-After': '1'}
+    return jsonify({'ready': True, 'face_recognition': state,
+                    'warm_up_seconds': round(recognition.warm_up_seconds, 3)})
+
 @app.route('/check_session')
 def check_session_status():
+    # Depends on the session only, which the ETag already covers
     if 'user_id' in session:
-        return jsonify({
+        return conditional_json([], lambda: {
             'logged_in': True,
             'user_type': session.get('user_type'),
             'user_id': session.get('user_id')
         })
-    return jsonify({'logged_in': False})
+    return conditional_json([], lambda: {'logged_in': False})
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -416,7 +696,7 @@ def add_student():
         if not name or not validate_name(name):
             return jsonify({'success': False, 'message': 'Invalid name format. Use 2-50 letters and spaces only.'})
         
-        if email and not re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email):
+        if email and not validate_email(email):
             return jsonify({'success': False, 'message': 'Invalid email format'})
         
         db.add_student(student_id, name, password, email)
@@ -428,35 +708,98 @@ def add_student():
         log_event('error', f'Add student error: {str(e)}', session.get('user_id'))
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/enrollments', methods=['GET', 'POST'])
+def enrollments():
+    """GET: a subject's roster (?subject=&section=), or every roster's size.
+    POST JSON {subject, section, student_ids, action: 'add'|'remove'}: change a roster.
+    """
+    if 'user_type' not in session or session['user_type'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Access denied'})
+    
+    if request.method == 'GET':
+        subject = request.args.get('subject')
+        if not subject:
+            return jsonify({'success': True, 'rosters': [
+                {'subject': subject, 'section': section, 'students': count}
+                for subject, section, count in db.get_enrollment_counts()]})
+        return jsonify({'success': True, 'subject': subject,
+                        'students': db.get_roster(subject, request.args.get('section'))})
+    
+    try:
+        data = request.json or {}
+        subject = sanitize_input(data.get('subject', ''))
+        section = sanitize_input(data.get('section') or '')
+        student_ids = [sanitize_input(str(student_id)) for student_id in data.get('student_ids') or []]
+        if not subject:
+            return jsonify({'success': False, 'message': 'Subject is required'}), 400
+        invalid = [student_id for student_id in student_ids if not validate_student_id(student_id)]
+        if invalid or not student_ids:
+            return jsonify({'success': False, 'message': f'Invalid Student IDs: {", ".join(invalid) or "none given"}'}), 400
+        
+        if data.get('action', 'add') == 'remove':
+            changed = db.unenroll_students(subject, student_ids, section if 'section' in data else None)
+        else:
+            changed = db.enroll_students(subject, student_ids, section)
+        log_event('info', f"Enrollment {data.get('action', 'add')}: {changed} students, {subject} {section}".rstrip(),
+                  session['user_id'])
+        return jsonify({'success': True, 'changed': changed, 'students': len(db.get_roster(subject))})
+    except Exception as e:
+        log_event('error', f'Enrollment error: {str(e)}', session.get('user_id'))
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/import_students', methods=['POST'])
+def import_students_route():
+    """Bulk add students from an uploaded CSV or JSON-lines file (or a raw request body)"""
+    if 'user_type' not in session or session['user_type'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Access denied'})
+    
+    upload = request.files.get('file')
+    if upload:
+        fmt = request.form.get('format') or detect_format(upload.filename, upload.mimetype)
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    else:
+        fmt = request.args.get('format') or detect_format('', request.mimetype)
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'success': False, 'message': f'Unknown format: {fmt}'}), 400
+    
+    try:
+        report = import_students(db, read_rows(stream, fmt), workers=Config.IMPORT_HASH_WORKERS)
+    except Exception as e:
+        log_event('error', f'Student import error: {str(e)}', session.get('user_id'))
+        return jsonify({'success': False, 'message': str(e)})
+    log_event('info', f"Imported {report['imported']} of {report['rows']} students "
+                      f"({report['rows_per_sec']} rows/sec)", session['user_id'])
+    return jsonify(dict(report, success=report['imported'] > 0 or not report['failed']))
+
 @app.route('/register_face', methods=['POST'])
+@face_route
 def register_face():
     if 'user_type' not in session:
         return jsonify({'success': False, 'message': 'Not logged in'})
     
     try:
-        image_data = request.json.get('image')
-        image_index = request.json.get('image_index', 0)
+        params = request_params()
+        image_bytes = request_image_bytes(params)
+        image_index = int(params.get('image_index', 0))
         user_id = session['user_id']
         user_name = session['name']
         
-        if not image_data:
+        if not image_bytes:
             return jsonify({'success': False, 'message': 'No image data received'})
         
         print(f"🎯 Starting face registration for {user_name} ({user_id})")
         
-        # Convert base64 to image
-        image_data = image_data.split(',')[1]
-        nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Decode, detect and encode in the recognition worker pool
+        profile = detection_profile(params, Config.REGISTRATION_PROFILE)
+        result = recognition.run('register', image_bytes, user_id, user_name, image_index, profile)
         
-        if img is None:
+        if not result['valid']:
             return jsonify({'success': False, 'message': 'Invalid image data'})
         
-        # ✅ CORRECT: Call register_face on the FaceRecognition instance (fr)
-        success = fr.register_face(img, user_id, user_name, image_index)
-        
-        if success:
-            registered_count = fr.get_user_encodings_count(user_id)
+        if result['success']:
+            db.bump_versions(f'faces:{user_id}')
+            registered_count = result['registered_count']
             return jsonify({
                 'success': True, 
                 'message': f'Face image {image_index + 1} registered successfully!',
@@ -468,42 +811,82 @@ def register_face():
                 'message': 'Face detection failed. Please ensure good lighting and clear face visibility.'
             })
             
+    except (RecognitionBusy, RecognitionTimeout, FaceStackDisabled, InvalidImageData):
+        raise
     except Exception as e:
         print(f"❌ Error in register_face route: {e}")
         return jsonify({'success': False, 'message': f'Registration error: {str(e)}'})
     
 
 @app.route('/get_face_status')
+@face_route
 def get_face_status():
     if 'user_id' not in session:
         return jsonify({'success': False, 'message': 'Not logged in'})
     
     try:
         user_id = session['user_id']
-        registered_count = fr.get_user_encodings_count(user_id)
         
-        return jsonify({
-            'success': True,
-            'registered_count': registered_count,
-            'total_images': 4,
-            'progress_percent': int((registered_count / 4) * 100),
-            'completed': registered_count >= 4
-        })
+        def build():
+            registered_count = face.get_user_encodings_count(user_id)
+            # Image numbers (1-based) that do not look like the rest; worth capturing again
+            inconsistent = sorted(int(key.rsplit('_', 1)[1]) + 1 for key in face.inconsistent_faces(user_id))
+            return {
+                'success': True,
+                'registered_count': registered_count,
+                'total_images': 4,
+                'progress_percent': int((registered_count / 4) * 100),
+                'completed': registered_count >= 4,
+                'inconsistent_images': inconsistent
+            }
+        
+        return conditional_json([f'faces:{user_id}'], build)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
 @app.route('/delete_face_data')
+@face_route
 def delete_face_data():
     if 'user_id' not in session:
         return jsonify({'success': False, 'message': 'Not logged in'})
     
     try:
         user_id = session['user_id']
-        fr.remove_user_faces(user_id)
+        face.remove_user_faces(user_id)
+        db.bump_versions(f'faces:{user_id}')
         return jsonify({'success': True, 'message': 'Face data deleted successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/export/attendance')
+def export_attendance():
+    """Stream attendance as CSV or JSON lines; filters: from, to (YYYY-MM-DD), subject, student_id"""
+    if 'user_type' not in session or session['user_type'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Access denied'})
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': f'Unknown format: {fmt}'}), 400
+    date_from, date_to = request.args.get('from'), request.args.get('to')
+    try:
+        for value in (date_from, date_to):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid parameter: {e}'}), 400
+    compress = is_true(request.args.get('gzip'))
+    
+    batches = db.iter_attendance(date_from=date_from, date_to=date_to, subject=request.args.get('subject'),
+                                 student_id=request.args.get('student_id'))
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"attendance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    if compress:
+        mimetype, filename = 'application/gzip', filename + '.gz'
+    log_event('info', f'Attendance export ({fmt}{", gzip" if compress else ""})', session['user_id'])
+    return Response(export_chunks(batches, fmt, compress), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}',
+                             'X-Accel-Buffering': 'no'})
+
 @app.route('/admin/backup')
 def backup_database():
     if 'user_type' not in session or session['user_type'] != 'faculty':
@@ -519,6 +902,17 @@ def backup_database():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/admin/recognition_stats')
+def recognition_stats():
+    if 'user_type' not in session or session['user_type'] != 'faculty':
+        return jsonify({'success': False, 'message': 'Access denied'})
+    
+    stats = dict(recognition.stats(), frame_cache=frame_cache.stats(), db_writes=db.pool.scheduler.stats(),
+                 cache=db.cache.stats(), rate_limits=rate_limiter.stats(), face=face.status())
+    if db.attendance_writer:
+        stats['attendance_writer'] = db.attendance_writer.stats()
+    return jsonify({'success': True, 'stats': stats})
+
 if __name__ == '__main__':
     # Create necessary directories on startup
     directories = ['uploads', 'static', 'templates', 'backup', 'logs']
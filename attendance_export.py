@@ -0,0 +1,44 @@
+# attendance_export.py - Streaming CSV / JSON-lines encoders for attendance exports
+import csv
+import io
+import json
+import zlib
+
+COLUMNS = ('id', 'student_id', 'student_name', 'subject', 'date', 'time', 'marked_by')
+FORMATS = {'csv': ('text/csv', 'csv'), 'jsonl': ('application/x-ndjson', 'jsonl')}
+
+
+def csv_chunks(batches):
+    """One UTF-8 CSV chunk per batch of rows, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # header of an empty export
+
+
+def jsonl_chunks(batches):
+    """One chunk of JSON lines per batch of rows"""
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(COLUMNS, row))) + '\n' for row in rows).encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(batches, fmt='csv', gzip=False):
+    """Encoded byte chunks for ``batches`` of attendance rows (see Database.iter_attendance)"""
+    chunks = csv_chunks(batches) if fmt == 'csv' else jsonl_chunks(batches)
+    return gzip_chunks(chunks) if gzip else chunks
\ No newline at end of file
@@ -0,0 +1,174 @@
+# attendance_writer.py - Group-commit queue for attendance inserts
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client
+
+
+class AttendanceWriter:
+    """Batches attendance rows from many request threads into one commit.
+
+    A background thread takes the first queued mark, then keeps
+    collecting until ``max_batch`` rows are waiting, ``max_delay``
+    seconds have passed, or no new mark has arrived for ``max_gap``
+    seconds, and writes them all with one ``executemany`` and one fsync.
+    It only lingers when the previous batch held more than one caller,
+    and never waits for a straggler longer than the last commit took, so
+    a lone mark is committed straight away.
+
+    ``submit`` returns a Future that resolves once its rows are
+    committed, so a caller that waits on it has a durable acknowledgement.
+    """
+
+    def __init__(self, db, max_batch=50, max_delay=0.02, max_gap=0.002, durable=True):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_gap = min(max_gap, max_delay)
+        self.durable = durable
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.counters = {'rows': 0, 'batches': 0, 'failed_batches': 0}
+        self._last_batch_jobs = 0
+        self._last_commit = max_gap
+
+    def _ensure_thread(self):
+        # Threads do not survive a fork: each gunicorn worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='attendance-writer', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def submit(self, rows):
+        """Queue ``(student_id, subject, date, time, marked_by)`` rows"""
+        future = Future()
+        rows = list(rows)
+        if not rows:
+            future.set_result(0)
+            return future
+        self._ensure_thread()
+        self._queue.put((rows, future))
+        return future
+
+    def _run(self, jobs):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            batch, size = [job], len(job[0])
+            linger = self._last_batch_jobs > 1
+            gap = min(self.max_gap, self._last_commit)
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while size < self.max_batch:
+                try:
+                    if not linger:
+                        job = jobs.get_nowait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        job = jobs.get(timeout=min(remaining, gap))
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+                size += len(job[0])
+            self._last_batch_jobs = len(batch)
+            started = time.monotonic()
+            self._commit(batch)
+            self._last_commit = time.monotonic() - started
+            if stopping:
+                return
+
+    def _commit(self, batch):
+        rows = [row for job_rows, _ in batch for row in job_rows]
+        try:
+            self.db.insert_attendance_rows(rows, durable=self.durable)
+        except Exception as e:
+            with self._lock:
+                self.counters['failed_batches'] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        with self._lock:
+            self.counters['rows'] += len(rows)
+            self.counters['batches'] += 1
+        for job_rows, future in batch:
+            future.set_result(len(job_rows))
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return dict(counters,
+                    avg_batch=round(counters['rows'] / counters['batches'], 1) if counters['batches'] else 0.0,
+                    queued=self._queue.qsize() if self._queue is not None else 0,
+                    max_batch=self.max_batch,
+                    max_delay_ms=self.max_delay * 1000)
+
+    def close(self):
+        """Flush queued marks and stop the writer thread"""
+        if self._pid == os.getpid() and self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self._pid = None
+
+class RemoteAttendanceWriter:
+    """AttendanceWriter stand-in that forwards rows to a db_writer.py process.
+
+    With several gunicorn workers on one database file, funnelling every
+    attendance insert through a single process removes write-lock
+    contention between them and lets all their marks share group commits.
+    Each thread keeps its own connection to the writer.
+    """
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        pid, conn = getattr(self._local, 'conn', (None, None))
+        if pid != os.getpid() or conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    def _call(self, message):
+        try:
+            conn = self._connection()
+            conn.send(message)
+            return conn.recv()
+        except (OSError, EOFError) as e:
+            self._local.conn = (None, None)
+            return 'error', f'Database writer unavailable: {e}'
+
+    def submit(self, rows):
+        future = Future()
+        status, value = self._call(('insert', list(rows)))
+        if status == 'ok':
+            future.set_result(value)
+        else:
+            future.set_exception(Exception(value))
+        return future
+
+    def stats(self):
+        status, value = self._call(('stats',))
+        return dict(value, remote=True) if status == 'ok' else {'remote': True, 'error': value}
+
+    def close(self):
+        pid, conn = getattr(self._local, 'conn', (None, None))
+        if conn is not None and pid == os.getpid():
+            conn.close()
+        self._local.conn = (None, None)
\ No newline at end of file
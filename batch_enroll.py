@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# batch_enroll.py - Offline face enrollment from a directory of ID photos
+"""
+Walks a directory laid out as <student_id>/<image>.jpg (also .jpeg and
+.png), detects and encodes one face per image in a process pool, then
+writes every encoding in one append to the encoding store and flags the
+students in one database transaction. Images with no face or more than
+one face are reported and skipped. Encodings are stored under the same
+<student_id>_<n> keys as /register_face, so re-running replaces them.
+
+Usage:
+    python batch_enroll.py photos/ [--db attendance.db] [--store face_encodings] [--pickle face_encodings.pkl]
+                           [--workers N] [--profile accurate] [--max-images 4] [--report report.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from validators import validate_student_id
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def find_images(root, max_images=4):
+    """Yield (student_id, image_index, path) for up to ``max_images`` images per student directory"""
+    for student_id in sorted(os.listdir(root)):
+        directory = os.path.join(root, student_id)
+        if not os.path.isdir(directory):
+            continue
+        names = sorted(name for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for index, name in enumerate(names[:max_images]):
+            yield student_id, index, os.path.join(directory, name)
+
+
+def encode_image(path, profile='accurate'):
+    """(error, encoding) for the single face in the image at ``path``"""
+    from detection import decode_image, detect_faces, encode_faces
+    with open(path, 'rb') as f:
+        image = decode_image(f.read(), profile)
+    if image is None:
+        return 'unreadable image', None
+    rgb_image, locations = detect_faces(image, profile)
+    if not locations:
+        return 'no face', None
+    if len(locations) > 1:
+        return f'{len(locations)} faces', None
+    return None, encode_faces(rgb_image, locations, profile)[0]
+
+
+def _encode_all(paths, workers, profile):
+    """Encode ``paths`` in order, in a pool of ``workers`` processes (0 = in this process)"""
+    if workers == 0:
+        return [encode_image(path, profile) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(encode_image, paths, [profile] * len(paths),
+                             chunksize=max(1, len(paths) // (4 * workers))))
+
+
+def enroll_directory(db, store, root, workers=None, profile='accurate', max_images=4, outlier_distance=0.45,
+                     pickle_path=None):
+    """Enroll every student image under ``root``; returns a report dict.
+
+    The store is opened the way FaceRecognition opens it, so a legacy
+    pickle (``pickle_path``, default ``<store>.pkl``) is migrated first
+    instead of being shadowed by a new store holding only this batch.
+    """
+    from face_index import robust_centroid
+    started = time.perf_counter()
+    store.open_migrating(pickle_path)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    report = {'images': 0, 'encoded': 0, 'students': 0, 'errors': [], 'inconsistent': []}
+
+    names = {row[0]: row[1] for row in db.get_all_students()}
+    jobs = []
+    for student_id, index, path in find_images(root, max_images):
+        report['images'] += 1
+        if not validate_student_id(student_id) or student_id not in names:
+            report['errors'].append({'path': path, 'student_id': student_id, 'message': 'unknown student'})
+        else:
+            jobs.append((student_id, index, path))
+
+    encode_started = time.perf_counter()
+    results = _encode_all([path for _, _, path in jobs], workers, profile)
+    encode_seconds = time.perf_counter() - encode_started
+
+    items, per_student = [], {}
+    for (student_id, index, path), (error, encoding) in zip(jobs, results):
+        if error:
+            report['errors'].append({'path': path, 'student_id': student_id, 'message': error})
+            continue
+        items.append((f'{student_id}_{index}', student_id, names[student_id], encoding))
+        per_student.setdefault(student_id, []).append((path, encoding))
+
+    for student_id, images in per_student.items():
+        if len(images) > 1:
+            _, distances = robust_centroid([encoding for _, encoding in images], outlier_distance)
+            report['inconsistent'].extend({'path': path, 'student_id': student_id, 'distance': round(float(d), 3)}
+                                          for (path, _), d in zip(images, distances) if d > outlier_distance)
+
+    store.append_many(items)
+    db.set_faces_registered(per_student)
+
+    elapsed = time.perf_counter() - started
+    report['encoded'] = len(items)
+    report['students'] = len(per_student)
+    report['errors'].sort(key=lambda error: error['path'])
+    report['failed'] = len(report['errors'])
+    report['workers'] = workers
+    report['seconds'] = round(elapsed, 3)
+    report['images_per_sec'] = round(len(jobs) / encode_seconds, 2) if encode_seconds else 0.0
+    report['images_per_sec_per_core'] = round(report['images_per_sec'] / max(1, workers), 2)
+    return report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Enroll faces from a directory of <student_id>/*.jpg photos')
+    parser.add_argument('directory', help='one sub-directory of images per student id')
+    parser.add_argument('--db', default=None, help='database file (default: Config.DATABASE_PATH)')
+    parser.add_argument('--store', default='face_encodings', help='encoding store base path')
+    parser.add_argument('--pickle', default=None,
+                        help='legacy pickle migrated into a new store first (default: <store>.pkl)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='encoding processes (default: one per CPU; 0 = this process)')
+    parser.add_argument('--profile', default='accurate', help='detection profile (see detection.PROFILES)')
+    parser.add_argument('--max-images', type=int, default=4, help='images used per student')
+    parser.add_argument('--report', help='also write the full report to this JSON file')
+    args = parser.parse_args(argv[1:])
+
+    from config import Config
+    from database import Database
+    from encoding_store import EncodingStore
+    db = Database(args.db or Config.DATABASE_PATH)
+    store = EncodingStore(args.store)
+    try:
+        report = enroll_directory(db, store, args.directory, workers=args.workers, profile=args.profile,
+                                  max_images=args.max_images, outlier_distance=Config.FACE_OUTLIER_DISTANCE,
+                                  pickle_path=args.pickle)
+    finally:
+        db.close()
+
+    for error in report['errors']:
+        print(f"❌ {error['path']}: {error['message']}")
+    for image in report['inconsistent']:
+        print(f"⚠️ {image['path']} does not match the other images of {image['student_id']}")
+    print(f"✅ Enrolled {report['encoded']} of {report['images']} images for {report['students']} students "
+          f"in {report['seconds']}s ({report['images_per_sec']} images/sec, "
+          f"{report['images_per_sec_per_core']} per core on {report['workers']} workers, {report['failed']} failed)")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
\ No newline at end of file
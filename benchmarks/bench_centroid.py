@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Two-stage centroid matching against exact search, plus outlier flagging.
+
+Synthetic identities (as in bench_index.py) get four noisy images each;
+in OUTLIER_RATE of the users one image is replaced by another identity.
+Accuracy is the fraction of probes matched to their true identity; exact
+search loses some to those swapped images, which the centroids ignore.
+"vectors" counts the encodings scored per probe: summaries in the first
+stage plus the full templates of the top-k users.
+
+Run from the project root: python benchmarks/bench_centroid.py [users ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_index import BruteForceIndex, CentroidIndex
+from gallery import FaceGallery
+
+IMAGES_PER_USER = 4
+PROBES = 500
+OUTLIER_RATE = 0.02
+SETTINGS = [(1, 0), (4, 0), (8, 0), (16, 0), (8, 2)]  # (top_k, medoids)
+
+
+def synthetic_faces(users, rng):
+    centers = rng.normal(size=(users, 128)).astype(np.float32)
+    centers *= 0.6 / np.linalg.norm(centers, axis=1, keepdims=True)
+    images = np.repeat(centers, IMAGES_PER_USER, axis=0)
+    images += rng.normal(0, 0.02, images.shape).astype(np.float32)
+    swapped = rng.choice(users, int(users * OUTLIER_RATE), replace=False)
+    for user in swapped:
+        images[user * IMAGES_PER_USER + 3] = centers[(user + 1) % users]
+    return centers, images, {f"{user}_3" for user in swapped}
+
+
+def build(index, images):
+    gallery = FaceGallery(capacity=len(images), index=index)
+    for i, encoding in enumerate(images):
+        user_id = i // IMAGES_PER_USER
+        gallery.add(f"{user_id}_{i % IMAGES_PER_USER}", user_id, encoding)
+    return gallery
+
+
+def run(gallery, probes):
+    gallery.best_match(probes[0])  # first search builds the summaries
+    start = time.perf_counter()
+    answers = np.array([gallery.best_match(probe)[0] for probe in probes])
+    return answers, (time.perf_counter() - start) / len(probes) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [2500, 12500, 50000]
+    rng = np.random.default_rng(0)
+    for users in sizes:
+        centers, images, swapped = synthetic_faces(users, rng)
+        truth = rng.integers(0, users, PROBES)
+        probes = centers[truth]
+        probes = probes + rng.normal(0, 0.02, probes.shape).astype(np.float32)
+
+        exact_gallery = build(BruteForceIndex(), images)
+        exact, exact_ms = run(exact_gallery, probes)
+        print(f"\n{users} users / {len(images)} encodings: exact accuracy {np.mean(exact == truth):.3f}, "
+              f"{exact_ms:.3f} ms/probe, {len(images)} vectors")
+        print(f"{'top_k':>6} {'medoids':>8} {'accuracy':>9} {'ms/probe':>9} {'speedup':>8} {'vectors':>8}")
+        for top_k, n_medoids in SETTINGS:
+            index = CentroidIndex(top_k=top_k, medoids=n_medoids)
+            answers, ms = run(build(index, images), probes)
+            accuracy = np.mean(answers == truth)
+            vectors = users * (1 + n_medoids) + len(index.candidates(probes[:1]))
+            print(f"{top_k:>6} {n_medoids:>8} {accuracy:>9.3f} {ms:>9.3f} {exact_ms / ms:>7.1f}x {vectors:>8}")
+
+        start = time.perf_counter()
+        flagged = {key for key, _, _ in exact_gallery.outliers()}
+        elapsed = time.perf_counter() - start
+        found = len(flagged & swapped)
+        print(f"outliers: {found}/{len(swapped)} swapped images flagged, "
+              f"{len(flagged) - found} false flags, {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
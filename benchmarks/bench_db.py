@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Per-request database overhead: a fresh connection per call versus the pool.
+
+Run from the project root: python benchmarks/bench_db.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Database
+
+ITERATIONS = 2000
+LOOKUP = 'SELECT name FROM students WHERE id = ?'
+INSERT = ('INSERT INTO attendance (student_id, subject, date, time, marked_by) '
+          'VALUES (?, ?, ?, ?, ?)')
+ROW = ('S001', 'Mathematics', '2024-01-01', '09:00:00', 'F001')
+
+
+def fresh_read(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.execute(LOOKUP, ('S001',)).fetchone()
+    conn.close()
+
+
+def fresh_write(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.execute(INSERT, ROW)
+    conn.commit()
+    conn.close()
+
+
+def pooled_read(db):
+    with db.read() as conn:
+        conn.execute(LOOKUP, ('S001',)).fetchone()
+
+
+def pooled_write(db):
+    with db.write() as conn:
+        conn.execute(INSERT, ROW)
+
+
+def timed(func, arg, iterations=ITERATIONS):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        db = Database(path)
+        # Journal mode is a property of the file: time the old pattern on
+        # the same WAL database so only connection handling differs
+        print(f"{'operation':<12} {'per-call connect':>18} {'pooled':>10} {'speedup':>9}")
+        for name, fresh, pooled in (('point read', fresh_read, pooled_read),
+                                    ('insert', fresh_write, pooled_write)):
+            before = timed(fresh, path)
+            after = timed(pooled, db)
+            print(f"{name:<12} {before:>15.1f} us {after:>7.1f} us {before / after:>8.1f}x")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Per-stage latency and match accuracy of each detection profile.
+
+Expects a directory laid out as <student_id>/*.jpg. The first image of
+each student is enrolled with the 'accurate' profile; every other image
+is then recognized once per profile.
+
+Run from the project root: python benchmarks/bench_detection.py photos/
+"""
+import os
+import sys
+from collections import defaultdict
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from detection import PROFILES, detect_and_encode
+from gallery import FaceGallery
+
+MAX_DISTANCE = 0.4  # FaceRecognition accepts confidence > 0.6
+
+
+def load_images(root):
+    images = {}
+    for student_id in sorted(os.listdir(root)):
+        folder = os.path.join(root, student_id)
+        if not os.path.isdir(folder):
+            continue
+        paths = sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                       if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+        images[student_id] = [cv2.imread(path) for path in paths]
+    return images
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    images = load_images(sys.argv[1])
+
+    gallery = FaceGallery()
+    probes = []
+    for student_id, frames in images.items():
+        if not frames:
+            continue
+        _, encodings = detect_and_encode(frames[0], 'accurate')
+        if encodings:
+            gallery.add(f"{student_id}_0", student_id, encodings[0])
+        probes.extend((student_id, frame) for frame in frames[1:])
+    print(f"Enrolled {len(gallery)} students, {len(probes)} probe images")
+
+    print(f"{'profile':>9} {'prepare ms':>11} {'detect ms':>10} {'encode ms':>10} "
+          f"{'total ms':>9} {'detected':>9} {'accuracy':>9}")
+    for name, profile in PROFILES.items():
+        totals = defaultdict(float)
+        detected = correct = 0
+        for student_id, frame in probes:
+            timings = {}
+            locations, encodings = detect_and_encode(frame, profile, timings)
+            for stage, seconds in timings.items():
+                totals[stage] += seconds
+            if encodings:
+                detected += 1
+                user_id, distance = gallery.best_match(encodings[0])
+                correct += user_id == student_id and distance < MAX_DISTANCE
+        n = max(1, len(probes))
+        stages = [totals[stage] / n * 1000 for stage in ('prepare', 'detect', 'encode')]
+        print(f"{name:>9} {stages[0]:11.1f} {stages[1]:10.1f} {stages[2]:10.1f} {sum(stages):9.1f} "
+              f"{detected / n:9.1%} {correct / n:9.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
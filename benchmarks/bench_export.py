@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Streaming attendance export throughput and memory.
+
+Builds a database with ROWS synthetic attendance rows (10M by default,
+kept in the temp dir between runs) and streams it through
+Database.iter_attendance + attendance_export in each format, discarding
+the output. Each export runs in a forked child so its peak RSS can be
+reported; MB/s is measured on the bytes produced.
+
+Run from the project root: python benchmarks/bench_export.py [rows]
+"""
+import multiprocessing
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from attendance_export import export_chunks
+from database import Database
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+CASES = [('csv', False), ('jsonl', False), ('csv', True)]
+
+
+def build(path):
+    Database(path).close()
+    conn = sqlite3.connect(path)
+    # The summary triggers are irrelevant here and would slow the bulk load down
+    for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        conn.execute(f'DROP TRIGGER {name}')
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+        INSERT INTO attendance (student_id, subject, date, time, marked_by)
+        SELECT printf('S%03d', i % 500), 'Subject ' || (i % 12), date('2020-01-01', '+' || (i / 5000) || ' days'),
+               printf('%02d:%02d:00', 8 + i % 10, i % 60), 'F001'
+        FROM n
+    ''', (ROWS,))
+    conn.commit()
+    conn.close()
+
+
+class ExistingDatabase(Database):
+    """Database over a prepared file, used as is (no migrations)"""
+
+    def init_db(self):
+        pass
+
+
+def run(path, fmt, compress, results):
+    db = ExistingDatabase(path)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    total = 0
+    t0 = time.perf_counter()
+    for chunk in export_chunks(db.iter_attendance(), fmt, compress):
+        total += len(chunk)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((total, elapsed, base_rss / 1024, (peak - base_rss) / 1024))
+
+
+def main():
+    path = os.path.join(tempfile.gettempdir(), f'bench_export_{ROWS}.db')
+    if not os.path.exists(path):
+        print(f"Building {ROWS:,} rows in {path} ...")
+        t0 = time.perf_counter()
+        build(path)
+        print(f"  built in {time.perf_counter() - t0:.0f}s")
+
+    ctx = multiprocessing.get_context('fork')
+    print(f"{'format':<10} {'MB out':>8} {'seconds':>8} {'MB/s':>7} {'rows/s':>10} {'RSS MB':>7} {'peak +MB':>9}")
+    for fmt, compress in CASES:
+        results = ctx.Queue()
+        process = ctx.Process(target=run, args=(path, fmt, compress, results))
+        process.start()
+        total, elapsed, rss, growth = results.get()
+        process.join()
+        name = fmt + ('.gz' if compress else '')
+        print(f"{name:<10} {total / 1e6:>8.0f} {elapsed:>8.1f} {total / 1e6 / elapsed:>7.1f} "
+              f"{ROWS / elapsed:>10,.0f} {rss:>7.0f} {growth:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
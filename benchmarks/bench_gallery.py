@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Latency of FaceGallery matching versus the old per-encoding loop.
+
+Run from the project root: python benchmarks/bench_gallery.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gallery import FaceGallery
+
+SIZES = [100, 1000, 10000, 100000]
+IMAGES_PER_USER = 4
+PROBES = 50
+LOOP_LIMIT = 10000  # the Python loop is too slow to time beyond this
+
+
+def synthetic_gallery(n, rng):
+    encodings = rng.normal(0, 0.1, size=(n, 128)).astype(np.float32)
+    gallery = FaceGallery(capacity=n)
+    for i, encoding in enumerate(encodings):
+        user_id = f"S{i // IMAGES_PER_USER:06d}"
+        gallery.add(f"{user_id}_{i % IMAGES_PER_USER}", user_id, encoding)
+    return gallery, encodings
+
+
+def loop_match(encodings, probe):
+    """Equivalent of the previous face_recognition.face_distance loop"""
+    best_row, best_distance = None, 1.0
+    for row, known in enumerate(encodings):
+        distance = np.linalg.norm(np.array([known]) - probe, axis=1)[0]
+        if distance < best_distance:
+            best_row, best_distance = row, distance
+    return best_row, best_distance
+
+
+def timed(fn, probes):
+    start = time.perf_counter()
+    for probe in probes:
+        fn(probe)
+    return (time.perf_counter() - start) / len(probes) * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'encodings':>10} {'gallery ms':>11} {'per-user ms':>12} {'loop ms':>9} {'speedup':>8}")
+    for n in SIZES:
+        gallery, encodings = synthetic_gallery(n, rng)
+        probes = encodings[rng.integers(0, n, PROBES)] + rng.normal(0, 0.01, (PROBES, 128)).astype(np.float32)
+
+        best_ms = timed(gallery.best_match, probes)
+        per_user_ms = timed(gallery.best_per_user, probes)
+        if n <= LOOP_LIMIT:
+            loop_ms = timed(lambda p: loop_match(encodings, p), probes[:5])
+            loop_text, speedup = f"{loop_ms:9.2f}", f"{loop_ms / best_ms:7.0f}x"
+        else:
+            loop_text, speedup = f"{'-':>9}", f"{'-':>8}"
+        print(f"{n:>10} {best_ms:11.3f} {per_user_ms:12.3f} {loop_text} {speedup}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
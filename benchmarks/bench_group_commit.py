@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Attendance inserts/sec: one commit per mark versus group commit.
+
+Simulates a class change: many request threads marking attendance at
+once. Both modes fsync every commit (synchronous=FULL), so the difference
+is how many marks share each fsync.
+
+Run from the project root: python benchmarks/bench_group_commit.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Database
+
+THREADS = [1, 8, 32, 128]
+MARKS = 2000
+
+
+def load(db, threads, marks, mark):
+    per_thread = marks // threads
+
+    def worker(t):
+        for i in range(per_thread):
+            mark(db, f'S{t:03d}{i:05d}')
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def single_commit(db, student_id):
+    db.insert_attendance_rows([(student_id, 'Bench', '2024-01-01', '09:00:00', 'F001')], durable=True)
+
+
+def group_commit(db, student_id):
+    db.mark_attendance(student_id, 'Bench', 'F001')
+
+
+def main():
+    print(f"{'threads':>7} {'single-row commits':>20} {'group commit':>14} {'avg batch':>10}")
+    for threads in THREADS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, 'single.db'))
+            single = load(db, threads, MARKS, single_commit)
+            db.close()
+
+            db = Database(os.path.join(tmp, 'group.db'))
+            writer = db.start_group_commit(max_batch=50, max_delay=0.02)
+            grouped = load(db, threads, MARKS, group_commit)
+            avg_batch = writer.stats()['avg_batch']
+            db.close()
+        print(f"{threads:>7} {single:>14.0f} rows/s {grouped:>8.0f} rows/s {avg_batch:>10}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
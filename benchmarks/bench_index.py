@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Recall and latency of the IVF face index against exact search.
+
+Synthetic identities are drawn on a sphere with four noisy images each,
+roughly like real 128-d face encodings. Recall is the fraction of probes
+whose best user matches the exact brute-force answer.
+
+Run from the project root: python benchmarks/bench_index.py [users ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_index import BruteForceIndex, IVFIndex
+from gallery import FaceGallery
+
+IMAGES_PER_USER = 4
+PROBES = 200
+NPROBES = [1, 2, 4, 8, 16, 32]
+
+
+def synthetic_faces(users, rng):
+    centers = rng.normal(size=(users, 128)).astype(np.float32)
+    centers *= 0.6 / np.linalg.norm(centers, axis=1, keepdims=True)
+    images = np.repeat(centers, IMAGES_PER_USER, axis=0)
+    images += rng.normal(0, 0.02, images.shape).astype(np.float32)
+    return centers, images
+
+
+def build(index, images):
+    gallery = FaceGallery(capacity=len(images), index=index)
+    for i, encoding in enumerate(images):
+        user_id = i // IMAGES_PER_USER
+        gallery.add(f"{user_id}_{i % IMAGES_PER_USER}", user_id, encoding)
+    return gallery
+
+
+def run(gallery, probes):
+    start = time.perf_counter()
+    answers = [gallery.best_match(probe)[0] for probe in probes]
+    return answers, (time.perf_counter() - start) / len(probes) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [2500, 12500, 50000]
+    rng = np.random.default_rng(0)
+    for users in sizes:
+        centers, images = synthetic_faces(users, rng)
+        probes = centers[rng.integers(0, users, PROBES)]
+        probes = probes + rng.normal(0, 0.02, probes.shape).astype(np.float32)
+
+        exact, exact_ms = run(build(BruteForceIndex(), images), probes)
+        print(f"\n{users} users / {len(images)} encodings: exact {exact_ms:.3f} ms/probe")
+        print(f"{'nprobe':>7} {'recall@1':>9} {'ms/probe':>9} {'speedup':>8}")
+
+        index = IVFIndex(nprobe=1)
+        gallery = build(index, images)
+        start = time.perf_counter()
+        index.train()
+        print(f"  (trained {len(index.centroids)} lists in {time.perf_counter() - start:.2f}s)")
+        for nprobe in NPROBES:
+            index.nprobe = nprobe
+            answers, ms = run(gallery, probes)
+            recall = np.mean([a == b for a, b in zip(answers, exact)])
+            print(f"{nprobe:>7} {recall:9.3f} {ms:9.3f} {exact_ms / ms:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Rate-limit checks across a million distinct client keys.
+
+Simulates scanning traffic: KEYS distinct IPs each send one request to
+/login, then the first REPEAT IPs send again. Compares the old per-key
+timestamp lists (which never forget a key) with RateLimiter on the
+in-process LRU store capped at RATE_LIMIT_MAX_KEYS. Each run happens in
+a forked child so its peak RSS can be reported.
+
+Run from the project root: python benchmarks/bench_rate_limit.py
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache import LRUCache
+from config import Config
+from rate_limiter import RateLimiter
+
+KEYS = 1_000_000
+REPEAT = 100_000
+
+
+def legacy(keys):
+    request_times = {}
+
+    def rate_limit(key, max_requests=10, time_window=60):
+        current_time = time.time()
+        if key not in request_times:
+            request_times[key] = []
+        request_times[key] = [t for t in request_times[key] if current_time - t < time_window]
+        if len(request_times[key]) >= max_requests:
+            return False
+        request_times[key].append(current_time)
+        return True
+
+    for key in keys:
+        rate_limit(key)
+    return len(request_times), rate_limit
+
+
+def sliding(keys):
+    store = LRUCache(max_entries=Config.RATE_LIMIT_MAX_KEYS)
+    limiter = RateLimiter(store, {'/login': {'ip': (10, 60)}})
+    for key in keys:
+        limiter.check('/login', {'ip': key})
+    return store.stats()['entries'], lambda key: limiter.check('/login', {'ip': key})[0]
+
+
+def run(name, results):
+    keys = [f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}' for i in range(KEYS)]
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    kept, check = {'legacy': legacy, 'sliding': sliding}[name](keys)
+    elapsed = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for key in keys[:REPEAT]:
+        check(key)
+    hot = time.perf_counter() - t0
+    rss_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss) / 1024
+    results.put((kept, elapsed / KEYS * 1e6, hot / REPEAT * 1e6, rss_mb))
+
+
+def main():
+    ctx = multiprocessing.get_context('fork')
+    print(f"{KEYS:,} distinct keys, store capped at {Config.RATE_LIMIT_MAX_KEYS:,} keys")
+    print(f"{'limiter':<8} {'keys kept':>10} {'us/check':>9} {'repeat us':>10} {'peak +MB':>9}")
+    for name in ('legacy', 'sliding'):
+        results = ctx.Queue()
+        process = ctx.Process(target=run, args=(name, results))
+        process.start()
+        kept, per_check, per_repeat, rss_mb = results.get()
+        process.join()
+        print(f"{name:<8} {kept:>10,} {per_check:>9.2f} {per_repeat:>10.2f} {rss_mb:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""/reports and /api/attendance_data query latency as attendance grows.
+
+Compares the original full-table aggregations with reads from the
+summary tables maintained by summaries.py.
+
+Run from the project root: python benchmarks/bench_reports.py
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import summaries
+from database import Database
+
+SIZES = [10000, 100000, 1000000]
+STUDENTS = 2000
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'Computer Science', 'Biology', 'English']
+REPEAT = 5
+
+LEGACY_QUERIES = (
+    'SELECT COUNT(DISTINCT student_id) FROM attendance',
+    'SELECT COUNT(*) FROM attendance',
+    'SELECT subject, COUNT(*) as count FROM attendance GROUP BY subject ORDER BY count DESC',
+    '''SELECT date, subject, COUNT(DISTINCT student_id) as present_count FROM attendance
+       WHERE date >= date('now', '-7 days') GROUP BY date, subject ORDER BY date DESC''',
+    'SELECT date, COUNT(DISTINCT student_id) as count FROM attendance GROUP BY date ORDER BY date',
+    'SELECT subject, COUNT(*) as count FROM attendance GROUP BY subject',
+)
+
+
+class ExistingDatabase(Database):
+    """Database over a prepared file, used as is (no migrations)"""
+
+    def init_db(self):
+        pass
+
+
+def build(path, size):
+    rng = random.Random(0)
+    today = date.today()
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE attendance (id INTEGER PRIMARY KEY AUTOINCREMENT, student_id TEXT,
+                    subject TEXT, date TEXT, time TEXT, marked_by TEXT)''')
+    conn.executemany('INSERT INTO attendance (student_id, subject, date, time, marked_by) VALUES (?, ?, ?, ?, ?)',
+                     ((f'S{rng.randrange(STUDENTS):05d}', rng.choice(SUBJECTS),
+                       (today - timedelta(days=rng.randrange(365))).isoformat(), '09:00:00', 'F001')
+                      for _ in range(size)))
+    for column in ('student_id', 'date', 'subject'):
+        conn.execute(f'CREATE INDEX idx_attendance_{column} ON attendance({column})')
+    start = time.perf_counter()
+    summaries.install(conn)
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - start
+
+
+def best_of(func):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print(f"{'rows':>9} {'legacy ms':>10} {'summary ms':>11} {'rebuild s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, f'reports-{size}.db')
+            rebuild = build(path, size)
+            db = ExistingDatabase(path)
+
+            def legacy():
+                with db.read() as conn:
+                    for query in LEGACY_QUERIES:
+                        conn.execute(query).fetchall()
+
+            def summary():
+                db.get_report_summary()
+                db.get_attendance_chart_data()
+
+            print(f"{size:>9} {best_of(legacy):>10.2f} {best_of(summary):>11.2f} {rebuild:>10.2f}")
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
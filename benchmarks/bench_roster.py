@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Matching against a class roster's sub-index versus the whole campus.
+
+Synthetic identities as in bench_index.py, four images each. Student
+probes are enrolled in the class; look-alike probes are people who are
+not in the gallery at all but sit just inside the match threshold of
+some enrolled student, which is how false accepts happen. "accepted" is
+the fraction of look-alikes wrongly matched to somebody.
+
+Run from the project root: python benchmarks/bench_roster.py [users ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_index import BruteForceIndex, CentroidIndex
+from gallery import FaceGallery
+
+IMAGES_PER_USER = 4
+ROSTER = 60
+PROBES = 500
+MAX_DISTANCE = 0.4
+
+
+def synthetic_gallery(users, rng, index):
+    centers = rng.normal(size=(users, 128)).astype(np.float32)
+    centers *= 0.6 / np.linalg.norm(centers, axis=1, keepdims=True)
+    gallery = FaceGallery(capacity=users * IMAGES_PER_USER, index=index)
+    for user, center in enumerate(centers):
+        for i in range(IMAGES_PER_USER):
+            gallery.add(f"{user}_{i}", user, center + rng.normal(0, 0.02, 128).astype(np.float32))
+    return centers, gallery
+
+
+def look_alikes(centers, rng):
+    """Unknown faces about 0.35 from a random enrolled student"""
+    offsets = rng.normal(size=(PROBES, 128)).astype(np.float32)
+    offsets *= 0.35 / np.linalg.norm(offsets, axis=1, keepdims=True)
+    return centers[rng.integers(0, len(centers), PROBES)] + offsets
+
+
+def timed(func, probes):
+    start = time.perf_counter()
+    answers = [func(probe) for probe in probes]
+    return answers, (time.perf_counter() - start) / len(probes) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [2500, 12500, 50000]
+    rng = np.random.default_rng(0)
+    print(f"{'users':>6} {'index':>9} {'scope':>7} {'ms/probe':>9} {'correct':>8} {'accepted':>9}")
+    for users in sizes:
+        for index in (BruteForceIndex(), CentroidIndex()):
+            centers, gallery = synthetic_gallery(users, rng, index)
+            roster = rng.choice(users, ROSTER, replace=False)
+            truth = roster[rng.integers(0, ROSTER, PROBES)]
+            students = centers[truth] + rng.normal(0, 0.02, (PROBES, 128)).astype(np.float32)
+            impostors = look_alikes(centers, rng)
+
+            start = time.perf_counter()
+            rows = gallery.roster_rows(('class', 1), roster.tolist())
+            build_ms = (time.perf_counter() - start) * 1000
+            gallery.best_match(students[0])  # let the index build its summaries
+
+            for scope, search in (('campus', lambda p: gallery.best_match(p)),
+                                  ('roster', lambda p: gallery.best_match(p, rows))):
+                answers, ms = timed(search, students)
+                correct = np.mean([user == expected for (user, _), expected in zip(answers, truth)])
+                accepted = np.mean([distance < MAX_DISTANCE for _, distance in map(search, impostors)])
+                print(f"{users:>6} {index.name:>9} {scope:>7} {ms:>9.3f} {correct:>8.3f} {accepted:>9.3f}")
+        print(f"{'':>6} roster sub-index of {ROSTER} students built in {build_ms:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Rate limiting and caching across several processes, per backend.
+
+Each process sends REQUESTS rate-limited requests for one shared client
+key with a limit of LIMIT per window, then reads and writes cache keys.
+With the per-process 'memory' backend every worker enforces its own
+limit, so the client gets up to processes x LIMIT requests through; the
+'sqlite' backend should let exactly LIMIT through.
+
+Run from the project root: python benchmarks/bench_shared_state.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache import make_cache
+
+PROCESSES = [1, 4, 8]
+REQUESTS = 2000
+LIMIT = 1000
+CACHE_OPS = 2000
+
+
+def worker(kind, path, ready, results):
+    limits = make_cache(kind, path=path, table='rate_limits')
+    cache = make_cache(kind, path=path)
+    ready.wait()
+
+    t0 = time.perf_counter()
+    allowed = sum(limits.incr('rl:10.0.0.1:0', ttl=60) <= LIMIT for _ in range(REQUESTS))
+    incr_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(CACHE_OPS):
+        key = ('student', i % 100)
+        if cache.get(key) is None:
+            cache.set(key, {'name': f'Student {i % 100}'}, tags=[f'student:{i % 100}'])
+    cache_s = time.perf_counter() - t0
+    results.put((allowed, incr_s, cache_s, cache.stats()['hits']))
+
+
+def run(kind, processes, tmp):
+    path = os.path.join(tmp, f'{kind}-{processes}.db')
+    ctx = multiprocessing.get_context('fork')
+    ready, results = ctx.Barrier(processes), ctx.Queue()
+    workers = [ctx.Process(target=worker, args=(kind, path, ready, results)) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    parts = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    allowed = sum(p[0] for p in parts)
+    incr_rate = processes * REQUESTS / max(p[1] for p in parts)
+    cache_rate = processes * CACHE_OPS / max(p[2] for p in parts)
+    hit_rate = sum(p[3] for p in parts) / (processes * CACHE_OPS)
+    return allowed, incr_rate, cache_rate, hit_rate
+
+
+def main():
+    print(f"{'backend':<8} {'procs':>5} {'allowed':>8} {'expected':>8} {'incr/s':>9} {'cache ops/s':>12} {'hit rate':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in PROCESSES:
+            for kind in ('memory', 'sqlite'):
+                allowed, incr_rate, cache_rate, hit_rate = run(kind, processes, tmp)
+                print(f"{kind:<8} {processes:>5} {allowed:>8} {LIMIT:>8} {incr_rate:>9.0f} "
+                      f"{cache_rate:>12.0f} {hit_rate:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Import time and memory of app.py per face stack mode.
+
+Each mode runs in a fresh interpreter (RECOGNITION_WORKERS=0, so
+everything stays in that one process) in a temporary working directory:
+
+  web-only  ENABLE_FACE_RECOGNITION=false; the face stack is never imported
+  lazy      face routes enabled, nothing loaded until the first face request
+  loaded    FaceRecognition built, as every worker used to do at import
+  warmed    after the /readyz warm-up (dummy detect+encode)
+
+Run from the project root: python benchmarks/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEAT = 3
+
+PROBE = '''
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import app
+imported = time.perf_counter() - started
+if sys.argv[2] == 'loaded':
+    app.face.get()
+elif sys.argv[2] == 'warmed':
+    app.recognition.warm_up()
+ready = time.perf_counter() - started
+with open('/proc/self/statm') as f:
+    rss = int(f.read().split()[1]) * resource.getpagesize()
+print(json.dumps({'import': imported, 'ready': ready, 'rss': rss / 2 ** 20,
+                  'modules': [m for m in ('numpy', 'cv2', 'face_recognition') if m in sys.modules]}))
+'''
+
+MODES = [
+    ('web-only', 'false'),
+    ('lazy', 'true'),
+    ('loaded', 'true'),
+    ('warmed', 'true'),
+]
+
+
+def probe(mode, enabled, tmp):
+    env = dict(os.environ, ENABLE_FACE_RECOGNITION=enabled, RECOGNITION_WORKERS='0')
+    output = subprocess.run([sys.executable, '-c', PROBE, ROOT, mode], cwd=tmp, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'mode':<9} {'import s':>9} {'ready s':>8} {'RSS MB':>7}  modules")
+    with tempfile.TemporaryDirectory() as tmp:
+        probe('web-only', 'false', tmp)  # create and migrate the database first
+        for mode, enabled in MODES:
+            runs = [probe(mode, enabled, tmp) for _ in range(REPEAT)]
+            print(f"{mode:<9} {statistics.median(r['import'] for r in runs):>9.3f} "
+                  f"{statistics.median(r['ready'] for r in runs):>8.3f} "
+                  f"{statistics.median(r['rss'] for r in runs):>7.1f}  {', '.join(runs[-1]['modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Onboarding throughput: one add_student call per row vs student_import.
+
+Generates STUDENTS CSV rows and imports them into a fresh database
+either one Database.add_student call at a time (what /add_student does)
+or through import_students with a process pool for password hashing.
+
+Run from the project root: python benchmarks/bench_student_import.py [students]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Database
+from student_import import import_students, read_rows
+
+STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def make_csv(count):
+    lines = ['student_id,name,password,email']
+    lines += [f'B{i:06d},Student {"abcdefghij"[i % 10]}x,pw{i},b{i}@university.edu' for i in range(count)]
+    return '\n'.join(lines) + '\n'
+
+
+def one_by_one(db, data):
+    rows = list(read_rows(io.StringIO(data), 'csv'))
+    for _, row, _ in rows:
+        db.add_student(row['student_id'], row['name'], row['password'], row['email'])
+    return len(rows)
+
+
+def main():
+    data = make_csv(STUDENTS)
+    print(f"{STUDENTS} students, {os.cpu_count()} CPUs")
+    print(f"{'method':<18} {'seconds':>8} {'rows/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'single.db'))
+        t0 = time.perf_counter()
+        count = one_by_one(db, data)
+        elapsed = time.perf_counter() - t0
+        db.close()
+        print(f"{'add_student':<18} {elapsed:>8.2f} {count / elapsed:>8.1f}")
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            db = Database(os.path.join(tmp, f'bulk-{workers}.db'))
+            report = import_students(db, read_rows(io.StringIO(data), 'csv'), workers=workers)
+            db.close()
+            assert report['imported'] == STUDENTS, report['errors'][:5]
+            print(f"{'import x' + str(workers):<18} {report['seconds']:>8.2f} {report['rows_per_sec']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Write latency with several processes marking attendance in one database.
+
+Reproduces gunicorn workers contending for SQLite's write lock. Each
+process marks MARKS students one at a time; per-mark latency is reported
+for three setups:
+
+  legacy     connection per call, deferred transactions and the old
+             retry_on_locked (three tries with a fixed 1 s sleep)
+  scheduled  pooled writer, BEGIN IMMEDIATE with jittered backoff
+  writer     marks forwarded to one db_writer.py process (group commit)
+
+Run from the project root: python benchmarks/bench_write_contention.py
+"""
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Database
+from db_writer import WriterServer
+
+PROCESSES = [2, 8, 16]
+MARKS = 200
+AUTHKEY = b'bench'
+INSERT = ('INSERT INTO attendance (student_id, subject, date, time, marked_by) '
+          'VALUES (?, ?, ?, ?, ?)')
+
+
+def legacy_mark(path, row, max_retries=3, delay=1):
+    def attempt():
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        try:
+            conn.execute(INSERT, row)
+            conn.commit()
+        finally:
+            conn.close()
+
+    for i in range(max_retries):
+        try:
+            return attempt()
+        except sqlite3.OperationalError as e:
+            if "database is locked" in str(e) and i < max_retries - 1:
+                time.sleep(delay)
+            else:
+                raise
+    return attempt()
+
+
+def worker(mode, path, address, ready, results):
+    if mode == 'scheduled':
+        db = Database(path)
+    elif mode == 'writer':
+        db = Database(path)
+        db.use_writer_process(address, AUTHKEY)
+    ready.wait()
+    latencies, errors = [], 0
+    for i in range(MARKS):
+        row = (f'S{os.getpid()}{i:04d}', 'Bench', '2024-01-01', '09:00:00', 'F001')
+        t0 = time.perf_counter()
+        try:
+            if mode == 'legacy':
+                legacy_mark(path, row)
+            else:
+                db.mark_attendance_bulk([row[0]], 'Bench', 'F001')
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+    results.put((latencies, errors))
+
+
+def serve(path, address):
+    WriterServer(Database(path), address, AUTHKEY).serve_forever()
+
+
+def run(mode, processes, tmp):
+    path = os.path.join(tmp, f'{mode}-{processes}.db')
+    address = os.path.join(tmp, f'{mode}-{processes}.sock')
+    Database(path).close()
+    if mode == 'legacy':
+        # The old code never switched the file to WAL
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.close()
+
+    ctx = multiprocessing.get_context('fork')
+    server = None
+    if mode == 'writer':
+        server = ctx.Process(target=serve, args=(path, address), daemon=True)
+        server.start()
+        while not os.path.exists(address):
+            time.sleep(0.01)
+
+    # Only start the clock once every worker has opened its Database
+    ready, results = ctx.Barrier(processes + 1), ctx.Queue()
+    workers = [ctx.Process(target=worker, args=(mode, path, address, ready, results))
+               for _ in range(processes)]
+    for process in workers:
+        process.start()
+    ready.wait()
+    began = time.perf_counter()
+    latencies, errors = [], 0
+    for _ in workers:
+        part, part_errors = results.get()
+        latencies += part
+        errors += part_errors
+    elapsed = time.perf_counter() - began
+    for process in workers:
+        process.join()
+    if server is not None:
+        server.terminate()
+
+    latencies.sort()
+
+    def ms(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return len(latencies) / elapsed, ms(0.5), ms(0.99), ms(1.0), errors
+
+
+def main():
+    print(f"{'mode':<10} {'procs':>5} {'marks/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in PROCESSES:
+            for mode in ('legacy', 'scheduled', 'writer'):
+                rate, p50, p99, worst, errors = run(mode, processes, tmp)
+                print(f"{mode:<10} {processes:>5} {rate:>9.0f} {p50:>8.2f} {p99:>8.2f} {worst:>9.2f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,40 +1,217 @@
+import heapq
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from functools import wraps
 
-class SimpleCache:
-    def __init__(self):
-        self.cache = {}
-    
-    def get(self, key):
-        if key in self.cache:
-            data, expiry = self.cache[key]
-            if time.time() < expiry:
-                return data
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per-entry TTL and tag invalidation.
+
+    Holds at most ``max_entries`` items, evicting the least recently used.
+    Expired entries are dropped on read and swept from an expiry heap on
+    write. ``None`` is a cacheable value, so "no such row" answers can be
+    cached too (usually with a shorter ``negative_ttl``).
+
+    Entries can carry tags; ``invalidate(tag)`` drops every entry with
+    that tag. ``get_or_compute`` lets one caller compute a missing value
+    while concurrent callers for the same key wait for it, and does not
+    store a value whose tags were invalidated while it was computing.
+    """
+
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()   # key -> (value, expires_at, tags)
+        self._tags = {}                 # tag -> set of keys
+        self._generations = {}          # tag -> invalidation count
+        self._expiry = []               # heap of (expires_at, key)
+        self._inflight = {}             # key -> Future of the computing caller
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[1] <= now:
+            self._remove(key)
+            self.expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, tags=()):
+        with self._lock:
+            self._store(key, value, ttl, tuple(tags))
+
+    def _store(self, key, value, ttl, tags):
+        now = time.monotonic()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        heapq.heappush(self._expiry, (expires_at, key))
+
+        while self._expiry and self._expiry[0][0] <= now:
+            expired_at, expired_key = heapq.heappop(self._expiry)
+            entry = self._entries.get(expired_key)
+            if entry is not None and entry[1] == expired_at:
+                self._remove(expired_key)
+                self.expirations += 1
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        if len(self._expiry) > 2 * self.max_entries + 64:
+            # Drop heap records of entries that were overwritten or evicted
+            self._expiry = [(at, k) for at, k in self._expiry
+                            if k in self._entries and self._entries[k][1] == at]
+            heapq.heapify(self._expiry)
+
+    def add(self, key, value, ttl=None, tags=()):
+        """Store ``value`` only if ``key`` is absent; True if it was stored"""
+        with self._lock:
+            if self._lookup(key, time.monotonic()) is not _MISSING:
+                return False
+            self._store(key, value, ttl, tuple(tags))
+            return True
+
+    def incr(self, key, amount=1, ttl=None):
+        """Add ``amount`` to a counter, starting it at 0 with ``ttl`` if absent"""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                self._store(key, amount, ttl, ())
+                return amount
+            value = entry[0] + amount
+            self._entries[key] = (value, entry[1], entry[2])
+            self._entries.move_to_end(key)
+            return value
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate(self, *tags):
+        """Drop every entry tagged with any of ``tags``"""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            for tag in self._tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            self._entries.clear()
+            self._tags.clear()
+            self._expiry = []
+
+    def get_or_compute(self, key, compute, ttl=None, tags=(), negative_ttl=None):
+        """Cached value for ``key``, calling ``compute()`` at most once per miss.
+
+        ``negative_ttl`` (if given) is used instead of ``ttl`` when
+        ``compute`` returns None.
+        """
+        tags = tuple(tags)
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                generations = [self._generations.get(tag, 0) for tag in tags]
+                owner = True
             else:
-                del self.cache[key]
-        return None
-    
-    def set(self, key, data, ttl=300):  # 5 minutes default
-        self.cache[key] = (data, time.time() + ttl)
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            if generations == [self._generations.get(tag, 0) for tag in tags]:
+                self._store(key, value, negative_ttl if value is None and negative_ttl is not None else ttl,
+                            tags)
+        pending.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                    'evictions': self.evictions, 'expirations': self.expirations,
+                    'invalidations': self.invalidations, 'computing': len(self._inflight)}
+
+
+def make_cache(kind='memory', max_entries=1024, default_ttl=300, path='shared_state.db', table='cache'):
+    """Build the cache backend named in ``Config.CACHE_BACKEND``.
+
+    'memory' is per process; 'sqlite' is shared by every process that
+    opens the same ``path`` (see shared_cache.py).
+    """
+    if kind == 'memory':
+        return LRUCache(max_entries=max_entries, default_ttl=default_ttl)
+    if kind == 'sqlite':
+        from shared_cache import SQLiteCache
+        return SQLiteCache(path, table=table, default_ttl=default_ttl)
+    raise ValueError(f"Unknown cache backend '{kind}'")
+
 
 # Global cache instance
-cache = SimpleCache()
+cache = LRUCache()
+
 
-def cached(ttl=300):
+def cached(ttl=300, tags=(), negative_ttl=None):
+    """Memoize a function in the global cache, keyed on its arguments"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
+            cache_key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            return cache.get_or_compute(cache_key, lambda: func(*args, **kwargs), ttl=ttl, tags=tags,
+                                        negative_ttl=negative_ttl)
         return wrapper
     return decorator
\ No newline at end of file
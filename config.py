@@ -14,10 +14,76 @@ class Config:
     # Rate Limiting
     RATE_LIMIT_REQUESTS = int(os.environ.get('RATE_LIMIT', 5))
     RATE_LIMIT_WINDOW = int(os.environ.get('RATE_LIMIT_WINDOW', 60))
+    # Per endpoint: principal ('ip', 'user' or 'camera') -> (max requests, window seconds)
+    RATE_LIMITS = {
+        '/login': {'ip': (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)},
+        '/register_face': {'user': (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)},
+        '/mark_attendance': {'user': (6 * RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW),
+                             'ip': (12 * RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)},
+        '/add_student': {'user': (6 * RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)},
+        '/import_students': {'user': (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)},
+        '/export/attendance': {'user': (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)},
+        '/stream/<stream_id>/frame': {'camera': (600, 60)},
+    }
+    # Most counters kept by the in-process backend; the least recently used go first
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))
     
     # Features
+    # false = web-only worker: face routes answer 503 and face_recognition,
+    # dlib, cv2 and numpy are never imported (route face paths elsewhere)
     ENABLE_FACE_RECOGNITION = os.environ.get('ENABLE_FACE_RECOGNITION', 'true').lower() == 'true'
     ENABLE_EMAIL_NOTIFICATIONS = os.environ.get('ENABLE_EMAIL', 'false').lower() == 'true'
+    
+    # Face matching index: 'exact' (brute force), 'centroid' (one summary per
+    # user first, full templates for the closest few) or 'ivf' (approximate)
+    FACE_INDEX = os.environ.get('FACE_INDEX', 'centroid')
+    FACE_INDEX_NLIST = int(os.environ.get('FACE_INDEX_NLIST', 0))  # 0 = sqrt(gallery size)
+    FACE_INDEX_NPROBE = int(os.environ.get('FACE_INDEX_NPROBE', 8))
+    FACE_INDEX_TOP_K = int(os.environ.get('FACE_INDEX_TOP_K', 8))  # users whose templates are scored in full
+    FACE_INDEX_MEDOIDS = int(os.environ.get('FACE_INDEX_MEDOIDS', 0))  # extra summary vectors per user
+    # Recognition for a subject searches its enrolled students first; with the
+    # fallback on, faces not matched there are then matched campus-wide
+    RECOGNITION_CAMPUS_FALLBACK = os.environ.get('RECOGNITION_CAMPUS_FALLBACK', 'true').lower() == 'true'
+    # Enrollment images further than this from their user's centroid are flagged for re-capture
+    FACE_OUTLIER_DISTANCE = float(os.environ.get('FACE_OUTLIER_DISTANCE', 0.45))
+    
+    # Detection profiles per route ('fast' or 'accurate', see detection.PROFILES)
+    ATTENDANCE_PROFILE = os.environ.get('ATTENDANCE_PROFILE', 'fast')
+    REGISTRATION_PROFILE = os.environ.get('REGISTRATION_PROFILE', 'accurate')
+    # Optional detection crop as "left,top,right,bottom" frame fractions, e.g. "0.2,0,0.8,1"
+    DETECTION_ROI = tuple(float(v) for v in os.environ['DETECTION_ROI'].split(',')) \
+        if os.environ.get('DETECTION_ROI') else None
+    
+    # Recognition worker pool (0 workers = run on the request thread)
+    RECOGNITION_WORKERS = int(os.environ.get('RECOGNITION_WORKERS', 2))
+    RECOGNITION_QUEUE_SIZE = int(os.environ.get('RECOGNITION_QUEUE_SIZE', 8))
+    RECOGNITION_TIMEOUT = float(os.environ.get('RECOGNITION_TIMEOUT', 10))
+    
+    # Near-duplicate frame suppression: differing bits out of the 64-bit frame
+    # hash still treated as the same frame, and how long results are reused (0 = off)
+    FRAME_DEDUP_THRESHOLD = int(os.environ.get('FRAME_DEDUP_THRESHOLD', 1))
+    FRAME_DEDUP_TTL = float(os.environ.get('FRAME_DEDUP_TTL', 10))
+    FRAME_DEDUP_ENTRIES = int(os.environ.get('FRAME_DEDUP_ENTRIES', 4))
+    
+    # Group commit for attendance marks: flush after this many rows or milliseconds
+    ATTENDANCE_GROUP_COMMIT = os.environ.get('ATTENDANCE_GROUP_COMMIT', 'true').lower() == 'true'
+    ATTENDANCE_BATCH_SIZE = int(os.environ.get('ATTENDANCE_BATCH_SIZE', 50))
+    ATTENDANCE_BATCH_DELAY_MS = float(os.environ.get('ATTENDANCE_BATCH_DELAY_MS', 20))
+    
+    # Longest a write waits for SQLite's write lock (jittered backoff) before failing
+    DB_WRITE_DEADLINE = float(os.environ.get('DB_WRITE_DEADLINE', 10))
+    # Socket of a running db_writer.py; when set, attendance marks are forwarded there
+    DB_WRITER_ADDRESS = os.environ.get('DB_WRITER_ADDRESS')
+    
+    # Query cache for student names, attendance history and reports
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 10000))
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))
+    # 'memory' (per process) or 'sqlite' (shared by every worker through SHARED_STATE_PATH)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    SHARED_STATE_PATH = os.environ.get('SHARED_STATE_PATH', 'shared_state.db')
+    
+    # Processes hashing passwords during a bulk student import (0 = one per CPU)
+    IMPORT_HASH_WORKERS = int(os.environ.get('IMPORT_HASH_WORKERS', 0))
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -29,4 +95,6 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    RECOGNITION_WORKERS = 0
+    ATTENDANCE_GROUP_COMMIT = False
     DATABASE_PATH = ':memory:'  # Use in-memory database for tests
\ No newline at end of file
@@ -1,146 +1,159 @@
 import sqlite3
-import os
+import base64
+import json
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
-import threading
-from functools import wraps
-import time
-
-def retry_on_locked(max_retries=3, delay=1):
-    """Retry decorator for database locked errors"""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except sqlite3.OperationalError as e:
-                    if "database is locked" in str(e) and attempt < max_retries - 1:
-                        print(f"Database locked, retrying in {delay} seconds...")
-                        time.sleep(delay)
-                    else:
-                        raise
-            return func(*args, **kwargs)
-        return wrapper
-    return decorator
+from db_pool import ConnectionPool
+from attendance_writer import AttendanceWriter, RemoteAttendanceWriter
+import migrations
+from cache import LRUCache
 
 class Database:
-    def __init__(self, db_name='attendance.db'):
+    # Cache lifetimes in seconds; entries are keyed by data version, so a write
+    # anywhere makes them unreachable before these expire
+    NAME_TTL = 600
+    UNKNOWN_NAME_TTL = 30
+    ATTENDANCE_TTL = 300
+    REPORT_TTL = 60
+    ROSTER_TTL = 600
+    
+    def __init__(self, db_name='attendance.db', readers=4, write_deadline=10.0, cache=None):
         self.db_name = db_name
-        self.lock = threading.Lock()
+        self.cache = cache if cache is not None else LRUCache()
+        self.pool = ConnectionPool(db_name, readers=readers, write_deadline=write_deadline)
+        self.lock = self.pool.write_lock
+        self.attendance_writer = None
         self.init_db()
     
     def get_connection(self):
-        """Get database connection with timeout and error handling"""
+        """Open a standalone connection (scripts and maintenance; routes use read()/write())"""
         try:
-            conn = sqlite3.connect(
-                self.db_name, 
-                timeout=30,
-                check_same_thread=False
-            )
-            conn.execute("PRAGMA busy_timeout = 30000")
-            return conn
+            return self.pool.connect()
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             raise
     
+    def read(self):
+        """Pooled reader connection: ``with db.read() as conn: ...``"""
+        return self.pool.reader()
+    
+    def write(self, synchronous=None):
+        """The shared writer connection in a BEGIN IMMEDIATE transaction, committed when the block exits"""
+        return self.pool.writer(synchronous)
+    
+    def start_group_commit(self, max_batch=50, max_delay=0.02):
+        """Route attendance marks through a group-commit AttendanceWriter"""
+        self.attendance_writer = AttendanceWriter(self, max_batch=max_batch, max_delay=max_delay)
+        return self.attendance_writer
+    
+    def use_writer_process(self, address, authkey):
+        """Forward attendance marks to a db_writer.py process instead of writing here"""
+        self.attendance_writer = RemoteAttendanceWriter(address, authkey)
+        return self.attendance_writer
+    
+    def close(self):
+        if self.attendance_writer is not None:
+            self.attendance_writer.close()
+        self.pool.close()
+    
+    def data_versions(self, *entities):
+        """Current version of each entity: 'attendance', 'student:<id>', 'subject:<name>', ...
+
+        Versions live in the data_versions table, bumped by triggers in the
+        same transaction as each write, so every process sees the same
+        value. They only ever move forward, so they can be used as ETags;
+        an entity that was never written is at version 0.
+        """
+        if not entities:
+            return []
+        with self.read() as conn:
+            rows = dict(conn.execute(f'SELECT entity, version FROM data_versions WHERE entity IN '
+                                     f'({",".join("?" * len(entities))})', entities).fetchall())
+        return [rows.get(entity, 0) for entity in entities]
+    
+    def bump_versions(self, *entities):
+        """Mark ``entities`` as changed for data_versions() (data the triggers do not see)"""
+        if entities:
+            with self.write() as conn:
+                conn.executemany(migrations.BUMP_VERSION.format(entity='?'), [(entity,) for entity in entities])
+    
+    def _changed(self, *entities):
+        """Drop cached reads tagged with ``entities``"""
+        self.cache.invalidate(*entities)
+    
+    def _cached(self, key, compute, ttl, entities, negative_ttl=None):
+        """``compute()``, cached under ``key`` and the current data versions of ``entities``.
+
+        Invalidation by tag only reaches this process's cache with the
+        'memory' backend; keying by version (one primary-key read) makes
+        entries written before a change in any process unreachable.
+        """
+        key = (key, *self.data_versions(*entities))
+        return self.cache.get_or_compute(key, compute, ttl=ttl, tags=entities, negative_ttl=negative_ttl)
+    
     def init_db(self):
-        with self.lock:
-            conn = self.get_connection()
+        """Apply pending schema migrations; a single read when the schema is current"""
+        with self.read() as conn:
+            if migrations.schema_version(conn) >= migrations.LATEST:
+                return
+        with self.write() as conn:
+            applied = migrations.migrate(conn)
+        if applied:
+            print(f"✅ Database schema migrated to version {migrations.LATEST}")
+    
+    def seed_sample_data(self):
+        """Add the sample faculty, students and attendance if they are missing.
+
+        Opt-in (python migrations.py seed); never deletes or overwrites
+        existing rows. Sample attendance is only added to an empty table.
+        """
+        faculty = [('F001', 'Dr. C.P Koushik', 'faculty123', 'smith@university.edu')]
+        students = [
+            ('S001', 'Sameer Jain', 'student123', 'john@university.edu'),
+            ('S002', 'Tanmaya Puri', 'student123', 'jane@university.edu'),
+            ('S003', 'Devansh Bansal', 'student123', 'mike@university.edu'),
+            ('S004', 'Anuj Parashar', 'student123', 'sarah@university.edu')
+        ]
+        today = datetime.now().strftime('%Y-%m-%d')
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        sample_attendance = [
+            ('S001', 'Mathematics', yesterday, '09:00:00', 'F001'),
+            ('S002', 'Mathematics', yesterday, '09:01:00', 'F001'),
+            ('S001', 'Physics', today, '10:00:00', 'F001'),
+            ('S003', 'Physics', today, '10:01:00', 'F001'),
+        ]
+        
+        with self.read() as conn:
+            have_faculty = {row[0] for row in conn.execute('SELECT id FROM faculty')}
+            have_students = {row[0] for row in conn.execute('SELECT id FROM students')}
+        # Hash only what will be inserted; the hashes are the slow part
+        new_faculty = [(faculty_id, name, generate_password_hash(password), email)
+                       for faculty_id, name, password, email in faculty if faculty_id not in have_faculty]
+        new_students = [(student_id, name, generate_password_hash(password), email)
+                        for student_id, name, password, email in students if student_id not in have_students]
+        
+        with self.write() as conn:
             cursor = conn.cursor()
-            
-            # Faculty table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS faculty (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    password TEXT NOT NULL,
-                    email TEXT
-                )
-            ''')
-            
-            # Students table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS students (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    password TEXT NOT NULL,
-                    email TEXT,
-                    face_registered BOOLEAN DEFAULT FALSE
-                )
-            ''')
-            
-            # Attendance table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS attendance (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id TEXT,
-                    subject TEXT,
-                    date TEXT,
-                    time TEXT,
-                    marked_by TEXT,
-                    FOREIGN KEY (student_id) REFERENCES students (id)
-                )
-            ''')
-            
-            # Clear and insert sample faculty with HASHED passwords
-            cursor.execute('DELETE FROM faculty')
-            cursor.execute('''
-                INSERT OR IGNORE INTO faculty (id, name, password, email) 
-                VALUES (?, ?, ?, ?)
-            ''', ('F001', 'Dr. C.P Koushik', generate_password_hash('faculty123'), 'smith@university.edu'))
-            
-            # Clear and insert sample students with HASHED passwords
-            cursor.execute('DELETE FROM students')
-            sample_students = [
-                ('S001', 'Sameer Jain', generate_password_hash('student123'), 'john@university.edu'),
-                ('S002', 'Tanmaya Puri', generate_password_hash('student123'), 'jane@university.edu'),
-                ('S003', 'Devansh Bansal', generate_password_hash('student123'), 'mike@university.edu'),
-                ('S004', 'Anuj Parashar', generate_password_hash('student123'), 'sarah@university.edu')
-            ]
-            
-            for student in sample_students:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO students (id, name, password, email) 
-                    VALUES (?, ?, ?, ?)
-                ''', student)
-            
-            # Clear existing attendance
-            cursor.execute('DELETE FROM attendance')
-            
-            # Add some sample attendance records for testing
-            today = datetime.now().strftime('%Y-%m-%d')
-            yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            
-            sample_attendance = [
-                ('S001', 'Mathematics', yesterday, '09:00:00', 'F001'),
-                ('S002', 'Mathematics', yesterday, '09:01:00', 'F001'),
-                ('S001', 'Physics', today, '10:00:00', 'F001'),
-                ('S003', 'Physics', today, '10:01:00', 'F001'),
-            ]
-            
-            for record in sample_attendance:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO attendance (student_id, subject, date, time, marked_by)
+            cursor.executemany('INSERT OR IGNORE INTO faculty (id, name, password, email) VALUES (?, ?, ?, ?)',
+                               new_faculty)
+            cursor.executemany('INSERT OR IGNORE INTO students (id, name, password, email) VALUES (?, ?, ?, ?)',
+                               new_students)
+            added_attendance = 0
+            if cursor.execute('SELECT 1 FROM attendance LIMIT 1').fetchone() is None:
+                cursor.executemany('''
+                    INSERT INTO attendance (student_id, subject, date, time, marked_by)
                     VALUES (?, ?, ?, ?, ?)
-                ''', record)
-            
-            # Add indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_student_id ON attendance(student_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_subject ON attendance(subject)')
-            
-            conn.commit()
-            conn.close()
-            print("✅ Database initialized with secure passwords")
+                ''', sample_attendance)
+                added_attendance = len(sample_attendance)
+        
+        self._changed('attendance', *{f'student:{row[0]}' for row in new_students},
+                      *{f'subject:{row[1]}' for row in sample_attendance})
+        return {'faculty': len(new_faculty), 'students': len(new_students), 'attendance': added_attendance}
     
     def verify_faculty(self, faculty_id, password):
         """Verify faculty with password hashing"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM faculty WHERE id = ?', (faculty_id,))
-        faculty = cursor.fetchone()
-        conn.close()
+        with self.read() as conn:
+            faculty = conn.execute('SELECT * FROM faculty WHERE id = ?', (faculty_id,)).fetchone()
         
         if faculty and check_password_hash(faculty[2], password):
             return faculty
@@ -148,120 +161,377 @@ class Database:
     
     def verify_student(self, student_id, password):
         """Verify student with password hashing"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM students WHERE id = ?', (student_id,))
-        student = cursor.fetchone()
-        conn.close()
+        with self.read() as conn:
+            student = conn.execute('SELECT * FROM students WHERE id = ?', (student_id,)).fetchone()
         
         if student and check_password_hash(student[2], password):
             return student
         return None
     
-    @retry_on_locked()
     def add_student(self, student_id, name, password='student123', email=''):
         """Add student with password hashing"""
-        with self.lock:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            try:
-                hashed_password = generate_password_hash(password)
-                
-                cursor.execute('''
+        hashed_password = generate_password_hash(password)
+        try:
+            with self.write() as conn:
+                conn.execute('''
                     INSERT INTO students (id, name, password, email) 
                     VALUES (?, ?, ?, ?)
                 ''', (student_id, name, hashed_password, email))
-                
-                conn.commit()
-                return True
-            except sqlite3.IntegrityError:
-                raise Exception('Student ID already exists')
-            except Exception as e:
-                raise Exception(f'Database error: {str(e)}')
-            finally:
-                conn.close()
-    
-    @retry_on_locked()
+            self._changed(f'student:{student_id}')
+            return True
+        except sqlite3.IntegrityError:
+            raise Exception('Student ID already exists')
+        except sqlite3.OperationalError:
+            raise
+        except Exception as e:
+            raise Exception(f'Database error: {str(e)}')
+    
+    def add_students_bulk(self, students):
+        """Insert (id, name, password_hash, email) rows in one transaction.
+
+        Returns the ids that already existed; those rows are skipped.
+        """
+        ids = [student[0] for student in students]
+        try:
+            with self.write() as conn:
+                existing = set()
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    existing.update(row[0] for row in conn.execute(
+                        f'SELECT id FROM students WHERE id IN ({",".join("?" * len(chunk))})', chunk))
+                conn.executemany('''
+                    INSERT OR IGNORE INTO students (id, name, password, email)
+                    VALUES (?, ?, ?, ?)
+                ''', [student for student in students if student[0] not in existing])
+            self._changed(*{f'student:{student_id}' for student_id in ids if student_id not in existing})
+            return existing
+        except sqlite3.OperationalError:
+            raise
+        except Exception as e:
+            raise Exception(f'Database error: {str(e)}')
+    
     def delete_student(self, student_id):
         """Delete student safely"""
-        with self.lock:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            try:
-                cursor.execute('DELETE FROM students WHERE id = ?', (student_id,))
-                conn.commit()
-                return True
-            except Exception as e:
-                raise Exception(f'Database error: {str(e)}')
-            finally:
-                conn.close()
-    
-    @retry_on_locked()
-    def mark_attendance(self, student_id, subject, marked_by):
-        """Mark attendance with thread safety"""
-        with self.lock:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            try:
-                current_date = datetime.now().strftime('%Y-%m-%d')
-                current_time = datetime.now().strftime('%H:%M:%S')
-                
-                cursor.execute('''
+        try:
+            with self.write() as conn:
+                # No DELETE ... RETURNING: that needs SQLite 3.35
+                subjects = {row[0] for row in conn.execute(
+                    'SELECT DISTINCT subject FROM enrollments WHERE student_id = ?', (student_id,))}
+                conn.execute('DELETE FROM enrollments WHERE student_id = ?', (student_id,))
+                conn.execute('DELETE FROM students WHERE id = ?', (student_id,))
+            self._changed(f'student:{student_id}', *{f'roster:{subject}' for subject in subjects})
+            return True
+        except sqlite3.OperationalError:
+            raise
+        except Exception as e:
+            raise Exception(f'Database error: {str(e)}')
+    
+    def set_faces_registered(self, student_ids, registered=True):
+        """Set the face_registered flag of ``student_ids`` in one transaction"""
+        student_ids = set(student_ids)
+        if not student_ids:
+            return
+        with self.write() as conn:
+            conn.executemany('UPDATE students SET face_registered = ? WHERE id = ?',
+                             [(registered, student_id) for student_id in student_ids])
+            conn.executemany(migrations.BUMP_VERSION.format(entity='?'),
+                             [(f'faces:{student_id}',) for student_id in student_ids])
+        self._changed(*{f'faces:{student_id}' for student_id in student_ids})
+    
+    def enroll_students(self, subject, student_ids, section=''):
+        """Add existing students to a subject's roster; returns how many were newly enrolled"""
+        # rowcount, not total_changes: the data_versions triggers write rows too
+        with self.write() as conn:
+            added = conn.executemany('''INSERT OR IGNORE INTO enrollments (subject, section, student_id)
+                                        SELECT ?, ?, id FROM students WHERE id = ?''',
+                                     [(subject, section or '', student_id) for student_id in set(student_ids)]
+                                     ).rowcount
+        if added:
+            self._changed(f'roster:{subject}')
+        return added
+    
+    def unenroll_students(self, subject, student_ids, section=None):
+        """Remove students from a subject (one section, or all of them); returns how many rows went"""
+        with self.write() as conn:
+            if section is None:
+                removed = conn.executemany('DELETE FROM enrollments WHERE subject = ? AND student_id = ?',
+                                           [(subject, student_id) for student_id in set(student_ids)]).rowcount
+            else:
+                removed = conn.executemany(
+                    'DELETE FROM enrollments WHERE subject = ? AND section = ? AND student_id = ?',
+                    [(subject, section, student_id) for student_id in set(student_ids)]).rowcount
+        if removed:
+            self._changed(f'roster:{subject}')
+        return removed
+    
+    def get_roster(self, subject, section=None):
+        """Sorted ids of the students enrolled in ``subject`` (one section, or all of them)"""
+        return self._cached(f'roster:{subject}:{section}', lambda: self._load_roster(subject, section),
+                            self.ROSTER_TTL, [f'roster:{subject}'])
+    
+    def _load_roster(self, subject, section):
+        with self.read() as conn:
+            if section is None:
+                rows = conn.execute('SELECT DISTINCT student_id FROM enrollments WHERE subject = ? '
+                                    'ORDER BY student_id', (subject,)).fetchall()
+            else:
+                rows = conn.execute('SELECT student_id FROM enrollments WHERE subject = ? AND section = ? '
+                                    'ORDER BY student_id', (subject, section)).fetchall()
+        return [row[0] for row in rows]
+    
+    def get_enrollment_counts(self):
+        """(subject, section, students) for every roster"""
+        with self.read() as conn:
+            return conn.execute('SELECT subject, section, COUNT(*) FROM enrollments '
+                                'GROUP BY subject, section ORDER BY subject, section').fetchall()
+    
+    def insert_attendance_rows(self, rows, durable=False):
+        """Insert (student_id, subject, date, time, marked_by) rows in one transaction"""
+        try:
+            # Full fsync for a durable commit only; the pool default is NORMAL
+            with self.write('FULL' if durable else None) as conn:
+                conn.executemany('''
                     INSERT INTO attendance (student_id, subject, date, time, marked_by)
                     VALUES (?, ?, ?, ?, ?)
-                ''', (student_id, subject, current_date, current_time, marked_by))
-                
-                conn.commit()
-            except Exception as e:
-                raise Exception(f'Database error: {str(e)}')
-            finally:
-                conn.close()
+                ''', rows)
+            return len(rows)
+        except sqlite3.OperationalError:
+            raise
+        except Exception as e:
+            raise Exception(f'Database error: {str(e)}')
+    
+    def mark_attendance(self, student_id, subject, marked_by):
+        """Mark attendance with thread safety"""
+        return self.mark_attendance_bulk([student_id], subject, marked_by)
+    
+    def mark_attendance_bulk(self, student_ids, subject, marked_by):
+        """Mark attendance for several students in a single transaction"""
+        if not student_ids:
+            return 0
+        current_date = datetime.now().strftime('%Y-%m-%d')
+        current_time = datetime.now().strftime('%H:%M:%S')
+        rows = [(student_id, subject, current_date, current_time, marked_by) for student_id in student_ids]
+        if self.attendance_writer is not None:
+            # Blocks until the batch holding these rows has committed
+            count = self.attendance_writer.submit(rows).result()
+        else:
+            count = self.insert_attendance_rows(rows)
+        self._changed('attendance', f'subject:{subject}', *{f'student:{student_id}' for student_id in student_ids})
+        return count
     
     def get_student_attendance(self, student_id):
-        """Get student attendance records"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
+        """Get student attendance records (cached; treat the result as read-only)"""
+        return self._cached(f'attendance:{student_id}', lambda: self._load_student_attendance(student_id),
+                            self.ATTENDANCE_TTL, [f'student:{student_id}'])
+    
+    def _load_student_attendance(self, student_id):
+        with self.read() as conn:
+            attendance = conn.execute('''
                 SELECT subject, date, time, marked_by 
                 FROM attendance 
                 WHERE student_id = ? 
                 ORDER BY date DESC, time DESC
-            ''', (student_id,))
-            
-            attendance = cursor.fetchall()
-            
-            return [{
-                'subject': record[0],
-                'date': record[1],
-                'time': record[2],
-                'marked_by': record[3]
-            } for record in attendance]
+            ''', (student_id,)).fetchall()
+        
+        return [{
+            'subject': record[0],
+            'date': record[1],
+            'time': record[2],
+            'marked_by': record[3]
+        } for record in attendance]
+    
+    def get_student_attendance_page(self, student_id, limit=50, cursor=None, subject=None,
+                                    date_from=None, date_to=None):
+        """One page of a student's attendance, newest first.
+
+        Keyset pagination on (date, time, id): pass the returned
+        ``next_cursor`` back as ``cursor`` for the following page; it is
+        None on the last page. Raises ValueError for a malformed cursor.
+        """
+        key = ('attendance_page', student_id, limit, cursor, subject, date_from, date_to)
+        return self._cached(key, lambda: self._load_student_attendance_page(
+                                student_id, limit, cursor, subject, date_from, date_to),
+                            self.ATTENDANCE_TTL, [f'student:{student_id}'])
+    
+    def _load_student_attendance_page(self, student_id, limit, cursor, subject, date_from, date_to):
+        query = 'SELECT id, subject, date, time, marked_by FROM attendance WHERE student_id = ?'
+        args = [student_id]
+        if cursor:
+            query += ' AND (date, time, id) < (?, ?, ?)'
+            args += decode_cursor(cursor)
+        if subject:
+            query += ' AND subject = ?'
+            args.append(subject)
+        if date_from:
+            query += ' AND date >= ?'
+            args.append(date_from)
+        if date_to:
+            query += ' AND date <= ?'
+            args.append(date_to)
+        query += ' ORDER BY date DESC, time DESC, id DESC LIMIT ?'
+        args.append(limit + 1)
+        
+        with self.read() as conn:
+            rows = conn.execute(query, args).fetchall()
+        
+        last = rows[limit - 1] if len(rows) > limit else None
+        return {
+            'records': [{'subject': row[1], 'date': row[2], 'time': row[3], 'marked_by': row[4]}
+                        for row in rows[:limit]],
+            'next_cursor': encode_cursor(last[2], last[3], last[0]) if last else None
+        }
+    
+    def get_student_attendance_summary(self, student_id):
+        """Totals and per-subject attendance percentages for a student.
+
+        A subject's sessions are the days on which anyone was marked for
+        it; the percentage is the share of those days the student attended.
+        """
+        return self._cached(('attendance_summary', student_id),
+                            lambda: self._load_student_attendance_summary(student_id),
+                            self.ATTENDANCE_TTL, [f'student:{student_id}', 'attendance'])
+    
+    def _load_student_attendance_summary(self, student_id):
+        with self.read() as conn:
+            attended = conn.execute('''
+                SELECT subject, COUNT(*), COUNT(DISTINCT date), MIN(date), MAX(date)
+                FROM attendance
+                WHERE student_id = ?
+                GROUP BY subject
+            ''', (student_id,)).fetchall()
+            sessions = dict(conn.execute('''
+                SELECT subject, COUNT(*) FROM attendance_daily GROUP BY subject
+            ''').fetchall())
+            days_present = conn.execute(
+                'SELECT COUNT(DISTINCT date) FROM attendance WHERE student_id = ?', (student_id,)).fetchone()[0]
+        
+        subjects = []
+        for subject, records, days, _, _ in attended:
+            held = sessions.get(subject, days)
+            subjects.append({
+                'subject': subject,
+                'records': records,
+                'attended': days,
+                'sessions': held,
+                'percentage': round(100 * days / held, 1) if held else 0.0
+            })
+        attended_total = sum(s['attended'] for s in subjects)
+        sessions_total = sum(s['sessions'] for s in subjects)
+        return {
+            'total_records': sum(s['records'] for s in subjects),
+            'days_present': days_present,
+            'first_date': min((row[3] for row in attended), default=None),
+            'last_date': max((row[4] for row in attended), default=None),
+            'percentage': round(100 * attended_total / sessions_total, 1) if sessions_total else 0.0,
+            'subjects': sorted(subjects, key=lambda s: s['subject'])
+        }
+    
+    def iter_attendance(self, date_from=None, date_to=None, subject=None, student_id=None, batch_size=5000):
+        """Yield attendance rows in batches of ``batch_size`` for exports.
+
+        Rows are (id, student_id, student_name, subject, date, time,
+        marked_by), ordered by date then id. One query on its own
+        connection is read with fetchmany, so memory stays flat however
+        many rows match, and pooled readers are not held up.
+        """
+        query = '''SELECT a.id, a.student_id, s.name, a.subject, a.date, a.time, a.marked_by
+                   FROM attendance a LEFT JOIN students s ON s.id = a.student_id WHERE 1'''
+        args = []
+        if date_from:
+            query += ' AND a.date >= ?'
+            args.append(date_from)
+        if date_to:
+            query += ' AND a.date <= ?'
+            args.append(date_to)
+        if subject:
+            # Unary + keeps the planner on the date index, which already yields (date, id)
+            # order; sorting through the subject index would buffer the whole result
+            query += ' AND +a.subject = ?'
+            args.append(subject)
+        if student_id:
+            query += ' AND a.student_id = ?'
+            args.append(student_id)
+        query += ' ORDER BY a.date, a.id'
+        
+        conn = self.get_connection()
+        # A one-pass scan gains little from mmap, which would map up to mmap_size
+        # of the file into this process for the length of the export
+        conn.execute('PRAGMA mmap_size = 0')
+        try:
+            cursor = conn.execute(query, args)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
         finally:
             conn.close()
     
+    def get_report_summary(self):
+        """Totals for /reports, read from the summary tables"""
+        return self._cached('report_summary', self._load_report_summary, self.REPORT_TTL, ['attendance'])
+    
+    def _load_report_summary(self):
+        with self.read() as conn:
+            # '' is the bucket of rows with a NULL student_id
+            total_students = conn.execute("SELECT COUNT(*) FROM attendance_student_totals "
+                                          "WHERE student_id != ''").fetchone()[0]
+            total_records = conn.execute('SELECT COALESCE(SUM(records), 0) FROM attendance_subject_totals').fetchone()[0]
+            subject_stats = conn.execute('''
+                SELECT subject, records 
+                FROM attendance_subject_totals 
+                ORDER BY records DESC
+            ''').fetchall()
+            recent_attendance = conn.execute('''
+                SELECT date, subject, students
+                FROM attendance_daily 
+                WHERE date >= date('now', '-7 days')
+                ORDER BY date DESC, subject
+            ''').fetchall()
+        
+        return {
+            'total_students': total_students,
+            'total_records': total_records,
+            'subject_stats': subject_stats,
+            'recent_attendance': recent_attendance
+        }
+    
+    def get_attendance_chart_data(self):
+        """Students per day and records per subject, read from the summary tables"""
+        return self._cached('attendance_chart', self._load_attendance_chart_data, self.REPORT_TTL, ['attendance'])
+    
+    def _load_attendance_chart_data(self):
+        with self.read() as conn:
+            daily_data = conn.execute('SELECT date, students FROM attendance_day_totals ORDER BY date').fetchall()
+            subject_data = conn.execute('SELECT subject, records FROM attendance_subject_totals').fetchall()
+        return daily_data, subject_data
+    
     def get_student_name(self, student_id):
         """Get student name by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT name FROM students WHERE id = ?', (student_id,))
-        result = cursor.fetchone()
-        conn.close()
+        return self._cached(f'name:{student_id}', lambda: self._load_student_name(student_id),
+                            self.NAME_TTL, [f'student:{student_id}'], negative_ttl=self.UNKNOWN_NAME_TTL)
+    
+    def _load_student_name(self, student_id):
+        with self.read() as conn:
+            result = conn.execute('SELECT name FROM students WHERE id = ?', (student_id,)).fetchone()
         return result[0] if result else None
     
     
     def get_all_students(self):
         """Get all students for management"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM students ORDER BY id')
-        students = cursor.fetchall()
-        conn.close()
-        return students
+        with self.read() as conn:
+            return conn.execute('SELECT * FROM students ORDER BY id').fetchall()
+
+def encode_cursor(date, time, record_id):
+    """Opaque page cursor for the attendance row (date, time, id)"""
+    return base64.urlsafe_b64encode(json.dumps([date, time, record_id]).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        date, time, record_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return [str(date), str(time), int(record_id)]
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
 
 def optimize_database(self):
     """Optimize database performance."""
@@ -0,0 +1,206 @@
+# db_pool.py - Long-lived SQLite connections shared by request threads
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Applied once to every connection the pool opens
+PRAGMAS = (
+    ('journal_mode', 'WAL'),       # readers never block the writer
+    ('synchronous', 'NORMAL'),     # fsync at checkpoints, not every commit (safe with WAL)
+    ('cache_size', -16000),        # 16 MB page cache per connection
+    ('mmap_size', 268435456),      # read pages straight from the OS page cache
+    ('temp_store', 'MEMORY'),
+    ('busy_timeout', 30000),
+)
+
+# The writer lets SQLite's own busy handler absorb only short waits; longer
+# ones go through WriteScheduler's jittered backoff
+WRITER_BUSY_TIMEOUT_MS = 5
+
+
+class WriteScheduler:
+    """Starts write transactions with BEGIN IMMEDIATE under a deadline.
+
+    BEGIN IMMEDIATE takes the write lock before any statement runs, so a
+    busy database is only ever seen at the start of a transaction and
+    retrying never repeats work. Retries back off exponentially with full
+    jitter (``base`` doubling up to ``cap`` seconds), so processes that
+    collided do not wake up in lockstep. ``deadline`` bounds the total
+    wait, after which the original "database is locked" error is raised.
+    """
+
+    def __init__(self, deadline=10.0, base=0.002, cap=0.1):
+        self.deadline = deadline
+        self.base = base
+        self.cap = cap
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=10000)
+        self.counters = {'transactions': 0, 'contended': 0, 'retries': 0, 'timeouts': 0}
+
+    def begin(self, conn):
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                waited = time.monotonic() - start
+                if waited >= self.deadline:
+                    self._record(waited, attempt, timed_out=True)
+                    raise
+                delay = random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+                time.sleep(min(delay, self.deadline - waited))
+                attempt += 1
+        self._record(time.monotonic() - start, attempt)
+
+    def _record(self, waited, retries, timed_out=False):
+        with self._lock:
+            self.counters['transactions'] += 1
+            self.counters['retries'] += retries
+            if retries:
+                self.counters['contended'] += 1
+            if timed_out:
+                self.counters['timeouts'] += 1
+            self._waits.append(waited)
+
+    def stats(self):
+        """Write-lock wait figures over the last 10k transactions"""
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = dict(self.counters)
+
+        def percentile(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 2) if waits else 0.0
+
+        return dict(counters, lock_wait_ms_p50=percentile(0.5), lock_wait_ms_p99=percentile(0.99),
+                    lock_wait_ms_max=percentile(1.0), deadline_s=self.deadline)
+
+
+class ConnectionPool:
+    """One writer connection plus a pool of reader connections.
+
+    SQLite allows a single writer at a time, so writes share one
+    connection behind a lock instead of racing for the file lock, and
+    each write transaction is opened by the pool's WriteScheduler. Readers
+    are handed out from a LIFO queue (the most recently used connection has
+    the warmest cache) and never wait on the writer under WAL.
+    Connections are opened lazily, and again after a fork, so a pool
+    created before gunicorn forks its workers is safe to use in them.
+    """
+
+    def __init__(self, path, readers=4, timeout=30, cached_statements=256, write_deadline=10.0):
+        self.path = path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.scheduler = WriteScheduler(deadline=write_deadline)
+        # Every connection to ':memory:' is a separate database
+        self.size = 0 if path == ':memory:' else readers
+        self.write_lock = threading.RLock()
+        self._setup_lock = threading.Lock()
+        self._pid = None
+        self._writer = None
+        self._readers = None
+        self._opened = 0
+
+    def connect(self, writer=False):
+        """Open a new connection with the pool's PRAGMAs applied.
+
+        The writer connection runs in autocommit mode so ``writer()`` can
+        issue BEGIN IMMEDIATE / COMMIT itself.
+        """
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements,
+                               isolation_level=None if writer else '')
+        for name, value in PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
+        if writer:
+            conn.execute(f'PRAGMA busy_timeout = {WRITER_BUSY_TIMEOUT_MS}')
+        return conn
+
+    def _check_process(self):
+        if self._pid == os.getpid():
+            return
+        with self._setup_lock:
+            if self._pid != os.getpid():
+                # Inherited connections belong to the parent process; drop them unclosed
+                self._writer = None
+                self._readers = queue.LifoQueue()
+                self._opened = 0
+                self._pid = os.getpid()
+
+    @contextmanager
+    def writer(self, synchronous=None):
+        """The writer connection inside a BEGIN IMMEDIATE transaction.
+
+        Commits on success and rolls back on error. ``synchronous``
+        overrides the PRAGMA for this transaction only (e.g. 'FULL' for a
+        commit that must survive power loss).
+        """
+        self._check_process()
+        with self.write_lock:
+            if self._writer is None:
+                self._writer = self.connect(writer=True)
+            conn = self._writer
+            if conn.in_transaction:
+                # Nested use joins the outer transaction
+                yield conn
+                return
+            if synchronous:
+                conn.execute(f'PRAGMA synchronous = {synchronous}')
+            try:
+                self.scheduler.begin(conn)
+                try:
+                    yield conn
+                    conn.execute('COMMIT')
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    raise
+            finally:
+                if synchronous:
+                    conn.execute('PRAGMA synchronous = NORMAL')
+
+    @contextmanager
+    def reader(self):
+        """A reader connection for the duration of the block"""
+        self._check_process()
+        if self.size == 0:
+            with self.writer() as conn:
+                yield conn
+            return
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._setup_lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    conn = self.connect()
+            if conn is None:
+                conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def close(self):
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while self._readers is not None:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self._pid = None
\ No newline at end of file
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# db_writer.py - Optional single writer process for attendance inserts
+"""
+Runs the only attendance writer for a database file. Web workers started
+with DB_WRITER_ADDRESS set forward their marks here instead of competing
+for SQLite's write lock; the marks of every worker are group-committed
+together.
+
+Usage:
+    python db_writer.py [attendance.db] [attendance-writer.sock]
+"""
+import os
+import sys
+import threading
+from multiprocessing.connection import Listener
+from multiprocessing import AuthenticationError
+
+from config import Config
+from database import Database
+
+
+class WriterServer:
+    """Serves insert and stats requests from RemoteAttendanceWriter clients"""
+
+    def __init__(self, db, address, authkey, max_batch=50, max_delay=0.02):
+        self.db = db
+        self.address = address
+        self.authkey = authkey
+        self.writer = db.start_group_commit(max_batch=max_batch, max_delay=max_delay)
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # stale socket from a previous run
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"✅ Attendance writer listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError) as e:
+                    print(f"⚠️ Rejected writer client: {e}")
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self.handle(message))
+
+    def handle(self, message):
+        try:
+            if message[0] == 'insert':
+                return 'ok', self.writer.submit(message[1]).result()
+            if message[0] == 'stats':
+                return 'ok', dict(self.writer.stats(), **self.db.pool.scheduler.stats())
+            return 'error', f'Unknown request {message[0]!r}'
+        except Exception as e:
+            return 'error', str(e)
+
+
+def main(argv):
+    db_path = argv[1] if len(argv) > 1 else Config.DATABASE_PATH
+    address = argv[2] if len(argv) > 2 else (Config.DB_WRITER_ADDRESS or 'attendance-writer.sock')
+    db = Database(db_path, write_deadline=Config.DB_WRITE_DEADLINE)
+    server = WriterServer(db, address, Config.SECRET_KEY.encode(),
+                          max_batch=Config.ATTENDANCE_BATCH_SIZE,
+                          max_delay=Config.ATTENDANCE_BATCH_DELAY_MS / 1000)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
\ No newline at end of file
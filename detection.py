@@ -0,0 +1,138 @@
+# detection.py - Configurable face detection and encoding pipeline
+import time
+
+import cv2
+import numpy as np
+
+
+class DetectionProfile:
+    """Settings for one detect-and-encode pass.
+
+    scale      downscale factor applied before detection; boxes are mapped
+               back to the full frame for encoding
+    upsample   number_of_times_to_upsample for face_locations
+    model      'hog' (CPU) or 'cnn' (dlib CNN, needs a GPU build to be fast)
+    jitters    num_jitters for face_encodings
+    landmarks  'large' (68 points) or 'small' (5 points) landmark model
+    roi        optional (left, top, right, bottom) crop as frame fractions
+    decode_reduction  1, 2, 4 or 8: let the JPEG decoder produce a frame
+               that much smaller (cv2.IMREAD_REDUCED_COLOR_*); detection
+               and encoding then run on the reduced frame
+    """
+
+    def __init__(self, name, scale=1.0, upsample=1, model='hog', jitters=1, landmarks='large', roi=None,
+                 decode_reduction=1):
+        self.name = name
+        self.scale = scale
+        self.upsample = upsample
+        self.model = model
+        self.jitters = jitters
+        self.landmarks = landmarks
+        self.roi = roi
+        self.decode_reduction = decode_reduction
+
+    def with_roi(self, roi):
+        """Copy of this profile restricted to ``roi``"""
+        return DetectionProfile(self.name, self.scale, self.upsample, self.model, self.jitters,
+                                self.landmarks, tuple(roi) if roi else None, self.decode_reduction)
+
+    @property
+    def imread_flag(self):
+        """cv2.imdecode flag matching ``decode_reduction``"""
+        return DECODE_FLAGS[self.decode_reduction]
+
+
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+PROFILES = {
+    # Library defaults on the full frame, as registration always used
+    'accurate': DetectionProfile('accurate', scale=1.0, upsample=1),
+    # Half-resolution HOG without upsampling: a 640x480 webcam face is
+    # still well above the detector's minimum size
+    'fast': DetectionProfile('fast', scale=0.5, upsample=0),
+    # Same detection size as 'fast', but the JPEG is decoded straight to
+    # half resolution, so the full frame is never materialised
+    'reduced': DetectionProfile('reduced', scale=1.0, upsample=0, decode_reduction=2),
+}
+
+
+def get_profile(profile):
+    """Resolve a profile name (or pass a DetectionProfile through)"""
+    if isinstance(profile, DetectionProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown detection profile '{profile}'")
+    return PROFILES[profile]
+
+
+def decode_image(buffer, profile='accurate'):
+    """Decode an encoded image buffer (bytes, bytearray or memoryview) to BGR"""
+    data = np.frombuffer(buffer, np.uint8)
+    return cv2.imdecode(data, get_profile(profile).imread_flag)
+
+
+def _roi_box(shape, roi):
+    height, width = shape[:2]
+    left, top, right, bottom = roi
+    return (int(top * height), int(right * width), int(bottom * height), int(left * width))
+
+
+def detect_faces(image, profile='accurate', timings=None):
+    """Detect faces in a BGR frame and return their full-frame locations.
+
+    Also returns the RGB frame so the caller can encode without a second
+    colour conversion.
+    """
+    import face_recognition  # deferred: importing it loads the dlib models
+    profile = get_profile(profile)
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+
+    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    region, offset_y, offset_x = rgb_image, 0, 0
+    if profile.roi:
+        top, right, bottom, left = _roi_box(image.shape, profile.roi)
+        region, offset_y, offset_x = rgb_image[top:bottom, left:right], top, left
+    if profile.scale != 1.0:
+        region = cv2.resize(region, None, fx=profile.scale, fy=profile.scale, interpolation=cv2.INTER_AREA)
+    timings['prepare'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    small_locations = face_recognition.face_locations(region, number_of_times_to_upsample=profile.upsample,
+                                                      model=profile.model)
+    timings['detect'] = time.perf_counter() - start
+
+    height, width = image.shape[:2]
+    locations = []
+    for top, right, bottom, left in small_locations:
+        locations.append((
+            max(0, min(height, int(round(top / profile.scale)) + offset_y)),
+            max(0, min(width, int(round(right / profile.scale)) + offset_x)),
+            max(0, min(height, int(round(bottom / profile.scale)) + offset_y)),
+            max(0, min(width, int(round(left / profile.scale)) + offset_x)),
+        ))
+    return rgb_image, locations
+
+
+def encode_faces(rgb_image, locations, profile='accurate', timings=None):
+    """Encode every location in the decoded RGB frame in one call"""
+    import face_recognition
+    profile = get_profile(profile)
+    start = time.perf_counter()
+    encodings = face_recognition.face_encodings(rgb_image, locations, num_jitters=profile.jitters,
+                                                model=profile.landmarks) if locations else []
+    if timings is not None:
+        timings['encode'] = time.perf_counter() - start
+    return encodings
+
+
+def detect_and_encode(image, profile='accurate', timings=None):
+    """Full pipeline: ``(locations, encodings)`` for a BGR frame"""
+    rgb_image, locations = detect_faces(image, profile, timings)
+    return locations, encode_faces(rgb_image, locations, profile, timings)
\ No newline at end of file
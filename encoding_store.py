@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# encoding_store.py - Append-only binary store for face encodings
+"""
+On-disk layout (format version 1) for a store named ``face_encodings``:
+
+face_encodings.f32  64-byte header (magic, version, dim) followed by one
+                    fixed-width float32 row per encoding, append-only.
+face_encodings.idx  JSON lines sidecar. The first line describes the
+                    format, then one line per appended row
+                    ({"row", "key", "user_id", "name", "ts"}) or per
+                    tombstone ({"del": key}).
+face_encodings.lock Empty; held while the store is created or migrated,
+                    so concurrent workers never build it twice.
+
+Workers open the matrix with ``np.memmap`` so every process shares the OS
+page cache, and pick up rows appended by other processes by reading the
+sidecar from the last offset they saw. ``compact`` rewrites both files
+without tombstoned rows and swaps them in atomically; a new or migrated
+store is swapped in the same way, index last, so ``exists()`` never sees
+half of one.
+
+Usage:
+    python encoding_store.py migrate [face_encodings.pkl] [face_encodings]
+    python encoding_store.py compact [face_encodings]
+    python encoding_store.py info [face_encodings]
+"""
+import json
+import os
+import pickle
+import struct
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+MAGIC = b'FENC'
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+
+
+class EncodingStore:
+    """Fixed-width float32 encoding matrix plus an id/metadata sidecar"""
+
+    def __init__(self, base_path='face_encodings', dim=128):
+        self.base_path = base_path
+        self.matrix_path = base_path + '.f32'
+        self.index_path = base_path + '.idx'
+        self.lock_path = base_path + '.lock'
+        self.dim = dim
+        self.row_bytes = dim * 4
+        self.entries = {}
+        self.dead_rows = 0
+        self._offset = 0
+        self._inode = None
+
+    def exists(self):
+        return os.path.exists(self.matrix_path) and os.path.exists(self.index_path)
+
+    @contextmanager
+    def _creating(self):
+        """Hold the store lock; callers re-check exists() once inside"""
+        with open(self.lock_path, 'a') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _create(self):
+        """Write an empty store (under _creating(), or at a private path)"""
+        header = MAGIC + struct.pack('<HH', FORMAT_VERSION, self.dim)
+        with open(self.matrix_path + '.tmp', 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+        with open(self.index_path + '.tmp', 'w') as f:
+            f.write(json.dumps({'format': 'face-encodings', 'version': FORMAT_VERSION,
+                                'dim': self.dim}) + '\n')
+        os.replace(self.matrix_path + '.tmp', self.matrix_path)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+    def _ensure(self):
+        if not self.exists():
+            with self._creating():
+                if not self.exists():
+                    self._create()
+
+    def _migrate(self, pickle_path):
+        """Build the store from a legacy pickle at a private path and swap it in (under _creating())"""
+        with open(pickle_path, 'rb') as f:
+            legacy = pickle.load(f)
+        tmp = EncodingStore(self.base_path + '.migrate', self.dim)
+        tmp._create()
+        tmp.open()
+        tmp.append_many((key, data['user_id'], data.get('name'), data['encoding'])
+                        for key, data in legacy.items())
+        os.replace(tmp.matrix_path, self.matrix_path)
+        os.replace(tmp.index_path, self.index_path)
+        print(f"✅ Migrated {len(legacy)} face encodings from {pickle_path} to {self.matrix_path}")
+
+    def _check_header(self):
+        with open(self.matrix_path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if header[:4] != MAGIC:
+            raise ValueError(f'{self.matrix_path} is not a face encoding store')
+        version, dim = struct.unpack('<HH', header[4:8])
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported encoding store version {version}')
+        self.dim = dim
+        self.row_bytes = dim * 4
+
+    def open(self):
+        """Create the store if needed and read the full sidecar"""
+        self._ensure()
+        self._check_header()
+        self.entries = {}
+        self.dead_rows = 0
+        self._offset = 0
+        self._inode = os.stat(self.index_path).st_ino
+        return self.read_changes()
+
+    def open_migrating(self, pickle_path=None):
+        """open(), first migrating the legacy pickle (default ``<base_path>.pkl``) into a new store"""
+        pickle_path = pickle_path or self.base_path + '.pkl'
+        if not self.exists() and os.path.exists(pickle_path):
+            with self._creating():
+                if not self.exists():
+                    self._migrate(pickle_path)
+        return self.open()
+
+    def row_count(self):
+        return (os.path.getsize(self.matrix_path) - HEADER_SIZE) // self.row_bytes
+
+    def matrix(self):
+        """Read-only memory map of every row written so far"""
+        rows = self.row_count()
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.matrix_path, dtype=np.float32, mode='r',
+                         offset=HEADER_SIZE, shape=(rows, self.dim))
+
+    def changed(self):
+        """'reopen' after a compaction, 'append' if the sidecar grew, else None"""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return 'reopen'
+        if stat.st_ino != self._inode:
+            return 'reopen'
+        if stat.st_size != self._offset:
+            return 'append'
+        return None
+
+    def read_changes(self):
+        """Apply sidecar records written since the last read.
+
+        Returns the new records in file order: appended entries, and
+        ``{"del": key}`` for each live key that was tombstoned.
+        """
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+
+        records = []
+        for line in data[:end].splitlines():
+            record = json.loads(line)
+            if 'format' in record:
+                continue
+            if 'del' in record:
+                if self.entries.pop(record['del'], None) is not None:
+                    self.dead_rows += 1
+                    records.append(record)
+                continue
+            if record['key'] in self.entries:
+                self.dead_rows += 1
+            self.entries[record['key']] = record
+            records.append(record)
+        return records
+
+    def _locked(self, mode):
+        """Open the sidecar under an exclusive lock, following compactions"""
+        while True:
+            f = open(self.index_path, mode)
+            if not fcntl:
+                return f
+            fcntl.flock(f, fcntl.LOCK_EX)
+            if os.fstat(f.fileno()).st_ino == os.stat(self.index_path).st_ino:
+                return f
+            f.close()
+
+    def append_many(self, items):
+        """Append ``(key, user_id, name, encoding)`` items in one write.
+
+        Matrix rows are written before their sidecar lines, so a reader
+        never sees an id for a row that is not on disk yet.
+        """
+        items = list(items)
+        if not items:
+            return []
+        self._ensure()
+        matrix = np.asarray([item[3] for item in items], dtype=np.float32).reshape(len(items), self.dim)
+        timestamp = datetime.now().isoformat(timespec='seconds')
+
+        with self._locked('a') as index_file:
+            first_row = self.row_count()
+            with open(self.matrix_path, 'r+b') as f:
+                f.seek(HEADER_SIZE + first_row * self.row_bytes)
+                f.write(matrix.tobytes())
+            lines = []
+            for i, (key, user_id, name, _) in enumerate(items):
+                lines.append(json.dumps({'row': first_row + i, 'key': key, 'user_id': user_id,
+                                         'name': name, 'ts': timestamp}))
+            index_file.write('\n'.join(lines) + '\n')
+        return list(range(first_row, first_row + len(items)))
+
+    def append(self, key, user_id, name, encoding):
+        return self.append_many([(key, user_id, name, encoding)])[0]
+
+    def remove(self, keys):
+        """Tombstone ``keys``"""
+        keys = [key for key in keys if key in self.entries]
+        if keys:
+            with self._locked('a') as index_file:
+                index_file.write(''.join(json.dumps({'del': key}) + '\n' for key in keys))
+        return len(keys)
+
+    def needs_compaction(self, max_dead_fraction=0.25, min_dead=256):
+        total = len(self.entries) + self.dead_rows
+        return self.dead_rows >= min_dead and self.dead_rows > max_dead_fraction * total
+
+    def compact(self):
+        """Rewrite the store without tombstoned or superseded rows"""
+        with self._locked('a'):
+            self.open()
+            live = sorted(self.entries.values(), key=lambda record: record['row'])
+            source = self.matrix()
+            tmp = EncodingStore(self.base_path + '.compact', self.dim)
+            tmp._create()
+            with open(tmp.matrix_path, 'ab') as f:
+                for start in range(0, len(live), 4096):
+                    rows = [record['row'] for record in live[start:start + 4096]]
+                    f.write(np.ascontiguousarray(source[rows]).tobytes())
+            with open(tmp.index_path, 'a') as f:
+                for row, record in enumerate(live):
+                    f.write(json.dumps(dict(record, row=row)) + '\n')
+            del source
+            os.replace(tmp.matrix_path, self.matrix_path)
+            os.replace(tmp.index_path, self.index_path)
+        print(f"🧹 Compacted encoding store: {self.dead_rows} dead rows dropped, {len(live)} kept")
+        return self.open()
+
+
+def migrate_pickle(pickle_path='face_encodings.pkl', base_path='face_encodings'):
+    """Copy a legacy FaceRecognition pickle into a new encoding store"""
+    store = EncodingStore(base_path)
+    with store._creating():
+        if store.exists():
+            raise ValueError(f'{store.matrix_path} already exists')
+        store._migrate(pickle_path)
+    store.open()
+    return store
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in ('migrate', 'compact', 'info'):
+        print(__doc__)
+        return 1
+    if argv[1] == 'migrate':
+        pickle_path = argv[2] if len(argv) > 2 else 'face_encodings.pkl'
+        base_path = argv[3] if len(argv) > 3 else 'face_encodings'
+        migrate_pickle(pickle_path, base_path)
+        return 0
+
+    store = EncodingStore(argv[2] if len(argv) > 2 else 'face_encodings')
+    if not store.exists():
+        print(f"❌ No encoding store at {store.matrix_path}")
+        return 1
+    store.open()
+    if argv[1] == 'compact':
+        store.compact()
+    users = {record['user_id'] for record in store.entries.values()}
+    print(f"📦 {store.matrix_path}: {store.row_count()} rows, {len(store.entries)} live "
+          f"encodings for {len(users)} users, {store.dead_rows} dead")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
\ No newline at end of file
@@ -0,0 +1,282 @@
+# face_index.py - Candidate selection indexes for FaceGallery
+import numpy as np
+
+
+class BruteForceIndex:
+    """Exact search: every live gallery row is a candidate"""
+
+    name = 'exact'
+
+    def bind(self, gallery):
+        self.gallery = gallery
+
+    def add(self, row, vector):
+        pass
+
+    def remove(self, row):
+        pass
+
+    def reset(self):
+        pass
+
+    def candidates(self, probes):
+        """Rows to score for ``probes``; None means the whole gallery"""
+        return None
+
+
+def kmeans(vectors, k, iterations=10, seed=0):
+    """Plain Lloyd's k-means with k-means++ seeding, returns centroids"""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    sq_norms = np.einsum('ij,ij->i', vectors, vectors)
+
+    centroids = np.empty((k, vectors.shape[1]), dtype=np.float32)
+    centroids[0] = vectors[rng.integers(len(vectors))]
+    closest = np.full(len(vectors), np.inf, dtype=np.float32)
+    for i in range(1, k):
+        d = sq_norms - 2.0 * (vectors @ centroids[i - 1]) + centroids[i - 1] @ centroids[i - 1]
+        np.minimum(closest, np.maximum(d, 0.0), out=closest)
+        total = closest.sum()
+        pick = rng.choice(len(vectors), p=closest / total) if total > 0 else rng.integers(len(vectors))
+        centroids[i] = vectors[pick]
+
+    for _ in range(iterations):
+        labels = nearest_centroids(vectors, centroids, 1)[:, 0]
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def nearest_centroids(vectors, centroids, n, chunk=8192):
+    """Indices of the ``n`` closest centroids for each vector"""
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, centroids.shape[1])
+    c_sq = np.einsum('ij,ij->i', centroids, centroids)
+    out = np.empty((len(vectors), n), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        part = vectors[start:start + chunk]
+        d = c_sq[None, :] - 2.0 * (part @ centroids.T)
+        if n == 1:
+            out[start:start + chunk, 0] = np.argmin(d, axis=1)
+        else:
+            out[start:start + chunk] = np.argpartition(d, n - 1, axis=1)[:, :n]
+    return out
+
+
+class IVFIndex:
+    """Inverted-file index over a k-means coarse quantizer.
+
+    Gallery rows are bucketed by nearest centroid; a probe only scores the
+    rows in its ``nprobe`` closest buckets. Until the gallery holds
+    ``min_train`` encodings the index falls back to exact search, and it
+    retrains once the gallery has grown ``retrain_factor`` times past the
+    size it was trained on.
+    """
+
+    name = 'ivf'
+
+    def __init__(self, nlist=0, nprobe=8, min_train=1024, retrain_factor=4, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+        self.centroids = None
+        self.trained_size = 0
+        self._lists = []
+        self._row_list = {}
+
+    def bind(self, gallery):
+        self.gallery = gallery
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self):
+        """Fit the coarse quantizer on the live gallery and bucket every row"""
+        rows = self.gallery.live_rows()
+        nlist = self.nlist or max(1, int(np.sqrt(len(rows))))
+        nlist = min(nlist, len(rows))
+        sample = rows
+        if len(rows) > 64 * nlist:
+            sample = np.random.default_rng(self.seed).choice(rows, 64 * nlist, replace=False)
+        self.centroids = kmeans(self.gallery.vectors(sample), nlist, seed=self.seed)
+        self.trained_size = len(rows)
+        self._assign_all(rows)
+
+    def _assign_all(self, rows):
+        self._lists = [set() for _ in range(len(self.centroids))]
+        self._row_list = {}
+        if len(rows) == 0:
+            return
+        labels = nearest_centroids(self.gallery.vectors(rows), self.centroids, 1)[:, 0]
+        for row, label in zip(rows.tolist(), labels.tolist()):
+            self._lists[label].add(row)
+            self._row_list[row] = label
+
+    def add(self, row, vector):
+        if not self.is_trained:
+            return
+        self.remove(row)
+        label = int(nearest_centroids(vector, self.centroids, 1)[0, 0])
+        self._lists[label].add(row)
+        self._row_list[row] = label
+
+    def remove(self, row):
+        label = self._row_list.pop(row, None)
+        if label is not None:
+            self._lists[label].discard(row)
+
+    def reset(self):
+        """Re-bucket after the gallery renumbered its rows (compaction)"""
+        if self.is_trained:
+            self._assign_all(self.gallery.live_rows())
+
+    def candidates(self, probes):
+        size = len(self.gallery)
+        if not self.is_trained:
+            if size < self.min_train:
+                return None
+            self.train()
+        elif size > self.retrain_factor * self.trained_size:
+            self.train()
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        labels = np.unique(nearest_centroids(probes, self.centroids, nprobe))
+        total = sum(len(self._lists[label]) for label in labels)
+        rows = np.empty(total, dtype=np.int64)
+        start = 0
+        for label in labels:
+            bucket = self._lists[label]
+            rows[start:start + len(bucket)] = np.fromiter(bucket, dtype=np.int64, count=len(bucket))
+            start += len(bucket)
+        rows.sort()
+        return rows
+
+
+def robust_centroid(vectors, max_distance=0.45):
+    """Centroid of one user's encodings and each encoding's distance to it.
+
+    The centroid is the mean of the encodings within ``max_distance`` of
+    their coordinate-wise median, so one bad image (another person, a
+    blurred frame) does not drag it; with no such encodings it is the
+    median itself.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    median = np.median(vectors, axis=0)
+    inliers = np.linalg.norm(vectors - median, axis=1) <= max_distance
+    centroid = vectors[inliers].mean(axis=0) if inliers.any() else median
+    return centroid.astype(np.float32), np.linalg.norm(vectors - centroid, axis=1)
+
+
+def medoids(vectors, n):
+    """Indices of the ``n`` encodings with the smallest total distance to the others"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    diff = vectors[:, None, :] - vectors[None, :, :]
+    totals = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff)).sum(axis=1)
+    return np.argsort(totals, kind='stable')[:n]
+
+
+class CentroidIndex:
+    """Two-stage search over per-user templates.
+
+    Each user is summarised by the robust centroid of their encodings,
+    plus optionally ``medoids`` of the encodings themselves. A probe is
+    first scored against these few vectors per user, and only the full
+    templates of the ``top_k`` closest users are handed back for exact
+    scoring. Galleries of at most ``min_users`` users are searched
+    exactly. Summaries of users whose rows changed are rebuilt on the
+    next search.
+    """
+
+    name = 'centroid'
+
+    def __init__(self, top_k=8, medoids=0, outlier_distance=0.45, min_users=64):
+        self.top_k = top_k
+        self.medoids = medoids
+        self.outlier_distance = outlier_distance
+        self.min_users = min_users
+        self._members = {}
+        self._row_code = {}
+        self._dirty = set()
+        self._summaries = {}
+        self._stacked = None
+
+    def bind(self, gallery):
+        self.gallery = gallery
+
+    def add(self, row, vector):
+        self.remove(row)
+        code = int(self.gallery.codes([row])[0])
+        self._members.setdefault(code, set()).add(row)
+        self._row_code[row] = code
+        self._dirty.add(code)
+
+    def remove(self, row):
+        code = self._row_code.pop(row, None)
+        if code is not None:
+            self._members[code].discard(row)
+            if not self._members[code]:
+                del self._members[code]
+            self._dirty.add(code)
+
+    def reset(self):
+        """Re-collect every user's rows after the gallery renumbered them (compaction)"""
+        rows = self.gallery.live_rows()
+        self._members, self._row_code = {}, {}
+        for row, code in zip(rows.tolist(), self.gallery.codes(rows).tolist()):
+            self._members.setdefault(code, set()).add(row)
+            self._row_code[row] = code
+        self._dirty = set(self._summaries) | set(self._members)
+
+    def _summarise(self):
+        for code in self._dirty:
+            rows = self._members.get(code)
+            if not rows:
+                self._summaries.pop(code, None)
+                continue
+            vectors = self.gallery.vectors(sorted(rows))
+            centroid, _ = robust_centroid(vectors, self.outlier_distance)
+            if self.medoids and len(vectors) > 1:
+                vectors = np.vstack((centroid, vectors[medoids(vectors, self.medoids)]))
+            else:
+                vectors = centroid[None, :]
+            self._summaries[code] = vectors
+        self._dirty = set()
+
+        codes = list(self._summaries)
+        counts = [len(self._summaries[code]) for code in codes]
+        vectors = np.concatenate([self._summaries[code] for code in codes]).astype(np.float32)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self._stacked = vectors, np.einsum('ij,ij->i', vectors, vectors), starts, codes
+
+    def candidates(self, probes):
+        if len(self._members) <= max(self.min_users, self.top_k):
+            return None
+        if self._dirty or self._stacked is None:
+            self._summarise()
+        vectors, sq_norms, starts, codes = self._stacked
+
+        # Squared distance up to the probe's own norm, which does not change the ranking
+        dist = sq_norms[None, :] - 2.0 * (np.asarray(probes, dtype=np.float32) @ vectors.T)
+        if len(vectors) > len(codes):
+            dist = np.minimum.reduceat(dist, starts, axis=1)
+        k = min(self.top_k, len(codes))
+        nearest = np.unique(np.argpartition(dist, k - 1, axis=1)[:, :k])
+        rows = np.fromiter((row for i in nearest.tolist() for row in self._members[codes[i]]), dtype=np.int64)
+        rows.sort()
+        return rows
+
+
+def make_index(kind='exact', nlist=0, nprobe=8, top_k=8, medoids=0, outlier_distance=0.45):
+    """Build the index named in ``Config.FACE_INDEX``"""
+    if kind == 'exact':
+        return BruteForceIndex()
+    if kind == 'ivf':
+        return IVFIndex(nlist=nlist, nprobe=nprobe)
+    if kind == 'centroid':
+        return CentroidIndex(top_k=top_k, medoids=medoids, outlier_distance=outlier_distance)
+    raise ValueError(f"Unknown face index '{kind}'")
\ No newline at end of file
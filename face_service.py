@@ -0,0 +1,56 @@
+# face_service.py - Lazily loaded face recognition stack
+import threading
+import time
+
+
+class FaceStackDisabled(Exception):
+    """Raised when a web-only worker (ENABLE_FACE_RECOGNITION=false) is asked for face work"""
+
+    def __init__(self):
+        super().__init__('Face recognition is not available on this server')
+
+
+class FaceService:
+    """Stands in for my_face_utils.FaceRecognition until it is first needed.
+
+    Importing this module is cheap. face_recognition (and with it the dlib
+    models), cv2 and numpy are only imported, and the gallery only opened,
+    on the first attribute access, which is then forwarded to the real
+    FaceRecognition. With ``enabled=False`` none of that ever happens and
+    every access raises ``FaceStackDisabled``.
+    """
+
+    def __init__(self, enabled=True, store_path='face_encodings'):
+        self.enabled = enabled
+        self.store_path = store_path
+        self.load_seconds = None
+        self._fr = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._fr is not None
+
+    def get(self):
+        """The FaceRecognition instance, built on first call"""
+        if self._fr is None:
+            if not self.enabled:
+                raise FaceStackDisabled()
+            with self._lock:
+                if self._fr is None:
+                    started = time.perf_counter()
+                    from my_face_utils import FaceRecognition
+                    self._fr = FaceRecognition(self.store_path)
+                    self.load_seconds = time.perf_counter() - started
+                    print(f"✅ Face recognition loaded in {self.load_seconds:.2f}s")
+        return self._fr
+
+    def __getattr__(self, name):
+        # Only reached for attributes FaceService itself lacks
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+    def status(self):
+        return {'enabled': self.enabled, 'loaded': self.loaded,
+                'load_seconds': round(self.load_seconds, 3) if self.load_seconds is not None else None}
\ No newline at end of file
@@ -3,6 +3,7 @@ let video = document.getElementById('video');
 let canvas = document.getElementById('canvas');
 let context = canvas.getContext('2d');
 let testMode = false;
+let liveStreamId = null;
 
 // Initialize camera
 async function initCamera() {
@@ -50,6 +51,12 @@ document.getElementById('capture-btn').addEventListener('click', async function(
     }
 });
 
+// Classroom photo handler
+document.getElementById('classroom-btn').addEventListener('click', markAttendanceClassroom);
+
+// Live mode handler
+document.getElementById('live-btn').addEventListener('click', toggleLiveMode);
+
 // Test mode attendance marking
 async function markAttendanceTest() {
     const subject = document.getElementById('subject-select').value;
@@ -117,11 +124,7 @@ async function markAttendanceReal() {
         return;
     }
     
-    canvas.width = video.videoWidth;
-    canvas.height = video.videoHeight;
-    context.drawImage(video, 0, 0, canvas.width, canvas.height);
-    
-    const imageData = canvas.toDataURL('image/jpeg');
+    const frame = await captureFrame();
     const subject = document.getElementById('subject-select').value;
     
     const captureBtn = document.getElementById('capture-btn');
@@ -130,15 +133,13 @@ async function markAttendanceReal() {
     captureBtn.disabled = true;
     
     try {
+        const formData = new FormData();
+        formData.append('image', frame, 'frame.jpg');
+        formData.append('subject', subject);
+        
         const response = await fetch('/mark_attendance', {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                image: imageData,
-                subject: subject
-            })
+            body: formData
         });
         
         const result = await response.json();
@@ -164,6 +165,156 @@ async function markAttendanceReal() {
     }
 }
 
+// Capture the current video frame as a JPEG blob (sent as multipart, not base64)
+function captureFrame() {
+    canvas.width = video.videoWidth;
+    canvas.height = video.videoHeight;
+    context.drawImage(video, 0, 0, canvas.width, canvas.height);
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.92));
+}
+
+// Classroom mode: recognize every face in one photo
+async function markAttendanceClassroom() {
+    if (!videoStream) {
+        showMessage('Camera not available', 'error');
+        return;
+    }
+    
+    const frame = await captureFrame();
+    const subject = document.getElementById('subject-select').value;
+    
+    const classroomBtn = document.getElementById('classroom-btn');
+    const originalText = classroomBtn.textContent;
+    classroomBtn.textContent = 'Recognizing...';
+    classroomBtn.disabled = true;
+    
+    try {
+        const formData = new FormData();
+        formData.append('image', frame, 'classroom.jpg');
+        formData.append('subject', subject);
+        formData.append('mode', 'classroom');
+        
+        const response = await fetch('/mark_attendance', {
+            method: 'POST',
+            body: formData
+        });
+        
+        const result = await response.json();
+        
+        showMessage(result.message, result.success ? 'success' : 'error');
+        (result.faces || []).filter(face => face.student_id).forEach(face => {
+            addAttendanceRecord({
+                student_id: face.student_id,
+                student_name: face.student_name,
+                subject: subject,
+                time: new Date().toLocaleTimeString(),
+                confidence: face.confidence
+            });
+        });
+    } catch (error) {
+        showMessage('Error marking attendance', 'error');
+        console.error('Attendance error:', error);
+    } finally {
+        classroomBtn.textContent = originalText;
+        classroomBtn.disabled = false;
+    }
+}
+
+// Live mode: push camera frames continuously, the server tracks faces
+async function toggleLiveMode() {
+    const liveBtn = document.getElementById('live-btn');
+    
+    if (liveStreamId) {
+        const streamId = liveStreamId;
+        liveStreamId = null;
+        liveBtn.textContent = 'Start Live Mode';
+        
+        const response = await fetch(`/stream/${streamId}/stop`, { method: 'POST' });
+        const result = await response.json();
+        if (result.success) {
+            showMessage(`Live mode stopped: ${result.stats.students_marked} student(s) marked over ${result.stats.frames} frames`, 'success');
+        }
+        return;
+    }
+    
+    if (!videoStream) {
+        showMessage('Camera not available', 'error');
+        return;
+    }
+    
+    const subject = document.getElementById('subject-select').value;
+    const response = await fetch('/stream/start', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ subject: subject })
+    });
+    const result = await response.json();
+    
+    if (!result.success) {
+        showMessage(result.message, 'error');
+        return;
+    }
+    
+    liveStreamId = result.stream_id;
+    liveBtn.textContent = 'Stop Live Mode';
+    showMessage('Live mode started. Students are marked as they walk in.', 'success');
+    pushLiveFrames(liveStreamId, subject);
+}
+
+function endLiveMode(streamId, message) {
+    if (liveStreamId !== streamId) {
+        return;
+    }
+    liveStreamId = null;
+    document.getElementById('live-btn').textContent = 'Start Live Mode';
+    showMessage(message, 'error');
+}
+
+async function pushLiveFrames(streamId, subject) {
+    while (liveStreamId === streamId) {
+        try {
+            const frame = await captureFrame();
+            const response = await fetch(`/stream/${streamId}/frame`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'image/jpeg',
+                },
+                body: frame
+            });
+            
+            if (response.status === 503 || response.status === 429) {
+                const retryAfter = parseInt(response.headers.get('Retry-After') || '1', 10);
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                continue;
+            }
+            
+            // Anything else that is not a JSON answer (unknown stream, server
+            // error, logged out) will not get better by posting more frames
+            const isJson = (response.headers.get('Content-Type') || '').includes('application/json');
+            if (!response.ok || !isJson) {
+                endLiveMode(streamId, `Live mode stopped: server answered ${response.status}`);
+                return;
+            }
+            
+            const result = await response.json();
+            (result.marked || []).forEach(student => {
+                addAttendanceRecord({
+                    student_id: student.student_id,
+                    student_name: student.student_name,
+                    subject: subject,
+                    time: new Date().toLocaleTimeString(),
+                    confidence: 'Live'
+                });
+            });
+        } catch (error) {
+            console.error('Live frame error:', error);
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+}
+
 // Add attendance record to the list
 function addAttendanceRecord(record) {
     const recordsContainer = document.getElementById('attendance-records');
@@ -235,6 +386,9 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // Clean up camera when leaving page
 window.addEventListener('beforeunload', function() {
+    if (liveStreamId) {
+        navigator.sendBeacon(`/stream/${liveStreamId}/stop`);
+    }
     if (videoStream) {
         videoStream.getTracks().forEach(track => track.stop());
     }
@@ -0,0 +1,88 @@
+# frame_cache.py - Near-duplicate frame suppression for recognition routes
+import threading
+import time
+from collections import OrderedDict
+
+
+def frame_hash(image_bytes):
+    """64-bit difference hash of an encoded frame, or None if it does not decode.
+
+    The JPEG is decoded straight to 1/8 grayscale, so hashing a webcam
+    frame costs a small fraction of one detection pass.
+    """
+    import cv2  # deferred, like the rest of the face stack, until a frame arrives
+    import numpy as np
+    data = np.frombuffer(image_bytes, np.uint8)
+    gray = cv2.imdecode(data, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class FrameCache:
+    """Recent recognition results per session, looked up by frame similarity.
+
+    Each session keeps its last ``max_entries`` frame hashes for
+    ``ttl`` seconds. A frame within ``threshold`` differing hash bits of
+    one of them, under the same context (route, subject, profile), gets
+    that frame's result back instead of another recognition pass.
+    ``ttl=0`` disables the cache. Two people framed alike against the same
+    background can be only a few bits apart, so callers should only cache
+    results that identified nobody.
+    """
+
+    def __init__(self, threshold=1, ttl=10.0, max_entries=4, max_sessions=1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def get(self, session_key, context, frame):
+        """Cached result for a near-duplicate of ``frame``, else None"""
+        if not self.enabled or frame is None:
+            return None
+        now = time.time()
+        with self._lock:
+            entries = self._sessions.get(session_key, [])
+            entries[:] = [entry for entry in entries if now - entry[0] <= self.ttl]
+            for _, entry_context, entry_frame, result in reversed(entries):
+                if entry_context == context and hamming(entry_frame, frame) <= self.threshold:
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, session_key, context, frame, result):
+        if not self.enabled or frame is None:
+            return
+        with self._lock:
+            entries = self._sessions.pop(session_key, [])
+            entries.append((time.time(), context, frame, result))
+            self._sessions[session_key] = entries[-self.max_entries:]
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def clear(self, session_key):
+        with self._lock:
+            self._sessions.pop(session_key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                    'sessions': len(self._sessions), 'threshold': self.threshold, 'ttl': self.ttl}
\ No newline at end of file
@@ -0,0 +1,343 @@
+# gallery.py - Vectorized face gallery for batched matching
+from collections import OrderedDict
+
+import numpy as np
+from face_index import BruteForceIndex, robust_centroid
+
+
+class FaceGallery:
+    """Enrolled face encodings kept in one contiguous float32 matrix.
+
+    Row ``i`` of the matrix belongs to the user in ``self._codes[i]``.
+    Removed rows are tombstoned (code ``-1``) and reclaimed by ``compact``.
+    Searches only score the rows the attached index proposes, or the rows
+    of a roster (see ``roster_rows``) when one is given.
+    """
+
+    def __init__(self, dim=128, capacity=256, index=None, max_rosters=64):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._sq_norms = np.zeros(capacity, dtype=np.float32)
+        self._codes = np.full(capacity, -1, dtype=np.int32)
+        self._keys = [None] * capacity
+        self._size = 0
+        self._dead = 0
+        self._key_rows = {}
+        self._user_codes = {}
+        self._user_ids = []
+        self._user_counts = []
+        self._groups = None
+        self._rosters = OrderedDict()
+        self.max_rosters = max_rosters
+        self.auto_compact = True
+        self.index = index or BruteForceIndex()
+        self.index.bind(self)
+
+    def __len__(self):
+        return self._size - self._dead
+
+    def __contains__(self, key):
+        return key in self._key_rows
+
+    @property
+    def user_ids(self):
+        """User ids that currently have at least one encoding"""
+        return [uid for uid, n in zip(self._user_ids, self._user_counts) if n > 0]
+
+    def live_rows(self):
+        """Row numbers that hold a live encoding"""
+        return np.flatnonzero(self._codes[:self._size] >= 0)
+
+    def vectors(self, rows):
+        """Encodings stored at ``rows``"""
+        return self._matrix[rows]
+
+    def codes(self, rows):
+        """Internal user codes stored at ``rows`` (-1 for tombstones)"""
+        return self._codes[rows]
+
+    def attach(self, matrix):
+        """Score against ``matrix`` (e.g. a read-only ``np.memmap``) in place.
+
+        Existing rows must be a prefix of ``matrix``; further rows become
+        visible through ``add_row``. Rows are never moved afterwards, so
+        automatic compaction is switched off and the owner of the matrix
+        is expected to rebuild the gallery after compacting it.
+        """
+        extra = len(matrix) - len(self._codes)
+        if extra > 0:
+            extra = max(extra, len(self._codes))
+            self._sq_norms = np.concatenate((self._sq_norms, np.zeros(extra, dtype=np.float32)))
+            self._codes = np.concatenate((self._codes, np.full(extra, -1, dtype=np.int32)))
+            self._keys.extend([None] * extra)
+        self._matrix = matrix
+        self.auto_compact = False
+
+    def add_row(self, row, key, user_id):
+        """Register a row that already holds its encoding in the attached matrix"""
+        self.remove(key)
+        vector = np.asarray(self._matrix[row], dtype=np.float32)
+        code = self._user_code(user_id)
+        self._sq_norms[row] = float(vector @ vector)
+        self._codes[row] = code
+        self._keys[row] = key
+        self._key_rows[key] = row
+        self._user_counts[code] += 1
+        if row >= self._size:
+            self._dead += row - self._size  # rows skipped over were never registered
+            self._size = row + 1
+        else:
+            self._dead -= 1
+        self._changed()
+        self.index.add(row, vector)
+        return row
+
+    def _changed(self):
+        """Drop everything derived from the set of live rows"""
+        self._groups = None
+        self._rosters.clear()
+
+    def _user_code(self, user_id):
+        code = self._user_codes.get(user_id)
+        if code is None:
+            code = len(self._user_ids)
+            self._user_codes[user_id] = code
+            self._user_ids.append(user_id)
+            self._user_counts.append(0)
+        return code
+
+    def _grow(self, needed):
+        capacity = len(self._codes)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        sq_norms = np.zeros(new_capacity, dtype=np.float32)
+        sq_norms[:self._size] = self._sq_norms[:self._size]
+        codes = np.full(new_capacity, -1, dtype=np.int32)
+        codes[:self._size] = self._codes[:self._size]
+        self._matrix, self._sq_norms, self._codes = matrix, sq_norms, codes
+        self._keys.extend([None] * (new_capacity - capacity))
+
+    def add(self, key, user_id, encoding):
+        """Add or replace the encoding stored under ``key``"""
+        vector = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        row = self._key_rows.get(key)
+        if row is not None:
+            self._user_counts[self._codes[row]] -= 1
+        else:
+            self._grow(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._key_rows[key] = row
+            self._keys[row] = key
+
+        code = self._user_code(user_id)
+        self._matrix[row] = vector
+        self._sq_norms[row] = float(vector @ vector)
+        self._codes[row] = code
+        self._user_counts[code] += 1
+        self._changed()
+        self.index.add(row, vector)
+        return row
+
+    def remove(self, key):
+        """Tombstone the encoding stored under ``key``"""
+        row = self._key_rows.pop(key, None)
+        if row is None:
+            return False
+        self._user_counts[self._codes[row]] -= 1
+        self._codes[row] = -1
+        self._keys[row] = None
+        self._dead += 1
+        self._changed()
+        self.index.remove(row)
+        if self.auto_compact and self._dead > max(64, self._size // 4):
+            self.compact()
+        return True
+
+    def remove_user(self, user_id):
+        """Tombstone every encoding belonging to ``user_id``"""
+        code = self._user_codes.get(user_id)
+        if code is None or self._user_counts[code] == 0:
+            return 0
+        rows = np.flatnonzero(self._codes[:self._size] == code)
+        for row in rows:
+            del self._key_rows[self._keys[row]]
+            self._keys[row] = None
+            self.index.remove(int(row))
+        self._codes[rows] = -1
+        self._user_counts[code] = 0
+        self._dead += len(rows)
+        self._changed()
+        if self.auto_compact and self._dead > max(64, self._size // 4):
+            self.compact()
+        return len(rows)
+
+    def compact(self):
+        """Drop tombstoned rows so the live rows are contiguous again"""
+        live = self.live_rows()
+        n = len(live)
+        self._matrix[:n] = self._matrix[live]
+        self._sq_norms[:n] = self._sq_norms[live]
+        self._codes[:n] = self._codes[live]
+        self._codes[n:self._size] = -1
+        keys = [self._keys[row] for row in live]
+        self._keys[:self._size] = keys + [None] * (self._size - n)
+        self._key_rows = {key: row for row, key in enumerate(keys)}
+        self._size = n
+        self._dead = 0
+        self._changed()
+        self.index.reset()
+
+    def roster_rows(self, key, user_ids):
+        """Rows of ``user_ids``, a sub-index to search instead of the whole gallery.
+
+        Cached under ``key``, which must change whenever the roster does
+        (e.g. carry its data version), until any encoding is added or
+        removed. The ``max_rosters`` most recently used are kept.
+        """
+        rows = self._rosters.get(key)
+        if rows is not None:
+            self._rosters.move_to_end(key)
+            return rows
+        codes = [self._user_codes[user_id] for user_id in user_ids if user_id in self._user_codes]
+        rows = np.flatnonzero(np.isin(self._codes[:self._size], codes))
+        self._rosters[key] = rows
+        if len(self._rosters) > self.max_rosters:
+            self._rosters.popitem(last=False)
+        return rows
+
+    def count(self, user_id):
+        """Number of encodings registered for ``user_id``"""
+        code = self._user_codes.get(user_id)
+        return 0 if code is None else self._user_counts[code]
+
+    def outliers(self, max_distance=0.45, user_id=None):
+        """Encodings far from their user's robust centroid, farthest first.
+
+        Returns ``(key, user_id, distance)`` for every encoding of
+        ``user_id`` (default: all users) more than ``max_distance`` from
+        the centroid, e.g. an image of someone else or a badly lit frame.
+        """
+        order, starts, users = self._user_groups(None)
+        flagged = []
+        for start, end, uid in zip(starts, list(starts[1:]) + [len(order)], users):
+            if user_id is not None and uid != user_id:
+                continue
+            rows = order[start:end]
+            if len(rows) < 2:
+                continue
+            _, distances = robust_centroid(self._matrix[rows], max_distance)
+            flagged.extend((self._keys[row], uid, float(d)) for row, d in zip(rows, distances) if d > max_distance)
+        return sorted(flagged, key=lambda item: -item[2])
+
+    def distances(self, probe):
+        """Euclidean distance from ``probe`` to every row (inf for tombstones)"""
+        probe = np.asarray(probe, dtype=np.float32).reshape(self.dim)
+        return self.distance_matrix(probe[None, :])[0]
+
+    def distance_matrix(self, probes, rows=None):
+        """Distances from each of ``probes`` (F x dim) to ``rows`` (default all) as F x N"""
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.dim)
+        if rows is None:
+            matrix, sq_norms, codes = (self._matrix[:self._size], self._sq_norms[:self._size],
+                                       self._codes[:self._size])
+        else:
+            matrix, sq_norms, codes = self._matrix[rows], self._sq_norms[rows], self._codes[rows]
+        sq = sq_norms[None, :] - 2.0 * (probes @ matrix.T)
+        sq += np.einsum('ij,ij->i', probes, probes)[:, None]
+        np.maximum(sq, 0.0, out=sq)
+        dist = np.sqrt(sq, out=sq)
+        if self._dead:
+            dist[:, codes < 0] = np.inf
+        return dist
+
+    def _search(self, probes, rows=None, exclude=None):
+        """Candidate rows (``rows``, else the index's proposal; None for all) and their distances.
+
+        Rows of the users in ``exclude`` are dropped from the candidates.
+        """
+        if rows is None:
+            rows = self.index.candidates(probes)
+        if exclude:
+            codes = [self._user_codes[user_id] for user_id in exclude if user_id in self._user_codes]
+            rows = self.live_rows() if rows is None else np.asarray(rows)
+            rows = rows[~np.isin(self._codes[rows], codes)]
+        return rows, self.distance_matrix(probes, rows)
+
+    def _user_groups(self, rows):
+        """Columns of ``rows`` grouped by user for ``np.minimum.reduceat``"""
+        if rows is None and self._groups is not None:
+            return self._groups
+        codes = self._codes[:self._size] if rows is None else self._codes[rows]
+        live = np.flatnonzero(codes >= 0)
+        order = live[np.argsort(codes[live], kind='stable')]
+        sorted_codes = codes[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_codes)) + 1))
+        groups = order, starts, [self._user_ids[c] for c in sorted_codes[starts]] if len(order) else []
+        if rows is None:
+            self._groups = groups
+        return groups
+
+    def _per_user(self, dist, rows):
+        """Reduce F x R row distances to F x U closest distance per user"""
+        order, starts, users = self._user_groups(rows)
+        if len(order) == 0:
+            return [], np.empty((len(dist), 0), dtype=np.float32)
+        return users, np.minimum.reduceat(dist[:, order], starts, axis=1)
+
+    def best_per_user(self, probe, rows=None):
+        """Closest distance for each candidate user as ``(user_ids, distances)``"""
+        if len(self) == 0:
+            return [], np.empty(0, dtype=np.float32)
+        probe = np.asarray(probe, dtype=np.float32).reshape(1, self.dim)
+        rows, dist = self._search(probe, rows)
+        users, per_user = self._per_user(dist, rows)
+        return users, per_user[0]
+
+    def best_match(self, probe, rows=None):
+        """Closest enrolled user as ``(user_id, distance)``, among ``rows`` if given"""
+        if len(self) == 0:
+            return None, float('inf')
+        probe = np.asarray(probe, dtype=np.float32).reshape(1, self.dim)
+        rows, dist = self._search(probe, rows)
+        if dist.shape[1] == 0:
+            return None, float('inf')
+        best = int(np.argmin(dist[0]))
+        code = self._codes[best if rows is None else rows[best]]
+        if code < 0:
+            return None, float('inf')
+        return self._user_ids[code], float(dist[0, best])
+
+    def assign(self, probes, max_distance, rows=None, exclude=None):
+        """Match several probes at once, giving each user to at most one probe.
+
+        Pairs are accepted greedily from the closest distance upwards, so a
+        student seen twice in a classroom photo is only credited to the face
+        that resembles them most. Returns ``(user_id, distance)`` per probe,
+        with ``user_id`` None for faces left unmatched. ``rows`` restricts
+        the search as in ``best_match``; users in ``exclude`` (e.g. already
+        assigned by an earlier pass) are not candidates at all.
+        """
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.dim)
+        results = [(None, float('inf'))] * len(probes)
+        if len(self) == 0 or len(probes) == 0:
+            return results
+        rows, dist = self._search(probes, rows, exclude)
+        users, per_user = self._per_user(dist, rows)
+        if not users:
+            return results
+        results = [(None, float(d)) for d in per_user.min(axis=1)]
+
+        faces, cols = np.nonzero(per_user < max_distance)
+        order = np.argsort(per_user[faces, cols], kind='stable')
+        taken_faces, taken_users = set(), set()
+        for face, col in zip(faces[order], cols[order]):
+            if face in taken_faces or col in taken_users:
+                continue
+            taken_faces.add(face)
+            taken_users.add(col)
+            results[face] = (users[col], float(per_user[face, col]))
+        return results
\ No newline at end of file
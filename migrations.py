@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# migrations.py - Versioned schema migrations for attendance.db
+"""
+Migrations run in order, each once, inside the writer's BEGIN IMMEDIATE
+transaction, and are recorded in the schema_version table. Databases
+created before schema_version existed already hold some of these
+objects, so every migration must be idempotent (IF NOT EXISTS etc.).
+Append new migrations to MIGRATIONS; never edit one that has shipped.
+
+Sample accounts and attendance are not part of the schema; load them
+with the seed command.
+
+Usage:
+    python migrations.py migrate [attendance.db]
+    python migrations.py status [attendance.db]
+    python migrations.py seed [attendance.db]
+"""
+import sqlite3
+import sys
+import time
+
+import summaries
+
+
+def _create_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS faculty (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS students (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT,
+            face_registered BOOLEAN DEFAULT FALSE
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT,
+            subject TEXT,
+            date TEXT,
+            time TEXT,
+            marked_by TEXT,
+            FOREIGN KEY (student_id) REFERENCES students (id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_attendance_subject ON attendance(subject)')
+
+
+def _student_history_index(conn):
+    # Covers a student's history pages and summary; it also serves every
+    # lookup the old single-column student_id index did
+    conn.execute('DROP INDEX IF EXISTS idx_attendance_student_id')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_attendance_student_history
+                    ON attendance(student_id, date, time, id, subject, marked_by)''')
+
+
+def _enrollments(conn):
+    # A subject's roster, optionally split into sections ('' = no section)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS enrollments (
+            subject TEXT NOT NULL,
+            section TEXT NOT NULL DEFAULT '',
+            student_id TEXT NOT NULL REFERENCES students (id),
+            PRIMARY KEY (subject, section, student_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_enrollments_student ON enrollments(student_id)')
+
+
+# Bumps one entity's data version (see Database.data_versions). A new entity
+# starts at the current time in milliseconds rather than at 1, so a
+# recreated database file does not hand out ETags issued for the old one
+BUMP_VERSION = """INSERT INTO data_versions VALUES ({entity},
+                      CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+                  ON CONFLICT (entity) DO UPDATE SET version = version + 1;"""
+
+
+def _bumps(*entities):
+    return ''.join('\n        ' + BUMP_VERSION.format(entity=entity) for entity in entities) + '\n    '
+
+
+def _data_versions(conn):
+    # ETag versions of the entities routes cache by; triggers bump them in
+    # the same transaction as the write, whichever process makes it
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            entity TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    for row in ('NEW', 'OLD'):
+        attendance = ("'attendance'", f"'subject:' || IFNULL({row}.subject, '')",
+                      f"'student:' || IFNULL({row}.student_id, '')")
+        event = 'INSERT' if row == 'NEW' else 'DELETE'
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS attendance_version_{event.lower()}
+                          AFTER {event} ON attendance BEGIN{_bumps(*attendance)}END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS students_version_{event.lower()}
+                          AFTER {event} ON students BEGIN{_bumps(f"'student:' || {row}.id")}END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS enrollments_version_{event.lower()}
+                          AFTER {event} ON enrollments BEGIN{_bumps(f"'roster:' || {row}.subject")}END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS attendance_version_update AFTER UPDATE ON attendance
+                      BEGIN{_bumps("'attendance'", "'subject:' || IFNULL(OLD.subject, '')",
+                                   "'subject:' || IFNULL(NEW.subject, '')",
+                                   "'student:' || IFNULL(OLD.student_id, '')",
+                                   "'student:' || IFNULL(NEW.student_id, '')")}END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS students_version_update AFTER UPDATE ON students
+                      BEGIN{_bumps("'student:' || OLD.id", "'student:' || NEW.id")}END''')
+
+
+# (version, description, function(conn))
+MIGRATIONS = [
+    (1, 'faculty, students and attendance tables', _create_tables),
+    (2, 'attendance summary tables and triggers', summaries.install),
+    (3, 'covering index for student attendance history', _student_history_index),
+    (4, 'student enrollments per subject and section', _enrollments),
+    (5, 'NULL-safe attendance summary keys', summaries.reinstall),
+    (6, 'data versions maintained by triggers', _data_versions),
+]
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    """Highest applied migration, or 0 for a database without schema_version"""
+    try:
+        return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def migrate(conn):
+    """Apply pending migrations on ``conn`` (inside a write transaction); returns the versions applied"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at REAL NOT NULL
+        )
+    ''')
+    current = schema_version(conn)
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        apply(conn)
+        conn.execute('INSERT INTO schema_version VALUES (?, ?, ?)', (version, description, time.time()))
+        applied.append(version)
+    return applied
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in ('migrate', 'status', 'seed'):
+        print(__doc__)
+        return 1
+    from database import Database
+    db = Database(argv[2] if len(argv) > 2 else 'attendance.db')  # applies pending migrations
+    try:
+        if argv[1] == 'status':
+            with db.read() as conn:
+                rows = conn.execute('SELECT version, description, applied_at FROM schema_version '
+                                    'ORDER BY version').fetchall()
+            for version, description, applied_at in rows:
+                print(f"  {version:>3}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(applied_at))}  "
+                      f"{description}")
+        elif argv[1] == 'seed':
+            added = db.seed_sample_data()
+            print(f"✅ Sample data: {added['faculty']} faculty, {added['students']} students, "
+                  f"{added['attendance']} attendance records added")
+        print(f"✅ Schema at version {LATEST}")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
\ No newline at end of file
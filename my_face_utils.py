@@ -1,80 +1,107 @@
 # my_face_utils.py - CORRECTED VERSION
-import face_recognition
-import cv2
-import numpy as np
 import sqlite3
-from datetime import datetime
-import os
-import pickle
+import threading
+from functools import wraps
+from encoding_store import EncodingStore
+from gallery import FaceGallery
+from detection import detect_faces, encode_faces
+from face_index import make_index
+from config import Config
+
+def _locked(method):
+    """Run ``method`` holding the recognizer's gallery lock"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class FaceRecognition:
-    def __init__(self):
-        self.face_encodings = {}
-        self.encoding_file = 'face_encodings.pkl'
+    def __init__(self, store_path='face_encodings'):
+        self.encoding_file = 'face_encodings.pkl'  # legacy pickle, migrated on first start
+        self.store = EncodingStore(store_path)
+        # The gallery is updated in place by refresh(); with RECOGNITION_WORKERS=0
+        # request threads share it, so updates and searches take turns
+        self._lock = threading.RLock()
+        self.gallery = self._new_gallery()
         self.load_encodings()
     
+    def _new_gallery(self):
+        """Empty gallery using the configured matching index"""
+        index = make_index(Config.FACE_INDEX, Config.FACE_INDEX_NLIST, Config.FACE_INDEX_NPROBE,
+                           Config.FACE_INDEX_TOP_K, Config.FACE_INDEX_MEDOIDS, Config.FACE_OUTLIER_DISTANCE)
+        return FaceGallery(index=index)
+    
+    @_locked
     def load_encodings(self):
-        """Load face encodings from file"""
+        """Open the encoding store and map its matrix into the gallery"""
         try:
-            if os.path.exists(self.encoding_file):
-                with open(self.encoding_file, 'rb') as f:
-                    self.face_encodings = pickle.load(f)
-                print(f"✅ Loaded {len(self.face_encodings)} face encodings")
-            else:
-                print("ℹ️ No existing face encodings file found")
+            self.store.open_migrating(self.encoding_file)
+            gallery = self._new_gallery()
+            gallery.attach(self.store.matrix())
+            for record in sorted(self.store.entries.values(), key=lambda r: r['row']):
+                gallery.add_row(record['row'], record['key'], record['user_id'])
+            self.gallery = gallery
+            print(f"✅ Loaded {len(self.gallery)} face encodings")
         except Exception as e:
             print(f"❌ Error loading encodings: {e}")
-            self.face_encodings = {}
+            self.gallery = self._new_gallery()
     
-    def save_encodings(self):
-        """Save face encodings to file"""
-        try:
-            with open(self.encoding_file, 'wb') as f:
-                pickle.dump(self.face_encodings, f)
-            print(f"💾 Saved {len(self.face_encodings)} face encodings")
-        except Exception as e:
-            print(f"❌ Error saving encodings: {e}")
+    @_locked
+    def refresh(self):
+        """Pick up encodings registered or removed by any worker since the last check"""
+        change = self.store.changed()
+        if change == 'reopen':
+            self.load_encodings()
+        elif change == 'append':
+            records = self.store.read_changes()
+            if any('row' in record for record in records):
+                self.gallery.attach(self.store.matrix())
+            for record in records:
+                if 'del' in record:
+                    self.gallery.remove(record['del'])
+                else:
+                    self.gallery.add_row(record['row'], record['key'], record['user_id'])
+    
+    @_locked
+    def compact_encodings(self):
+        """Drop tombstoned rows from the store once enough have piled up"""
+        if self.store.needs_compaction():
+            self.store.compact()
+            self.load_encodings()
     
-    def register_face(self, image, user_id, user_name, image_index=0):
+    def register_face(self, image, user_id, user_name, image_index=0, profile='accurate'):
         """
         CORRECTED: Register a new face
         """
         try:
             print(f"🔍 Registering face image {image_index + 1} for {user_name} ({user_id})")
             
-            # Convert BGR to RGB (IMPORTANT: face_recognition uses RGB)
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # ✅ CORRECT: Call face_locations from face_recognition module
-            face_locations = face_recognition.face_locations(rgb_image)
+            # Detect on the (optionally downscaled) frame, boxes come back in full-frame coordinates
+            rgb_image, face_locations = detect_faces(image, profile)
             print(f"✅ Found {len(face_locations)} face(s)")
             
             if len(face_locations) == 0:
                 print("❌ No face detected in the image")
                 return False
             
-            # ✅ CORRECT: Get face encodings
-            face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
+            # Only the first face is stored, so only encode that one
+            face_encodings = encode_faces(rgb_image, face_locations[:1], profile)
             
             if len(face_encodings) == 0:
                 print("❌ Could not encode face")
                 return False
             
-            # Store the encoding
+            # Append the encoding to the store and map it into the gallery
             encoding_key = f"{user_id}_{image_index}"
-            self.face_encodings[encoding_key] = {
-                'encoding': face_encodings[0],
-                'name': user_name,
-                'user_id': user_id,
-                'timestamp': datetime.now()
-            }
+            self.store.append(encoding_key, user_id, user_name, face_encodings[0])
+            self.refresh()
+            if encoding_key in self.inconsistent_faces(user_id):
+                print(f"⚠️ Face image {image_index + 1} of {user_id} does not match the other images")
             
             # Save to database
             self._save_to_database(user_id, user_name, face_encodings[0])
             
-            # Save to file
-            self.save_encodings()
-            
             print(f"🎉 Face successfully registered for {user_name}")
             return True
             
@@ -104,44 +131,42 @@ class FaceRecognition:
         except Exception as e:
             print(f"❌ Database save error: {e}")
     
-    def recognize_face(self, image):
+    def recognize_face(self, image, profile='accurate', roster=None, fallback=True):
         """
-        Recognize a face in the image
+        Recognize a face in the image.
+        With a ``roster`` (cache key, student ids), only those students are
+        searched, then the whole gallery if ``fallback`` and none matched.
         """
         try:
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Detect faces using face_recognition module
-            face_locations = face_recognition.face_locations(rgb_image)
+            rgb_image, face_locations = detect_faces(image, profile)
             
             if len(face_locations) == 0:
                 return None, 0
             
-            # Get encoding
-            face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
+            # Get encoding (only the first face is matched)
+            face_encodings = encode_faces(rgb_image, face_locations[:1], profile)
             
             if len(face_encodings) == 0:
                 return None, 0
             
             unknown_encoding = face_encodings[0]
             
-            # Compare with known faces
-            best_match = None
-            best_distance = 1.0
-            
-            for key, data in self.face_encodings.items():
-                known_encoding = data['encoding']
-                distance = face_recognition.face_distance([known_encoding], unknown_encoding)[0]
-                
-                if distance < best_distance:
-                    best_distance = distance
-                    best_match = data
+            # Compare with the roster's (or all) known faces in one batched operation
+            with self._lock:
+                self.refresh()
+                best_match, best_distance = None, float('inf')
+                if roster:
+                    best_match, best_distance = self.gallery.best_match(unknown_encoding,
+                                                                        self.gallery.roster_rows(*roster))
+                if not roster or (fallback and not best_distance < 0.4):
+                    best_match, best_distance = self.gallery.best_match(unknown_encoding)
+            if best_match is None:
+                best_distance = 1.0
             
             confidence = 1 - best_distance
             
             if best_match and confidence > 0.6:
-                return best_match['user_id'], confidence
+                return best_match, confidence
             else:
                 return None, confidence
                 
@@ -149,18 +174,76 @@ class FaceRecognition:
             print(f"❌ Recognition error: {e}")
             return None, 0
     
+    def recognize_faces(self, image, confidence_threshold=0.6, profile='accurate', roster=None, fallback=True):
+        """
+        Recognize every face in a classroom photo.
+        All faces are encoded in one call and matched together so that each
+        enrolled student is assigned to at most one face.
+        """
+        try:
+            rgb_image, face_locations = detect_faces(image, profile)
+            if len(face_locations) == 0:
+                return []
+            
+            face_encodings = encode_faces(rgb_image, face_locations, profile)
+            matches = self.match_encodings(face_encodings, confidence_threshold, roster, fallback)
+            
+            results = []
+            for (top, right, bottom, left), (user_id, confidence) in zip(face_locations, matches):
+                results.append({
+                    'location': {'top': top, 'right': right, 'bottom': bottom, 'left': left},
+                    'student_id': user_id,
+                    'confidence': confidence
+                })
+            print(f"✅ Classroom photo: {len(results)} face(s), "
+                  f"{sum(1 for r in results if r['student_id'])} recognized")
+            return results
+            
+        except Exception as e:
+            print(f"❌ Classroom recognition error: {e}")
+            return []
+    
+    @_locked
+    def match_encodings(self, encodings, confidence_threshold=0.6, roster=None, fallback=True):
+        """Match already-computed encodings as ``(user_id, confidence)`` pairs.
+        
+        With a ``roster``, faces are matched among its students first; if
+        ``fallback``, faces left over are then matched against the rest of
+        the gallery, without the students already assigned.
+        """
+        self.refresh()
+        max_distance = 1 - confidence_threshold
+        if not roster:
+            matches = self.gallery.assign(encodings, max_distance)
+        else:
+            matches = self.gallery.assign(encodings, max_distance, self.gallery.roster_rows(*roster))
+            missing = [i for i, (user_id, _) in enumerate(matches) if user_id is None]
+            if fallback and missing:
+                taken = {user_id for user_id, _ in matches if user_id}
+                campus = self.gallery.assign([encodings[i] for i in missing], max_distance, exclude=taken)
+                for i, (user_id, distance) in zip(missing, campus):
+                    if user_id:
+                        matches[i] = (user_id, distance)
+        return [(user_id, max(0.0, 1 - distance)) for user_id, distance in matches]
+    
+    @_locked
+    def inconsistent_faces(self, user_id):
+        """Keys of the user's encodings that look like a different face than the rest"""
+        self.refresh()
+        return [key for key, _, _ in self.gallery.outliers(Config.FACE_OUTLIER_DISTANCE, user_id)]
+    
+    @_locked
     def get_user_encodings_count(self, user_id):
         """Count registered face encodings for a user"""
-        count = 0
-        for key in self.face_encodings.keys():
-            if key.startswith(f"{user_id}_"):
-                count += 1
-        return count
+        self.refresh()
+        return self.gallery.count(user_id)
     
+    @_locked
     def remove_user_faces(self, user_id):
         """Remove all face encodings for a user"""
-        keys_to_remove = [key for key in self.face_encodings.keys() if key.startswith(f"{user_id}_")]
-        for key in keys_to_remove:
-            del self.face_encodings[key]
-        self.save_encodings()
+        self.refresh()
+        keys_to_remove = [key for key, record in self.store.entries.items() if record['user_id'] == user_id]
+        self.store.remove(keys_to_remove)
+        self.refresh()
+        self.compact_encodings()
         print(f"🗑️ Removed {len(keys_to_remove)} face encodings for user {user_id}")
\ No newline at end of file
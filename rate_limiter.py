@@ -0,0 +1,73 @@
+# rate_limiter.py - Sliding-window-counter rate limiting
+import time
+
+
+class RateLimiter:
+    """Sliding-window-counter limiter on top of a cache backend's incr().
+
+    Each (rule, principal) pair keeps one counter per fixed window. A
+    request is allowed while
+
+        previous_window_count * (1 - elapsed_fraction) + current_window_count
+
+    stays within the limit, which approximates a true sliding window with
+    two counters instead of a list of timestamps. Counters expire after
+    two windows, so idle keys disappear from the store on their own (and
+    an LRUCache store bounds the number of keys as well). Rejected
+    requests are not counted against any of the request's principals.
+
+    ``rules`` maps a rule name (usually an endpoint) to
+    ``{principal_kind: (max_requests, window_seconds)}``.
+    """
+
+    def __init__(self, store, rules=None):
+        self.store = store
+        self.rules = rules or {}
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key, max_requests, window, now=None):
+        """Count one request for ``key``; returns (allowed, retry_after_seconds)"""
+        now = time.time() if now is None else now
+        current = int(now // window)
+        elapsed = now / window - current
+        count = self.store.incr(f'rl:{key}:{current}', ttl=2 * window)
+        previous = self.store.get(f'rl:{key}:{current - 1}') or 0
+        if previous * (1 - elapsed) + count <= max_requests:
+            self.allowed += 1
+            return True, 0
+        self.store.incr(f'rl:{key}:{current}', -1, ttl=2 * window)
+        self.rejected += 1
+        # The estimate drops below the limit once enough of the previous window slides out
+        if previous and count <= max_requests:
+            retry_after = (1 - (max_requests - count) / previous - elapsed) * window
+        else:
+            retry_after = (1 - elapsed) * window
+        return False, max(1, int(retry_after + 0.999))
+
+    def check(self, rule, principals, now=None):
+        """Apply every limit of ``rule`` to the matching ``principals``.
+
+        ``principals`` maps a kind ('ip', 'user', 'camera') to its value;
+        kinds without a value are skipped. Returns (allowed, retry_after).
+        A rejection takes back the hits already counted for the other
+        principals, so being throttled on one key does not use up the rest.
+        """
+        now = time.time() if now is None else now
+        counted = []
+        for kind, (max_requests, window) in self.rules.get(rule, {}).items():
+            principal = principals.get(kind)
+            if principal is None:
+                continue
+            key = f'{rule}:{kind}:{principal}'
+            allowed, retry_after = self.hit(key, max_requests, window, now)
+            if not allowed:
+                for key, window in counted:
+                    self.store.incr(f'rl:{key}:{int(now // window)}', -1, ttl=2 * window)
+                    self.allowed -= 1
+                return False, retry_after
+            counted.append((key, window))
+        return True, 0
+
+    def stats(self):
+        return {'allowed': self.allowed, 'rejected': self.rejected}
\ No newline at end of file
@@ -0,0 +1,254 @@
+# recognition_service.py - Off-request face recognition worker pool
+import math
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+# Per-process FaceRecognition, built once by the pool initializer
+_fr = None
+
+
+class RecognitionBusy(Exception):
+    """Raised when the job queue is full; carries a Retry-After hint in seconds"""
+
+    def __init__(self, retry_after):
+        super().__init__('Recognition queue is full')
+        self.retry_after = retry_after
+
+
+class RecognitionTimeout(Exception):
+    """Raised when a job does not finish within the per-job timeout"""
+
+
+def _init_worker():
+    """Load the dlib models and the face gallery once per worker process"""
+    global _fr
+    from my_face_utils import FaceRecognition
+    _fr = FaceRecognition()
+
+
+def _decode(image_bytes, profile):
+    from detection import decode_image
+    return decode_image(image_bytes, profile)
+
+
+def recognize(fr, image_bytes, profile='accurate', roster=None, fallback=True):
+    img = _decode(image_bytes, profile)
+    if img is None:
+        return {'valid': False}
+    user_id, confidence = fr.recognize_face(img, profile, roster, fallback)
+    return {'valid': True, 'user_id': user_id, 'confidence': float(confidence)}
+
+
+def recognize_classroom(fr, image_bytes, confidence_threshold=0.6, profile='accurate', roster=None, fallback=True):
+    from detection import get_profile
+    img = _decode(image_bytes, profile)
+    if img is None:
+        return {'valid': False}
+    faces = fr.recognize_faces(img, confidence_threshold, profile, roster, fallback)
+    # Report boxes in the coordinates of the uploaded image
+    reduction = get_profile(profile).decode_reduction
+    for face in faces:
+        face['location'] = {side: value * reduction for side, value in face['location'].items()}
+    return {'valid': True, 'faces': faces}
+
+
+def register(fr, image_bytes, user_id, user_name, image_index=0, profile='accurate'):
+    img = _decode(image_bytes, profile)
+    if img is None:
+        return {'valid': False}
+    success = fr.register_face(img, user_id, user_name, image_index, profile)
+    return {'valid': True, 'success': success, 'registered_count': fr.get_user_encodings_count(user_id)}
+
+
+def track_frame(fr, image_bytes, tracker):
+    """Advance a stream's FaceTracker by one frame; returns the updated tracker"""
+    img = _decode(image_bytes, tracker.profile)
+    if img is None:
+        return {'valid': False, 'tracker': tracker}
+    result = tracker.process_frame(fr, img)
+    return dict(result, valid=True, tracker=tracker)
+
+
+def warm_up(fr, profile='accurate'):
+    """Dummy detect+encode on a blank frame, so the first real request does not pay for it.
+
+    Loads the recognizer's gallery, the dlib models and cv2. The blank
+    frame has no faces, so a fixed box is encoded to exercise the
+    landmark and encoder networks as well.
+    """
+    import numpy as np
+    from detection import detect_faces, encode_faces
+    gallery_size = len(fr.gallery)
+    rgb_image, locations = detect_faces(np.zeros((120, 160, 3), np.uint8), profile)
+    encode_faces(rgb_image, locations or [(20, 120, 100, 40)], profile)
+    return {'valid': True, 'gallery_size': gallery_size}
+
+
+JOBS = {
+    'recognize': recognize,
+    'recognize_classroom': recognize_classroom,
+    'register': register,
+    'track_frame': track_frame,
+    'warm_up': warm_up,
+}
+
+
+def _run_job(name, args):
+    """Worker entry point: returns the result plus start/finish timestamps"""
+    started = time.time()
+    result = JOBS[name](_fr, *args)
+    return result, started, time.time()
+
+
+class RecognitionService:
+    """Bounded job queue in front of a process pool of face workers.
+
+    At most ``workers + max_queue`` jobs are accepted at once; further
+    submissions raise ``RecognitionBusy`` so the route can answer 503
+    instead of tying up a Flask worker. With ``workers=0`` jobs run inline
+    on the calling thread against ``inline_fr``, which keeps development
+    servers and tests single-process.
+    """
+
+    def __init__(self, workers=2, max_queue=8, timeout=10.0, inline_fr=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.inline_fr = inline_fr
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max(1, workers) + max_queue)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1000)
+        self._runs = deque(maxlen=1000)
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'timed_out': 0}
+        self.in_flight = 0
+        self.warm_state = 'cold'
+        self.warm_up_seconds = None
+        self.warm_up_error = None
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker)
+        return self._executor
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def retry_after(self):
+        """Seconds until a slot is likely to free up"""
+        avg_run = sum(self._runs) / len(self._runs) if self._runs else 1.0
+        return max(1, math.ceil(avg_run * self.in_flight / max(1, self.workers)))
+
+    def run(self, name, *args):
+        """Run job ``name`` and wait for its result"""
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise RecognitionBusy(self.retry_after())
+        with self._lock:
+            self.counters['submitted'] += 1
+            self.in_flight += 1
+        submitted = time.time()
+
+        if self.workers == 0:
+            try:
+                started = time.time()
+                result = JOBS[name](self.inline_fr, *args)
+                self._finished(submitted, (result, started, time.time()))
+                return result
+            except Exception:
+                self._finished(submitted, None)
+                raise
+
+        future = self._pool().submit(_run_job, name, args)
+        future.add_done_callback(
+            lambda f: self._finished(submitted, None if f.cancelled() or f.exception() else f.result()))
+        try:
+            result, _, _ = future.result(timeout=self.timeout)
+            return result
+        except FutureTimeout:
+            self._count('timed_out')
+            raise RecognitionTimeout(f'Recognition job {name} exceeded {self.timeout}s')
+
+    def warm_up(self, profile='accurate'):
+        """Run the warm-up job inline, or once per pool worker, and wait for it.
+
+        Warm-up jobs are submitted together so the pool starts all its
+        workers at once; they bypass the job queue and its counters.
+        """
+        started = time.time()
+        if self.workers == 0:
+            JOBS['warm_up'](self.inline_fr, profile)
+        else:
+            futures = [self._pool().submit(_run_job, 'warm_up', (profile,)) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+        return time.time() - started
+
+    def start_warm_up(self, profile='accurate'):
+        """Warm up on a background thread unless already done or under way; returns the warm-up state"""
+        with self._lock:
+            if self.warm_state in ('cold', 'failed'):
+                self.warm_state = 'warming'
+                threading.Thread(target=self._warm_up_background, args=(profile,), daemon=True).start()
+            return self.warm_state
+
+    def _warm_up_background(self, profile):
+        try:
+            seconds = self.warm_up(profile)
+        except Exception as e:
+            print(f"❌ Recognition warm-up failed: {e}")
+            with self._lock:
+                self.warm_state, self.warm_up_error = 'failed', str(e)
+            return
+        print(f"✅ Recognition warmed up in {seconds:.2f}s")
+        with self._lock:
+            self.warm_state, self.warm_up_seconds, self.warm_up_error = 'ready', seconds, None
+
+    def _finished(self, submitted, outcome):
+        """Release the job's slot and record its queue wait and run time"""
+        with self._lock:
+            self.in_flight -= 1
+            if outcome is None:
+                self.counters['failed'] += 1
+            else:
+                _, started, finished = outcome
+                self.counters['completed'] += 1
+                self._waits.append(max(0.0, started - submitted))
+                self._runs.append(finished - started)
+        self._slots.release()
+
+    def stats(self):
+        """Queue depth and wait/run time figures for sizing the pool"""
+        with self._lock:
+            waits = sorted(self._waits)
+            runs = list(self._runs)
+            in_flight = self.in_flight
+            counters = dict(self.counters)
+
+        def percentile(values, p):
+            return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 1) if values else 0.0
+
+        return dict(counters,
+                    workers=self.workers,
+                    max_queue=self.max_queue,
+                    in_flight=in_flight,
+                    queue_depth=max(0, in_flight - max(1, self.workers)),
+                    wait_ms_p50=percentile(waits, 0.5),
+                    wait_ms_p95=percentile(waits, 0.95),
+                    wait_ms_max=percentile(waits, 1.0),
+                    run_ms_avg=round(sum(runs) / len(runs) * 1000, 1) if runs else 0.0,
+                    warm_state=self.warm_state,
+                    warm_up_seconds=round(self.warm_up_seconds, 3) if self.warm_up_seconds is not None else None)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
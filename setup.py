@@ -18,6 +18,7 @@ def setup_system():
     try:
         db = Database()
         print("✅ Database initialized successfully")
+        db.seed_sample_data()
         
         # Test database connection
         faculty = db.verify_faculty('F001', 'faculty123')
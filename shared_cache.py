@@ -0,0 +1,275 @@
+# shared_cache.py - Cross-process cache and counters in a local SQLite file
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+_MISSING = object()
+
+
+class SQLiteCache:
+    """LRUCache-compatible store shared by every process on one host.
+
+    Entries live in ``table`` of a small WAL-mode SQLite file, so the
+    gunicorn workers see one cache and one set of rate-limit counters
+    without an external service. Counters are updated with an UPSERT
+    and read back in the same write transaction (no RETURNING, which
+    needs SQLite 3.35).
+    Expired rows are removed in bounded batches through an index on
+    ``expires_at``, every ``cleanup_every`` writes.
+
+    Keys that are not strings are stored by their ``repr``. Values are
+    pickled, except counters, which are stored as integers.
+    """
+
+    def __init__(self, path='shared_state.db', table='cache', default_ttl=300, cleanup_every=1000,
+                 cleanup_batch=1000, lease_ttl=10.0):
+        self.path = path
+        self.table = table
+        self.default_ttl = default_ttl
+        self.cleanup_every = cleanup_every
+        self.cleanup_batch = cleanup_batch
+        self.lease_ttl = lease_ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        with self._transaction() as conn:
+            conn.execute(f'''CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value,
+                expires_at REAL NOT NULL
+            )''')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_expires ON {table}(expires_at)')
+            conn.execute(f'''CREATE TABLE IF NOT EXISTS {table}_tags (
+                tag TEXT,
+                key TEXT,
+                PRIMARY KEY (tag, key)
+            ) WITHOUT ROWID''')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_tags_key ON {table}_tags(key)')
+            conn.execute(f'''CREATE TABLE IF NOT EXISTS {table}_generations (
+                tag TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            )''')
+
+    def _conn(self):
+        pid, conn = getattr(self._local, 'conn', (None, None))
+        if pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = OFF')  # a cache; losing it on power loss is fine
+            conn.execute('PRAGMA busy_timeout = 30000')
+            self._local.conn = (os.getpid(), conn)
+        return conn
+
+    class _Transaction:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+    def _transaction(self):
+        return self._Transaction(self._conn())
+
+    @staticmethod
+    def _key(key):
+        return key if isinstance(key, str) else repr(key)
+
+    @staticmethod
+    def _encode(value):
+        return value if type(value) is int else pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        return pickle.loads(value) if isinstance(value, bytes) else value
+
+    def _expires(self, ttl):
+        return time.time() + (self.default_ttl if ttl is None else ttl)
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes % self.cleanup_every == 0:
+            self.cleanup()
+
+    def _lookup(self, key):
+        row = self._conn().execute(f'SELECT value, expires_at FROM {self.table} WHERE key = ?',
+                                   (self._key(key),)).fetchone()
+        if row is None or row[1] <= time.time():
+            return _MISSING
+        return self._decode(row[0])
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def _store(self, conn, key, value, ttl, tags):
+        key = self._key(key)
+        conn.execute(f'INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)',
+                     (key, self._encode(value), self._expires(ttl)))
+        conn.execute(f'DELETE FROM {self.table}_tags WHERE key = ?', (key,))
+        conn.executemany(f'INSERT OR IGNORE INTO {self.table}_tags VALUES (?, ?)', [(tag, key) for tag in tags])
+
+    def set(self, key, value, ttl=None, tags=()):
+        with self._transaction() as conn:
+            self._store(conn, key, value, ttl, tuple(tags))
+        self._wrote()
+
+    def add(self, key, value, ttl=None, tags=()):
+        """Store ``value`` only if ``key`` is absent or expired; True if it was stored"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(f'SELECT expires_at FROM {self.table} WHERE key = ?', (self._key(key),)).fetchone()
+            if row is not None and row[0] > now:
+                return False
+            self._store(conn, key, value, ttl, tuple(tags))
+        self._wrote()
+        return True
+
+    def incr(self, key, amount=1, ttl=None):
+        """Atomically add ``amount`` to a counter, starting it with ``ttl`` if absent or expired"""
+        now = time.time()
+        key = self._key(key)
+        with self._transaction() as conn:
+            conn.execute(f'''
+                INSERT INTO {self.table} (key, value, expires_at) VALUES (:key, :amount, :expires)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = CASE WHEN expires_at <= :now THEN :amount ELSE value + :amount END,
+                    expires_at = CASE WHEN expires_at <= :now THEN :expires ELSE expires_at END
+            ''', {'key': key, 'amount': amount, 'expires': self._expires(ttl), 'now': now})
+            value = conn.execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()[0]
+        self._wrote()
+        return value
+
+    def delete(self, key):
+        key = self._key(key)
+        with self._transaction() as conn:
+            conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            conn.execute(f'DELETE FROM {self.table}_tags WHERE key = ?', (key,))
+
+    def _generations(self, conn, tags):
+        if not tags:
+            return []
+        rows = dict(conn.execute(f'SELECT tag, generation FROM {self.table}_generations WHERE tag IN '
+                                 f'({",".join("?" * len(tags))})', tags).fetchall())
+        return [rows.get(tag, 0) for tag in tags]
+
+    def invalidate(self, *tags):
+        """Drop every entry tagged with any of ``tags``, in every process"""
+        if not tags:
+            return
+        marks = ','.join('?' * len(tags))
+        with self._transaction() as conn:
+            conn.executemany(f'''INSERT INTO {self.table}_generations VALUES (?, 1)
+                                 ON CONFLICT (tag) DO UPDATE SET generation = generation + 1''',
+                             [(tag,) for tag in tags])
+            removed = conn.execute(f'''DELETE FROM {self.table} WHERE key IN
+                                       (SELECT key FROM {self.table}_tags WHERE tag IN ({marks}))''',
+                                   tags).rowcount
+            conn.execute(f'DELETE FROM {self.table}_tags WHERE tag IN ({marks})', tags)
+        with self._lock:
+            self.invalidations += removed
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute(f'''INSERT INTO {self.table}_generations
+                             SELECT DISTINCT tag, 1 FROM {self.table}_tags WHERE true
+                             ON CONFLICT (tag) DO UPDATE SET generation = generation + 1''')
+            conn.execute(f'DELETE FROM {self.table}')
+            conn.execute(f'DELETE FROM {self.table}_tags')
+
+    def cleanup(self):
+        """Delete up to ``cleanup_batch`` expired entries; returns how many went"""
+        with self._transaction() as conn:
+            keys = [(key,) for key, in conn.execute(
+                f'SELECT key FROM {self.table} WHERE expires_at <= ? LIMIT ?',
+                (time.time(), self.cleanup_batch))]
+            conn.executemany(f'DELETE FROM {self.table}_tags WHERE key = ?', keys)
+            conn.executemany(f'DELETE FROM {self.table} WHERE key = ?', keys)
+        with self._lock:
+            self.expirations += len(keys)
+        return len(keys)
+
+    def get_or_compute(self, key, compute, ttl=None, tags=(), negative_ttl=None):
+        """Cached value for ``key``, computed once per miss across all processes.
+
+        Within a process, concurrent callers share one Future. Across
+        processes, the first caller takes a lease entry and the others
+        poll for its result until the lease expires.
+        """
+        tags = tuple(tags)
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+        if not owner:
+            return pending.result()
+
+        try:
+            value = self._compute_shared(key, compute, ttl, tags, negative_ttl)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+        pending.set_result(value)
+        return value
+
+    def _compute_shared(self, key, compute, ttl, tags, negative_ttl):
+        lease = ('lease', self._key(key))
+        if not self.add(lease, os.getpid(), ttl=self.lease_ttl):
+            deadline = time.time() + self.lease_ttl
+            delay = 0.005
+            while time.time() < deadline:
+                time.sleep(delay)
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    return value
+                if self._lookup(lease) is _MISSING:
+                    break  # the other process gave up or invalidated; compute here
+                delay = min(delay * 2, 0.1)
+
+        try:
+            with self._transaction() as conn:
+                generations = self._generations(conn, tags)
+            value = compute()
+            with self._transaction() as conn:
+                if self._generations(conn, tags) == generations:
+                    self._store(conn, key, value,
+                                negative_ttl if value is None and negative_ttl is not None else ttl, tags)
+            self._wrote()
+            return value
+        finally:
+            self.delete(lease)
+
+    def stats(self):
+        entries = self._conn().execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'backend': 'sqlite', 'path': self.path, 'entries': entries,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                    'expirations': self.expirations, 'invalidations': self.invalidations,
+                    'computing': len(self._inflight)}
\ No newline at end of file
@@ -0,0 +1,124 @@
+# stream_tracker.py - Face tracking for continuous camera attendance
+
+
+def iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    if bottom <= top or right <= left:
+        return 0.0
+    inter = (bottom - top) * (right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+
+class Track:
+    """One face followed across frames"""
+
+    def __init__(self, track_id, box, frame):
+        self.id = track_id
+        self.box = box
+        self.user_id = None
+        self.confidence = 0.0
+        self.missed = 0
+        self.last_attempt = None
+        self.first_frame = frame
+
+    def to_dict(self):
+        top, right, bottom, left = self.box
+        return {'track_id': self.id,
+                'location': {'top': top, 'right': right, 'bottom': bottom, 'left': left},
+                'student_id': self.user_id,
+                'confidence': round(self.confidence, 2)}
+
+
+class FaceTracker:
+    """Per-session tracker that only runs encode-and-match when it has to.
+
+    Every frame is run through detection, and detections are associated
+    with existing tracks by box overlap. A face is encoded and matched
+    when its track is new, or when its identity is still below
+    ``confidence_threshold`` and ``recheck_every`` frames have passed
+    since the last attempt. Each student is reported in ``new_students``
+    once per session. ``roster`` and ``fallback`` scope matching as in
+    FaceRecognition.match_encodings.
+    """
+
+    def __init__(self, confidence_threshold=0.6, iou_threshold=0.3, max_missed=5, recheck_every=5,
+                 profile='fast', roster=None, fallback=True):
+        self.confidence_threshold = confidence_threshold
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.recheck_every = recheck_every
+        self.profile = profile
+        self.roster = roster
+        self.fallback = fallback
+        self.tracks = []
+        self.marked = set()
+        self.frames = 0
+        self.encoded = 0
+        self._next_id = 1
+
+    def update(self, boxes):
+        """Associate detections with tracks; returns tracks that need identifying"""
+        self.frames += 1
+        pairs = sorted(((iou(track.box, box), t, d)
+                        for t, track in enumerate(self.tracks)
+                        for d, box in enumerate(boxes)), reverse=True)
+        matched_tracks, matched_boxes = set(), set()
+        for overlap, t, d in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if t in matched_tracks or d in matched_boxes:
+                continue
+            matched_tracks.add(t)
+            matched_boxes.add(d)
+            self.tracks[t].box = boxes[d]
+            self.tracks[t].missed = 0
+
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        for d, box in enumerate(boxes):
+            if d not in matched_boxes:
+                self.tracks.append(Track(self._next_id, box, self.frames))
+                self._next_id += 1
+
+        return [track for track in self.tracks
+                if track.missed == 0 and track.confidence <= self.confidence_threshold
+                and (track.last_attempt is None or self.frames - track.last_attempt >= self.recheck_every)]
+
+    def identify(self, track, user_id, confidence):
+        track.last_attempt = self.frames
+        if confidence > track.confidence:
+            track.user_id = user_id if confidence > self.confidence_threshold else None
+            track.confidence = confidence
+
+    def process_frame(self, fr, image):
+        """Track faces in one BGR frame using FaceRecognition ``fr``"""
+        from detection import detect_faces, encode_faces
+        rgb_image, locations = detect_faces(image, self.profile)
+        pending = self.update(locations)
+        if pending:
+            encodings = encode_faces(rgb_image, [track.box for track in pending], self.profile)
+            self.encoded += len(encodings)
+            matches = fr.match_encodings(encodings, roster=self.roster, fallback=self.fallback)
+            for track, (user_id, confidence) in zip(pending, matches):
+                self.identify(track, user_id, confidence)
+
+        new_students = []
+        for track in self.tracks:
+            if track.user_id and track.user_id not in self.marked:
+                self.marked.add(track.user_id)
+                new_students.append(track.user_id)
+        return {
+            'tracks': [track.to_dict() for track in self.tracks if track.missed == 0],
+            'new_students': new_students,
+            'encoded': len(pending),
+        }
+
+    def stats(self):
+        return {'frames': self.frames, 'encoded_faces': self.encoded,
+                'active_tracks': len(self.tracks), 'students_marked': len(self.marked)}
\ No newline at end of file
@@ -53,8 +53,9 @@ document.getElementById('capture-btn').addEventListener('click', async function(
     // Draw current video frame to canvas
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
     
-    // Convert canvas image to base64
-    const imageData = canvas.toDataURL('image/jpeg');
+    // Capture the frame as a JPEG blob; the object URL is only used for the thumbnail
+    const frame = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.92));
+    const imageData = URL.createObjectURL(frame);
     
     // Store captured image
     capturedImages.push({
@@ -67,7 +68,7 @@ document.getElementById('capture-btn').addEventListener('click', async function(
     displayCapturedImage(imageData, currentImageIndex + 1);
     
     // Register face with the captured image
-    await registerFaceImage(imageData, currentImageIndex);
+    await registerFaceImage(frame, currentImageIndex);
     
     currentImageIndex++;
     updateUI();
@@ -86,22 +87,20 @@ document.getElementById('reset-btn').addEventListener('click', function() {
 });
 
 // Register a single face image
-async function registerFaceImage(imageData, imageIndex) {
+async function registerFaceImage(frame, imageIndex) {
     const btn = document.getElementById('capture-btn');
     const originalText = btn.innerHTML;
     btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Registering...';
     btn.disabled = true;
     
     try {
+        const formData = new FormData();
+        formData.append('image', frame, `face_${imageIndex}.jpg`);
+        formData.append('image_index', imageIndex);
+        
         const response = await fetch('/register_face', {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                image: imageData,
-                image_index: imageIndex
-            })
+            body: formData
         });
         
         const result = await response.json();
@@ -197,25 +196,75 @@ function showMessage(message, type) {
     }
 }
 
-// Load attendance records
-async function loadAttendanceRecords() {
+// Load attendance summary and the first page of records
+let attendanceCursor = null;
+
+async function loadAttendanceSummary() {
+    const summaryDiv = document.getElementById('attendance-summary');
+    if (!summaryDiv) return;
     try {
-        const response = await fetch('/get_attendance');
+        const response = await fetch('/get_attendance_summary');
+        const result = await response.json();
+        if (!result.success) return;
+        const summary = result.summary;
+        summaryDiv.innerHTML = `
+            <div class="summary-total">
+                <strong>${summary.percentage}%</strong> overall
+                &middot; ${summary.days_present} days present
+                &middot; ${summary.total_records} records
+            </div>
+            ${summary.subjects.map(s => `
+                <div class="summary-subject">
+                    <span>${s.subject}</span>
+                    <span>${s.attended}/${s.sessions} (${s.percentage}%)</span>
+                </div>
+            `).join('')}
+        `;
+    } catch (error) {
+        console.error('Error loading attendance summary:', error);
+    }
+}
+
+function renderAttendanceRecord(record) {
+    return `
+        <div class="attendance-item">
+            <div class="subject"><strong>${record.subject || 'General'}</strong></div>
+            <div class="date-time">
+                <span class="date">${record.date || 'N/A'}</span>
+                <span class="time">${record.time || 'N/A'}</span>
+            </div>
+            <div class="marked-by">Marked by: ${record.marked_by || 'Faculty'}</div>
+        </div>
+    `;
+}
+
+async function loadAttendanceRecords(append = false) {
+    const attendanceList = document.getElementById('attendance-list');
+    if (!append) {
+        attendanceCursor = null;
+        loadAttendanceSummary();
+    }
+    try {
+        const url = attendanceCursor ? `/get_attendance?cursor=${encodeURIComponent(attendanceCursor)}` : '/get_attendance';
+        const response = await fetch(url);
         const result = await response.json();
         
-        const attendanceList = document.getElementById('attendance-list');
+        const oldButton = document.getElementById('load-more-btn');
+        if (oldButton) oldButton.remove();
         
-        if (result.success && result.attendance && result.attendance.length > 0) {
-            attendanceList.innerHTML = result.attendance.map(record => `
-                <div class="attendance-item">
-                    <div class="subject"><strong>${record.subject || 'General'}</strong></div>
-                    <div class="date-time">
-                        <span class="date">${record.date || 'N/A'}</span>
-                        <span class="time">${record.time || 'N/A'}</span>
-                    </div>
-                    <div class="marked-by">Marked by: ${record.marked_by || 'Faculty'}</div>
-                </div>
-            `).join('');
+        if (result.success && result.attendance && (append || result.attendance.length > 0)) {
+            const html = result.attendance.map(renderAttendanceRecord).join('');
+            if (append) {
+                attendanceList.insertAdjacentHTML('beforeend', html);
+            } else {
+                attendanceList.innerHTML = html;
+            }
+            attendanceCursor = result.next_cursor;
+            if (attendanceCursor) {
+                attendanceList.insertAdjacentHTML('beforeend',
+                    '<button id="load-more-btn" class="btn btn-secondary">Load more</button>');
+                document.getElementById('load-more-btn').addEventListener('click', () => loadAttendanceRecords(true));
+            }
         } else {
             attendanceList.innerHTML = `
                 <div class="no-attendance">
@@ -244,7 +293,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Add refresh button functionality
     const refreshBtn = document.getElementById('refresh-btn');
     if (refreshBtn) {
-        refreshBtn.addEventListener('click', loadAttendanceRecords);
+        refreshBtn.addEventListener('click', () => loadAttendanceRecords());
     }
 });
 
@@ -50,7 +50,10 @@ async function loadRegistrationStatus() {
             updateUI();
             updateAngleCards();
             
-            if (result.registered_count > 0) {
+            if (result.inconsistent_images && result.inconsistent_images.length > 0) {
+                showFeedback(`Image(s) ${result.inconsistent_images.join(', ')} do not match your other images. ` +
+                             'Please delete your face data and register again.', 'warning');
+            } else if (result.registered_count > 0) {
                 showFeedback(`Loaded ${result.registered_count} previously registered images`, 'success');
             }
         }
@@ -76,7 +79,8 @@ document.getElementById('capture-btn').addEventListener('click', async function(
     canvas.height = video.videoHeight;
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
     
-    const imageData = canvas.toDataURL('image/jpeg');
+    const frame = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.92));
+    const imageData = URL.createObjectURL(frame);
     
     // Show loading state
     const btn = this;
@@ -85,13 +89,13 @@ document.getElementById('capture-btn').addEventListener('click', async function(
     btn.disabled = true;
     
     try {
+        const formData = new FormData();
+        formData.append('image', frame, `angle_${currentAngle}.jpg`);
+        formData.append('image_index', currentAngle);
+        
         const response = await fetch('/register_face', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                image: imageData,
-                image_index: currentAngle
-            })
+            body: formData
         });
         
         const result = await response.json();
@@ -268,25 +272,75 @@ function showMessage(message, type) {
     `;
 }
 
-// Load attendance records
-async function loadAttendanceRecords() {
+// Load attendance summary and the first page of records
+let attendanceCursor = null;
+
+async function loadAttendanceSummary() {
+    const summaryDiv = document.getElementById('attendance-summary');
+    if (!summaryDiv) return;
     try {
-        const response = await fetch('/get_attendance');
+        const response = await fetch('/get_attendance_summary');
+        const result = await response.json();
+        if (!result.success) return;
+        const summary = result.summary;
+        summaryDiv.innerHTML = `
+            <div class="summary-total">
+                <strong>${summary.percentage}%</strong> overall
+                &middot; ${summary.days_present} days present
+                &middot; ${summary.total_records} records
+            </div>
+            ${summary.subjects.map(s => `
+                <div class="summary-subject">
+                    <span>${s.subject}</span>
+                    <span>${s.attended}/${s.sessions} (${s.percentage}%)</span>
+                </div>
+            `).join('')}
+        `;
+    } catch (error) {
+        console.error('Error loading attendance summary:', error);
+    }
+}
+
+function renderAttendanceRecord(record) {
+    return `
+        <div class="attendance-item">
+            <div class="subject"><strong>${record.subject || 'General'}</strong></div>
+            <div class="date-time">
+                <span class="date">${record.date || 'N/A'}</span>
+                <span class="time">${record.time || 'N/A'}</span>
+            </div>
+            <div class="marked-by">Marked by: ${record.marked_by || 'Faculty'}</div>
+        </div>
+    `;
+}
+
+async function loadAttendanceRecords(append = false) {
+    const attendanceList = document.getElementById('attendance-list');
+    if (!append) {
+        attendanceCursor = null;
+        loadAttendanceSummary();
+    }
+    try {
+        const url = attendanceCursor ? `/get_attendance?cursor=${encodeURIComponent(attendanceCursor)}` : '/get_attendance';
+        const response = await fetch(url);
         const result = await response.json();
         
-        const attendanceList = document.getElementById('attendance-list');
+        const oldButton = document.getElementById('load-more-btn');
+        if (oldButton) oldButton.remove();
         
-        if (result.success && result.attendance && result.attendance.length > 0) {
-            attendanceList.innerHTML = result.attendance.map(record => `
-                <div class="attendance-item">
-                    <div class="subject"><strong>${record.subject || 'General'}</strong></div>
-                    <div class="date-time">
-                        <span class="date">${record.date || 'N/A'}</span>
-                        <span class="time">${record.time || 'N/A'}</span>
-                    </div>
-                    <div class="marked-by">Marked by: ${record.marked_by || 'Faculty'}</div>
-                </div>
-            `).join('');
+        if (result.success && result.attendance && (append || result.attendance.length > 0)) {
+            const html = result.attendance.map(renderAttendanceRecord).join('');
+            if (append) {
+                attendanceList.insertAdjacentHTML('beforeend', html);
+            } else {
+                attendanceList.innerHTML = html;
+            }
+            attendanceCursor = result.next_cursor;
+            if (attendanceCursor) {
+                attendanceList.insertAdjacentHTML('beforeend',
+                    '<button id="load-more-btn" class="btn btn-secondary">Load more</button>');
+                document.getElementById('load-more-btn').addEventListener('click', () => loadAttendanceRecords(true));
+            }
         } else {
             attendanceList.innerHTML = `
                 <div class="no-attendance">
@@ -306,7 +360,7 @@ document.addEventListener('DOMContentLoaded', function() {
     loadAttendanceRecords();
     
     // Refresh attendance button
-    document.getElementById('refresh-btn').addEventListener('click', loadAttendanceRecords);
+    document.getElementById('refresh-btn').addEventListener('click', () => loadAttendanceRecords());
 });
 
 // Cleanup
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# student_import.py - Bulk student import from CSV or JSON lines
+"""
+Imports students from CSV (header row: student_id,name,password,email;
+password and email are optional) or JSON lines with the same keys. Each
+row goes through the same validation as /add_student. Password hashes are
+computed in a process pool while the previous chunk is being inserted, and
+each chunk is inserted with executemany in one transaction. The pool is
+started on the first large import and kept for later ones; chunks of fewer
+than INLINE_ROWS rows are hashed in the calling process.
+
+Usage:
+    python student_import.py students.csv [--db attendance.db] [--format csv|jsonl]
+                             [--workers N] [--chunk-size 500]
+"""
+import argparse
+import atexit
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from validators import validate_student_id, validate_name, validate_email, sanitize_input
+
+DEFAULT_PASSWORD = 'student123'
+INLINE_ROWS = 16  # smaller chunks are not worth a round trip to the pool
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _hash_pool(workers):
+    """The shared hashing pool, started on first use (spawning re-imports the caller in every child)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown():
+    """Stop the hashing pool, if one was started"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+def detect_format(filename, content_type=''):
+    """'jsonl' for .jsonl/.ndjson files or JSON content types, else 'csv'"""
+    if (filename or '').lower().endswith(('.jsonl', '.ndjson', '.json')) or 'json' in (content_type or ''):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_rows(stream, fmt='csv'):
+    """Yield (line_number, row_dict, error) for each record of a text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, None, f'Invalid JSON: {e}'
+                continue
+            if not isinstance(row, dict):
+                yield number, None, 'Expected a JSON object'
+                continue
+            yield number, row, None
+    else:
+        raise ValueError(f"Unknown import format '{fmt}'")
+
+
+def clean_row(row, default_password=DEFAULT_PASSWORD):
+    """(student_id, name, password, email) for a valid row; ValueError otherwise"""
+    student_id = sanitize_input(str(row.get('student_id') or ''))
+    name = sanitize_input(str(row.get('name') or ''))
+    password = sanitize_input(str(row.get('password') or default_password))
+    email = sanitize_input(str(row.get('email') or ''))
+
+    if not student_id or not validate_student_id(student_id):
+        raise ValueError('Invalid Student ID format. Use 4-10 alphanumeric characters.')
+    if not name or not validate_name(name):
+        raise ValueError('Invalid name format. Use 2-50 letters and spaces only.')
+    if email and not validate_email(email):
+        raise ValueError('Invalid email format')
+    return student_id, name, password, email
+
+
+def _valid_chunks(rows, report, chunk_size, default_password):
+    """Group valid rows into chunks of (line, student) pairs, recording errors as it goes"""
+    seen = set()
+    chunk = []
+    for line, row, error in rows:
+        report['rows'] += 1
+        student_id = row.get('student_id') if row else None
+        if error is None:
+            try:
+                student = clean_row(row, default_password)
+                if student[0] in seen:
+                    raise ValueError('Duplicate Student ID in this import')
+                seen.add(student[0])
+                chunk.append((line, student))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            report['errors'].append({'line': line, 'student_id': student_id, 'message': error})
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(db, chunk, hashes, report):
+    students = [(student_id, name, password_hash, email)
+                for (_, (student_id, name, _, email)), password_hash in zip(chunk, hashes)]
+    existing = db.add_students_bulk(students)
+    report['imported'] += len(students) - len(existing)
+    report['errors'].extend({'line': line, 'student_id': student[0], 'message': 'Student ID already exists'}
+                            for line, student in chunk if student[0] in existing)
+
+
+def import_students(db, rows, workers=None, chunk_size=500, default_password=DEFAULT_PASSWORD):
+    """Validate, hash and insert ``rows`` (from read_rows); returns a report dict"""
+    started = time.perf_counter()
+    report = {'rows': 0, 'imported': 0, 'errors': []}
+    workers = workers or os.cpu_count() or 1
+    previous = None
+    for chunk in _valid_chunks(rows, report, chunk_size, default_password):
+        passwords = [student[2] for _, student in chunk]
+        if len(chunk) < INLINE_ROWS:
+            hashes = [generate_password_hash(password) for password in passwords]
+        else:
+            # Hash this chunk in the pool while the previous one is inserted
+            hashes = _hash_pool(workers).map(generate_password_hash, passwords,
+                                             chunksize=max(1, len(chunk) // (4 * workers)))
+        if previous is not None:
+            _insert(db, *previous, report)
+        previous = (chunk, hashes)
+    if previous is not None:
+        _insert(db, *previous, report)
+
+    elapsed = time.perf_counter() - started
+    report['errors'].sort(key=lambda error: error['line'])
+    report['failed'] = len(report['errors'])
+    report['seconds'] = round(elapsed, 3)
+    report['rows_per_sec'] = round(report['rows'] / elapsed, 1) if elapsed else 0.0
+    return report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Bulk import students from CSV or JSON lines')
+    parser.add_argument('file', help="input file, or '-' for stdin")
+    parser.add_argument('--db', default=None, help='database file (default: Config.DATABASE_PATH)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='input format (default: from the file name)')
+    parser.add_argument('--workers', type=int, default=0, help='hashing processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=500, help='rows per insert transaction')
+    args = parser.parse_args(argv[1:])
+
+    from config import Config
+    from database import Database
+    db = Database(args.db or Config.DATABASE_PATH)
+    fmt = args.format or detect_format(args.file)
+    stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='') if args.file == '-' \
+        else open(args.file, encoding='utf-8-sig', newline='')
+    with stream:
+        report = import_students(db, read_rows(stream, fmt), workers=args.workers, chunk_size=args.chunk_size)
+    db.close()
+
+    for error in report['errors']:
+        print(f"❌ Line {error['line']} ({error['student_id'] or '?'}): {error['message']}")
+    print(f"✅ Imported {report['imported']} of {report['rows']} rows in {report['seconds']}s "
+          f"({report['rows_per_sec']} rows/sec, {report['failed']} failed)")
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
\ No newline at end of file
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# summaries.py - Incrementally maintained attendance summary tables
+"""
+Summary tables behind /reports and /api/attendance_data. Triggers on the
+attendance table keep them up to date inside the same transaction as
+every insert and delete, so the report queries read a few rows per
+subject/day instead of aggregating the whole attendance table.
+
+attendance_subject_totals  subject -> records
+attendance_student_totals  student_id -> records (one row per student seen)
+attendance_daily           (date, subject) -> records, distinct students
+attendance_day_totals      date -> records, distinct students
+attendance_daily_student, attendance_day_student
+                           per-student record counts that let the
+                           distinct-student columns be maintained
+
+Usage:
+    python summaries.py rebuild [attendance.db]
+    python summaries.py check [attendance.db]
+"""
+import sys
+
+TABLES = (
+    '''CREATE TABLE IF NOT EXISTS attendance_subject_totals (
+        subject TEXT PRIMARY KEY,
+        records INTEGER NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS attendance_student_totals (
+        student_id TEXT PRIMARY KEY,
+        records INTEGER NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS attendance_daily (
+        date TEXT,
+        subject TEXT,
+        records INTEGER NOT NULL,
+        students INTEGER NOT NULL,
+        PRIMARY KEY (date, subject)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS attendance_daily_student (
+        date TEXT,
+        subject TEXT,
+        student_id TEXT,
+        records INTEGER NOT NULL,
+        PRIMARY KEY (date, subject, student_id)
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS attendance_day_totals (
+        date TEXT PRIMARY KEY,
+        records INTEGER NOT NULL,
+        students INTEGER NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS attendance_day_student (
+        date TEXT,
+        student_id TEXT,
+        records INTEGER NOT NULL,
+        PRIMARY KEY (date, student_id)
+    ) WITHOUT ROWID''',
+)
+
+# Trigger bodies, applied to the NEW or OLD row. attendance allows NULL
+# date/subject/student_id, which would never match in the WHERE clauses
+# (and cannot go into a WITHOUT ROWID key), so every key is IFNULL(..., '')
+_ADD = '''
+        INSERT OR IGNORE INTO attendance_subject_totals VALUES ({subject}, 0);
+        UPDATE attendance_subject_totals SET records = records + 1 WHERE subject = {subject};
+
+        INSERT OR IGNORE INTO attendance_student_totals VALUES ({student_id}, 0);
+        UPDATE attendance_student_totals SET records = records + 1 WHERE student_id = {student_id};
+
+        INSERT OR IGNORE INTO attendance_daily_student VALUES ({date}, {subject}, {student_id}, 0);
+        INSERT OR IGNORE INTO attendance_daily VALUES ({date}, {subject}, 0, 0);
+        UPDATE attendance_daily SET records = records + 1,
+            students = students + (SELECT records = 0 FROM attendance_daily_student
+                                   WHERE date = {date} AND subject = {subject}
+                                   AND student_id = {student_id})
+            WHERE date = {date} AND subject = {subject};
+        UPDATE attendance_daily_student SET records = records + 1
+            WHERE date = {date} AND subject = {subject} AND student_id = {student_id};
+
+        INSERT OR IGNORE INTO attendance_day_student VALUES ({date}, {student_id}, 0);
+        INSERT OR IGNORE INTO attendance_day_totals VALUES ({date}, 0, 0);
+        UPDATE attendance_day_totals SET records = records + 1,
+            students = students + (SELECT records = 0 FROM attendance_day_student
+                                   WHERE date = {date} AND student_id = {student_id})
+            WHERE date = {date};
+        UPDATE attendance_day_student SET records = records + 1
+            WHERE date = {date} AND student_id = {student_id};
+'''
+
+_REMOVE = '''
+        UPDATE attendance_subject_totals SET records = records - 1 WHERE subject = {subject};
+        DELETE FROM attendance_subject_totals WHERE subject = {subject} AND records <= 0;
+
+        UPDATE attendance_student_totals SET records = records - 1 WHERE student_id = {student_id};
+        DELETE FROM attendance_student_totals WHERE student_id = {student_id} AND records <= 0;
+
+        UPDATE attendance_daily_student SET records = records - 1
+            WHERE date = {date} AND subject = {subject} AND student_id = {student_id};
+        UPDATE attendance_daily SET records = records - 1,
+            students = students - (SELECT records = 0 FROM attendance_daily_student
+                                   WHERE date = {date} AND subject = {subject}
+                                   AND student_id = {student_id})
+            WHERE date = {date} AND subject = {subject};
+        DELETE FROM attendance_daily_student WHERE date = {date} AND subject = {subject}
+            AND student_id = {student_id} AND records <= 0;
+        DELETE FROM attendance_daily WHERE date = {date} AND subject = {subject} AND records <= 0;
+
+        UPDATE attendance_day_student SET records = records - 1
+            WHERE date = {date} AND student_id = {student_id};
+        UPDATE attendance_day_totals SET records = records - 1,
+            students = students - (SELECT records = 0 FROM attendance_day_student
+                                   WHERE date = {date} AND student_id = {student_id})
+            WHERE date = {date};
+        DELETE FROM attendance_day_student WHERE date = {date} AND student_id = {student_id}
+            AND records <= 0;
+        DELETE FROM attendance_day_totals WHERE date = {date} AND records <= 0;
+'''
+
+def _keys(row):
+    return {column: f"IFNULL({row}.{column}, '')" for column in ('date', 'subject', 'student_id')}
+
+
+TRIGGERS = (
+    'CREATE TRIGGER IF NOT EXISTS attendance_summary_insert AFTER INSERT ON attendance\n'
+    '    BEGIN' + _ADD.format(**_keys('NEW')) + '    END',
+    'CREATE TRIGGER IF NOT EXISTS attendance_summary_delete AFTER DELETE ON attendance\n'
+    '    BEGIN' + _REMOVE.format(**_keys('OLD')) + '    END',
+    'CREATE TRIGGER IF NOT EXISTS attendance_summary_update\n'
+    '    AFTER UPDATE OF student_id, subject, date ON attendance\n'
+    '    BEGIN' + _REMOVE.format(**_keys('OLD')) + _ADD.format(**_keys('NEW')) + '    END',
+)
+TRIGGER_NAMES = ('attendance_summary_insert', 'attendance_summary_delete', 'attendance_summary_update')
+
+# The summary key columns of attendance, as stored in the summary tables
+_DATE, _SUBJECT, _STUDENT = (f"IFNULL({column}, '')" for column in ('date', 'subject', 'student_id'))
+
+SUMMARY_TABLES = ('attendance_subject_totals', 'attendance_student_totals', 'attendance_daily',
+                  'attendance_daily_student', 'attendance_day_totals', 'attendance_day_student')
+
+
+def install(conn):
+    """Create the summary tables and triggers; backfill them if they are new"""
+    existing = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attendance_daily'")\
+        .fetchone()
+    for statement in TABLES + TRIGGERS:
+        conn.execute(statement)
+    if not existing:
+        rebuild(conn)
+
+
+def rebuild(conn):
+    """Recompute every summary table from the attendance table"""
+    for table in SUMMARY_TABLES:
+        conn.execute(f'DELETE FROM {table}')
+    conn.execute(f'''INSERT INTO attendance_subject_totals
+                     SELECT {_SUBJECT}, COUNT(*) FROM attendance GROUP BY 1''')
+    conn.execute(f'''INSERT INTO attendance_student_totals
+                     SELECT {_STUDENT}, COUNT(*) FROM attendance GROUP BY 1''')
+    conn.execute(f'''INSERT INTO attendance_daily_student
+                     SELECT {_DATE}, {_SUBJECT}, {_STUDENT}, COUNT(*) FROM attendance
+                     GROUP BY 1, 2, 3''')
+    conn.execute('''INSERT INTO attendance_daily
+                    SELECT date, subject, SUM(records), COUNT(*) FROM attendance_daily_student
+                    GROUP BY date, subject''')
+    conn.execute(f'''INSERT INTO attendance_day_student
+                     SELECT {_DATE}, {_STUDENT}, COUNT(*) FROM attendance GROUP BY 1, 2''')
+    conn.execute('''INSERT INTO attendance_day_totals
+                    SELECT date, SUM(records), COUNT(*) FROM attendance_day_student GROUP BY date''')
+
+
+def reinstall(conn):
+    """Replace the triggers with the current definitions and rebuild the tables"""
+    for name in TRIGGER_NAMES:
+        conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+    for statement in TABLES + TRIGGERS:
+        conn.execute(statement)
+    rebuild(conn)
+
+
+def check(conn):
+    """Tables whose contents differ from a fresh aggregation of attendance"""
+    expected = {
+        'attendance_subject_totals': f'SELECT {_SUBJECT}, COUNT(*) FROM attendance GROUP BY 1',
+        'attendance_daily': f'''SELECT {_DATE}, {_SUBJECT}, COUNT(*), COUNT(DISTINCT {_STUDENT})
+                                FROM attendance GROUP BY 1, 2''',
+        'attendance_day_totals': f'''SELECT {_DATE}, COUNT(*), COUNT(DISTINCT {_STUDENT})
+                                     FROM attendance GROUP BY 1''',
+        'attendance_student_totals': f'SELECT {_STUDENT}, COUNT(*) FROM attendance GROUP BY 1',
+    }
+    stale = []
+    for table, query in expected.items():
+        if sorted(conn.execute(f'SELECT * FROM {table}').fetchall()) != sorted(conn.execute(query).fetchall()):
+            stale.append(table)
+    return stale
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in ('rebuild', 'check'):
+        print(__doc__)
+        return 1
+    from db_pool import ConnectionPool
+    pool = ConnectionPool(argv[2] if len(argv) > 2 else 'attendance.db')
+    if argv[1] == 'rebuild':
+        with pool.writer() as conn:
+            reinstall(conn)
+        print("✅ Attendance summaries rebuilt")
+        return 0
+    with pool.reader() as conn:
+        stale = check(conn)
+    if stale:
+        print(f"❌ Out of date: {', '.join(stale)} (run: python summaries.py rebuild)")
+        return 1
+    print("✅ Attendance summaries match the attendance table")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
\ No newline at end of file
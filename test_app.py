@@ -0,0 +1,168 @@
+import base64
+import io
+import os
+import sqlite3
+
+import cv2
+import numpy as np
+import pytest
+
+from database import Database
+from frame_cache import FrameCache
+from shared_cache import SQLiteCache
+from test_frame_cache import two_people
+
+FRAME = cv2.imencode('.jpg', np.random.default_rng(0).integers(0, 255, (48, 64, 3), np.uint8))[1].tobytes()
+
+
+class FakeRecognition:
+    """Stands in for RecognitionService; S101 is in every frame"""
+
+    def __init__(self):
+        self.images = []
+        self.identities = {}  # image bytes -> student id (default S101)
+
+    def run(self, name, image_bytes, *args):
+        self.images.append(image_bytes)
+        return getattr(self, name)(*args)
+
+    def recognize(self, profile, roster, fallback):
+        return {'valid': True, 'user_id': self.identities.get(self.images[-1], 'S101'), 'confidence': 0.9}
+
+    def recognize_classroom(self, confidence_threshold, profile, roster, fallback):
+        location = {'top': 10, 'right': 60, 'bottom': 60, 'left': 10}
+        return {'valid': True, 'faces': [{'location': location, 'student_id': 'S101', 'confidence': 0.812},
+                                         {'location': location, 'student_id': None, 'confidence': 0.3}]}
+
+    def track_frame(self, tracker):
+        new_students = [] if 'S101' in tracker.marked else ['S101']
+        tracker.marked.update(new_students)
+        return {'valid': True, 'tracker': tracker, 'new_students': new_students, 'tracks': [], 'encoded': 1}
+
+
+def login(client, user_id, user_type):
+    with client.session_transaction() as sess:
+        sess['user_id'], sess['user_type'] = user_id, user_type
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    # app.py opens its database, logs and shared state in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('app'))
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def client(app_module, tmp_path, monkeypatch):
+    db = Database(str(tmp_path / 'app.db'))
+    db.add_students_bulk([('S101', 'Student One', 'x', ''), ('S102', 'Student Two', 'x', '')])
+    monkeypatch.setattr(app_module, 'db', db)
+    monkeypatch.setattr(app_module, 'recognition', FakeRecognition())
+    monkeypatch.setattr(app_module, 'frame_cache', FrameCache())
+    with app_module.app.test_client() as client:
+        login(client, 'F001', 'faculty')
+        yield client
+    db.close()
+
+
+def test_stream_retries_marks_after_failed_write(client, app_module, monkeypatch):
+    stream_id = client.post('/stream/start', json={'subject': 'Math'}).get_json()['stream_id']
+
+    def locked(*args):
+        raise sqlite3.OperationalError('database is locked')
+    monkeypatch.setattr(app_module.db, 'mark_attendance_bulk', locked)
+    response = client.post(f'/stream/{stream_id}/frame', data=FRAME, content_type='image/jpeg')
+    assert response.status_code == 200
+    assert response.get_json()['success'] is False
+
+    monkeypatch.delattr(app_module.db, 'mark_attendance_bulk')
+    body = client.post(f'/stream/{stream_id}/frame', data=FRAME, content_type='image/jpeg').get_json()
+    assert body['success'] and [student['student_id'] for student in body['marked']] == ['S101']
+    assert len(app_module.db.get_student_attendance('S101')) == 1
+
+def test_stream_state_is_shared_between_workers(client, app_module, monkeypatch):
+    stream_id = client.post('/stream/start', json={'subject': 'Math'}).get_json()['stream_id']
+    assert client.post(f'/stream/{stream_id}/frame', data=FRAME, content_type='image/jpeg').get_json()['marked']
+
+    # Another worker: its own connection to the shared state file, its own frame cache
+    path = app_module.streams._conn().execute('PRAGMA database_list').fetchone()[2]
+    monkeypatch.setattr(app_module, 'streams', SQLiteCache(path, table='streams'))
+    monkeypatch.setattr(app_module, 'frame_cache', FrameCache())
+    body = client.post(f'/stream/{stream_id}/frame', data=FRAME, content_type='image/jpeg').get_json()
+    assert body['success'] and body['marked'] == []
+
+    # A frame in progress on some worker holds the stream's lease
+    app_module.streams.add(f'lock:{stream_id}', 1)
+    assert client.post(f'/stream/{stream_id}/frame', data=two_people()[0], content_type='image/jpeg').get_json()['skipped']
+    app_module.streams.delete(f'lock:{stream_id}')
+
+    assert client.post(f'/stream/{stream_id}/stop').get_json()['stats']['students_marked'] == 1
+    assert client.post(f'/stream/{stream_id}/frame', data=FRAME, content_type='image/jpeg').status_code == 404
+
+def test_etag_answers_304_until_attendance_changes(client):
+    login(client, 'S101', 'student')
+    first = client.get('/get_attendance')
+    assert first.status_code == 200 and first.get_json()['attendance'] == []
+    etag = first.headers['ETag']
+    assert client.get('/get_attendance', headers={'If-None-Match': etag}).status_code == 304
+
+    login(client, 'F001', 'faculty')
+    assert client.post('/mark_attendance', json={'test_mode': True, 'student_id': 'S101',
+                                                 'subject': 'Math'}).get_json()['success']
+    login(client, 'S101', 'student')
+    changed = client.get('/get_attendance', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert [record['subject'] for record in changed.get_json()['attendance']] == ['Math']
+
+def test_image_upload_paths_reach_recognition_unchanged(client, app_module):
+    uploads = [
+        ('multipart', {'data': {'subject': 'Math', 'image': (io.BytesIO(FRAME), 'frame.jpg')},
+                       'content_type': 'multipart/form-data'}),
+        ('raw', {'query_string': {'subject': 'Physics'}, 'data': FRAME, 'content_type': 'image/jpeg'}),
+        ('base64', {'json': {'subject': 'Chemistry',
+                             'image': 'data:image/jpeg;base64,' + base64.b64encode(FRAME).decode()}}),
+    ]
+    for name, kwargs in uploads:
+        body = client.post('/mark_attendance', **kwargs).get_json()
+        assert body['success'] and body['student_id'] == 'S101', name
+        assert app_module.recognition.images[-1] == FRAME, name
+    assert len(app_module.recognition.images) == 3
+
+
+def test_malformed_base64_is_invalid_image_data(client, app_module):
+    for image in ('data:image/jpeg;base64,abc', 42):
+        response = client.post('/mark_attendance', json={'subject': 'Math', 'image': image})
+        assert response.status_code == 400
+        assert response.get_json() == {'success': False, 'message': 'Invalid image data'}
+    assert app_module.recognition.images == []
+
+def test_classroom_mode_marks_every_recognized_face(client, app_module):
+    body = client.post('/mark_attendance', data=FRAME, content_type='image/jpeg',
+                       query_string={'mode': 'classroom', 'subject': 'Math'}).get_json()
+    assert body['success'] and body['marked_count'] == 1
+    assert [(face['student_id'], face['student_name'], face['confidence']) for face in body['faces']] == \
+        [('S101', 'Student One', 0.81), (None, None, 0.3)]
+    assert [record['subject'] for record in app_module.db.get_student_attendance('S101')] == ['Math']
+
+
+def test_next_student_in_the_same_spot_is_recognized_again(client, app_module):
+    a, b = two_people()
+    app_module.recognition.identities = {a: 'S101', b: 'S102'}
+    for image, student_id in ((a, 'S101'), (b, 'S102'), (b, 'S102')):
+        body = client.post('/mark_attendance', data=image, content_type='image/jpeg',
+                           query_string={'subject': 'Math'}).get_json()
+        assert body['student_id'] == student_id and 'cached' not in body
+    assert len(app_module.recognition.images) == 3
+
+
+def test_frames_that_recognized_nobody_are_reused(client, app_module):
+    app_module.recognition.identities = {FRAME: None}
+    for _ in range(2):
+        body = client.post('/mark_attendance', data=FRAME, content_type='image/jpeg').get_json()
+        assert body['success'] is False
+    assert body['cached'] and len(app_module.recognition.images) == 1
\ No newline at end of file
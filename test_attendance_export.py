@@ -0,0 +1,29 @@
+import csv
+import gzip
+import io
+import json
+
+from attendance_export import export_chunks
+from database import Database
+
+
+def test_export_streams_filtered_rows(tmp_path):
+    db = Database(str(tmp_path / 'export.db'))
+    db.seed_sample_data()
+    db.insert_attendance_rows([(f'S00{i % 4 + 1}', 'Chemistry' if i % 2 else 'Biology', f'2024-02-{i % 28 + 1:02d}',
+                                '09:00:00', 'F001') for i in range(100)])
+
+    batches = db.iter_attendance(date_from='2024-02-01', date_to='2024-02-10', subject='Chemistry', batch_size=7)
+    rows = list(csv.reader(io.StringIO(b''.join(export_chunks(batches, 'csv')).decode())))
+    assert rows[0][:4] == ['id', 'student_id', 'student_name', 'subject']
+    assert len(rows) == 1 + 20 and {row[3] for row in rows[1:]} == {'Chemistry'}
+    assert [row[4] for row in rows[1:]] == sorted(row[4] for row in rows[1:])
+
+    data = gzip.decompress(b''.join(export_chunks(db.iter_attendance(student_id='S002', date_to='2024-12-31', batch_size=10),
+                                                  'jsonl', gzip=True)))
+    records = [json.loads(line) for line in data.decode().splitlines()]
+    assert len(records) == 25 and records[0]['student_name'] == 'Tanmaya Puri'
+
+    empty = b''.join(export_chunks(db.iter_attendance(subject='None'), 'csv')).decode()
+    assert empty.strip() == 'id,student_id,student_name,subject,date,time,marked_by'
+    db.close()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'history.db'))
+    rows = [('S009', subject, f'2024-01-{day:02d}', f'09:{minute:02d}:00', 'F001')
+            for day in range(1, 11) for minute, subject in enumerate(['Chemistry', 'Physics'])]
+    rows += [('S010', 'Chemistry', f'2024-01-{day:02d}', '09:00:00', 'F001') for day in range(1, 21)]
+    db.insert_attendance_rows(rows)
+    yield db
+    db.close()
+
+
+def test_keyset_pages_cover_history_in_order(db):
+    seen, cursor = [], None
+    while True:
+        page = db.get_student_attendance_page('S009', limit=6, cursor=cursor)
+        seen += [(r['date'], r['time']) for r in page['records']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert len(seen) == 20 and seen == sorted(seen, reverse=True)
+
+    page = db.get_student_attendance_page('S009', subject='Physics', date_from='2024-01-03', date_to='2024-01-05')
+    assert [r['date'] for r in page['records']] == ['2024-01-05', '2024-01-04', '2024-01-03']
+    with pytest.raises(ValueError):
+        db.get_student_attendance_page('S009', cursor='not-a-cursor')
+
+    with db.read() as conn:
+        plan = conn.execute('''EXPLAIN QUERY PLAN SELECT id, subject, date, time, marked_by FROM attendance
+                               WHERE student_id = ? AND (date, time, id) < (?, ?, ?)
+                               ORDER BY date DESC, time DESC, id DESC LIMIT 51''',
+                            ('S009', '2024-01-05', '09:00:00', 1)).fetchall()
+    assert 'COVERING INDEX idx_attendance_student_history' in str(plan)
+    assert 'TEMP B-TREE' not in str(plan)
+
+
+def test_summary_percentages(db):
+    summary = db.get_student_attendance_summary('S009')
+    maths = next(s for s in summary['subjects'] if s['subject'] == 'Chemistry')
+    assert (maths['attended'], maths['sessions'], maths['percentage']) == (10, 20, 50.0)
+    assert summary['days_present'] == 10 and summary['total_records'] == 20
+
+    db.mark_attendance('S009', 'Chemistry', 'F001')
+    assert db.get_student_attendance_summary('S009')['total_records'] == 21
\ No newline at end of file
@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+
+import pytest
+
+from attendance_writer import AttendanceWriter
+from database import Database
+from db_writer import WriterServer
+
+
+def count_rows(db, subject):
+    with db.read() as conn:
+        return conn.execute('SELECT COUNT(*) FROM attendance WHERE subject = ?', (subject,)).fetchone()[0]
+
+
+def test_concurrent_marks_are_grouped_into_few_commits(tmp_path):
+    db = Database(str(tmp_path / 'writer.db'))
+    writer = db.start_group_commit(max_batch=50, max_delay=0.05)
+    threads = [threading.Thread(target=db.mark_attendance, args=(f'S{i:03d}', 'Load', 'F001'))
+               for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every caller returned, so every row is already committed
+    assert count_rows(db, 'Load') == 40
+    assert writer.stats()['rows'] == 40
+    assert writer.stats()['batches'] < 40
+    db.close()
+
+
+def test_failed_batch_reaches_every_caller():
+    class BrokenDatabase:
+        def insert_attendance_rows(self, rows, durable=False):
+            raise Exception('Database error: disk full')
+
+    writer = AttendanceWriter(BrokenDatabase(), max_delay=0.01)
+    futures = [writer.submit([('S001', 'Math', '2024-01-01', '09:00:00', 'F001')]) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(Exception, match='disk full'):
+            future.result(timeout=5)
+    writer.close()
+
+def test_marks_forwarded_to_writer_process(tmp_path):
+    address = str(tmp_path / 'writer.sock')
+    server = WriterServer(Database(str(tmp_path / 'server.db')), address, b'key', max_delay=0.01)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    while not os.path.exists(address):
+        time.sleep(0.01)
+
+    client = Database(str(tmp_path / 'server.db'))
+    client.use_writer_process(address, b'key')
+    assert client.mark_attendance_bulk(['S001', 'S002'], 'Remote', 'F001') == 2
+    assert count_rows(client, 'Remote') == 2
+    assert client.attendance_writer.stats()['rows'] == 2
+    client.close()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+
+import batch_enroll
+from database import Database
+from encoding_store import EncodingStore
+
+
+@pytest.fixture
+def setup(tmp_path):
+    db = Database(str(tmp_path / 'enroll.db'))
+    db.add_students_bulk([('S101', 'Student One', 'x', ''), ('S102', 'Student Two', 'x', '')])
+    blank = cv2.imencode('.jpg', np.zeros((64, 64, 3), np.uint8))[1].tobytes()
+    for student_id, count in (('S101', 3), ('S102', 2), ('S999', 1)):
+        (tmp_path / 'photos' / student_id).mkdir(parents=True)
+        for i in range(count):
+            (tmp_path / 'photos' / student_id / f'{i}.jpg').write_bytes(blank)
+    (tmp_path / 'photos' / 'S102' / 'notes.txt').write_text('not an image')
+    yield db, EncodingStore(str(tmp_path / 'faces')), tmp_path / 'photos'
+    db.close()
+
+
+def test_find_images_caps_per_student(setup):
+    _, _, photos = setup
+    found = [(student_id, index) for student_id, index, _ in batch_enroll.find_images(str(photos), max_images=2)]
+    assert found == [('S101', 0), ('S101', 1), ('S102', 0), ('S102', 1), ('S999', 0)]
+
+
+def test_enroll_writes_store_and_flags_students(setup, monkeypatch):
+    db, store, photos = setup
+    rng = np.random.default_rng(0)
+    same, other = [(None, 0.05 + rng.normal(0, 0.01, 128)) for _ in range(2)], (None, np.full(128, -0.05))
+    outcomes = {'S101': same + [other],
+                'S102': [('no face', None), ('2 faces', None)]}
+    monkeypatch.setattr(batch_enroll, 'encode_image',
+                        lambda path, profile: outcomes[path.split('/')[-2]].pop(0))
+
+    report = batch_enroll.enroll_directory(db, store, str(photos), workers=0)
+    assert (report['images'], report['encoded'], report['students'], report['failed']) == (6, 3, 1, 3)
+    assert [error['message'] for error in report['errors']] == ['no face', '2 faces', 'unknown student']
+    assert [image['path'].split('/')[-1] for image in report['inconsistent']] == ['2.jpg']
+
+    store.open()
+    assert sorted(store.entries) == ['S101_0', 'S101_1', 'S101_2']
+    registered = {row[0]: row[4] for row in db.get_all_students()}
+    assert registered['S101'] and not registered['S102']
+
+
+def test_pool_reports_images_without_faces(setup):
+    db, store, photos = setup
+    report = batch_enroll.enroll_directory(db, store, str(photos), workers=1, max_images=1)
+    assert report['encoded'] == 0
+    assert [error['message'] for error in report['errors']] == ['no face', 'no face', 'unknown student']
+
+def test_enroll_migrates_legacy_pickle_first(setup, monkeypatch):
+    db, store, photos = setup
+    legacy = {'S050_0': {'encoding': np.full(128, 0.1), 'name': 'Enrolled Before', 'user_id': 'S050', 'timestamp': None}}
+    with open(store.base_path + '.pkl', 'wb') as f:
+        pickle.dump(legacy, f)
+    monkeypatch.setattr(batch_enroll, 'encode_image', lambda path, profile: (None, np.full(128, 0.05)))
+
+    batch_enroll.enroll_directory(db, store, str(photos), workers=0, max_images=1)
+    reader = EncodingStore(store.base_path)
+    reader.open()
+    assert sorted(reader.entries) == ['S050_0', 'S101_0', 'S102_0']
+    assert reader.entries['S050_0']['name'] == 'Enrolled Before'
+    assert np.allclose(reader.matrix()[reader.entries['S050_0']['row']], 0.1)
\ No newline at end of file
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from cache import LRUCache
+from database import Database
+
+
+def test_lru_eviction_ttl_and_tags():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1, tags=['x'])
+    cache.set('b', None, tags=['y'])
+    assert cache.get('a') == 1          # 'a' is now most recently used
+    cache.set('c', 3, ttl=0.05, tags=['x'])
+    assert cache.get('b', 'missing') == 'missing'
+    assert cache.stats()['evictions'] == 1
+
+    cache.invalidate('x')
+    assert cache.get('a') is None and cache.get('c') is None
+
+    cache.set('d', 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('d', 'expired') == 'expired'
+
+
+def test_concurrent_misses_compute_once_and_none_is_cached():
+    cache = LRUCache()
+    calls = []
+
+    def slow_lookup():
+        calls.append(1)
+        time.sleep(0.05)
+        return None
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', slow_lookup)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [None] * 10
+    assert cache.get_or_compute('k', slow_lookup) is None
+    assert len(calls) == 1
+
+
+def test_value_invalidated_while_computing_is_not_stored():
+    cache = LRUCache()
+
+    def compute():
+        cache.invalidate('reports')  # a write lands mid-computation
+        return 'stale'
+
+    assert cache.get_or_compute('summary', compute, tags=['reports']) == 'stale'
+    assert cache.get('summary') is None
+
+
+def test_marks_invalidate_cached_reads(tmp_path):
+    db = Database(str(tmp_path / 'cache.db'))
+    before = len(db.get_student_attendance('S004'))
+    total = db.get_report_summary()['total_records']
+    assert db.get_student_name('S999') is None
+
+    db.mark_attendance('S004', 'Physics', 'F001')
+    db.add_student('S999', 'New Student')
+    assert len(db.get_student_attendance('S004')) == before + 1
+    assert db.get_report_summary()['total_records'] == total + 1
+    assert db.get_student_name('S999') == 'New Student'
+    db.close()
+
+
+def test_writes_bump_data_versions(tmp_path):
+    db = Database(str(tmp_path / 'versions.db'))
+    entities = ['attendance', 'subject:Physics', 'subject:Chemistry', 'student:S004', 'student:S001']
+    before = db.data_versions(*entities)
+    assert db.data_versions(*entities) == before
+
+    db.mark_attendance('S004', 'Physics', 'F001')
+    after = db.data_versions(*entities)
+    assert [a != b for a, b in zip(after, before)] == [True, True, False, True, False]
+
+    # Versions live in SQLite: another process sees them, and its writes
+    other = Database(db.db_name)
+    assert other.data_versions(*entities) == after
+    other.set_faces_registered(['S004'])
+    other.add_student('S001', 'Student One')
+    assert [a != b for a, b in zip(db.data_versions(*entities, 'faces:S004'), after + [0])] == \
+        [False, False, False, False, True, True]
+    other.close()
+    db.close()
+
+def test_reads_follow_writes_made_by_another_process(tmp_path):
+    # Two workers with per-process 'memory' caches on one database file
+    path = str(tmp_path / 'workers.db')
+    first, second = Database(path, cache=LRUCache()), Database(path, cache=LRUCache())
+    second.add_student('S004', 'Student Four')
+    assert first.get_student_attendance('S004') == []
+    assert first.get_student_attendance_page('S004')['records'] == []
+    total = first.get_report_summary()['total_records']
+
+    second.mark_attendance('S004', 'Physics', 'F001')
+    assert [record['subject'] for record in first.get_student_attendance('S004')] == ['Physics']
+    assert len(first.get_student_attendance_page('S004')['records']) == 1
+    assert first.get_report_summary()['total_records'] == total + 1
+    first.close()
+    second.close()
\ No newline at end of file
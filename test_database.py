@@ -3,6 +3,7 @@ from database import Database
 def test_database():
     try:
         db = Database('test.db')
+        db.seed_sample_data()
         print("✅ Database class created successfully")
         
         # Test attendance retrieval
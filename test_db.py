@@ -4,6 +4,7 @@ from database import Database
 def test_database():
     try:
         db = Database('test_attendance.db')
+        db.seed_sample_data()
         print("✅ Database initialized successfully")
         
         # Test faculty login
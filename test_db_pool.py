@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from db_pool import ConnectionPool
+
+
+def make_pool(tmp_path, readers=2):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), readers=readers)
+    with pool.writer() as conn:
+        conn.execute('CREATE TABLE t (x INTEGER)')
+    return pool
+
+
+def test_connections_are_reused_and_configured(tmp_path):
+    pool = make_pool(tmp_path)
+    with pool.reader() as first:
+        assert first.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        with pool.reader() as second:
+            assert second is not first
+    with pool.reader() as again:
+        assert again is first or again is second
+    assert pool._opened == 2
+    pool.close()
+
+
+def test_writer_commits_or_rolls_back(tmp_path):
+    pool = make_pool(tmp_path)
+    with pool.writer() as conn:
+        conn.execute('INSERT INTO t VALUES (1)')
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.writer() as conn:
+            conn.execute('INSERT INTO t VALUES (2)')
+            raise sqlite3.IntegrityError('boom')
+    with pool.reader() as conn:
+        assert conn.execute('SELECT x FROM t').fetchall() == [(1,)]
+    pool.close()
+
+
+def test_memory_database_shares_one_connection():
+    pool = ConnectionPool(':memory:')
+    with pool.writer() as conn:
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.execute('INSERT INTO t VALUES (1)')
+    with pool.reader() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    pool.close()
+
+def test_writer_backs_off_until_the_lock_frees_or_the_deadline(tmp_path):
+    pool = make_pool(tmp_path)
+    pool.scheduler.deadline = 0.2
+    other = sqlite3.connect(str(tmp_path / 'pool.db'), isolation_level=None, check_same_thread=False)
+
+    other.execute('BEGIN IMMEDIATE')
+    with pytest.raises(sqlite3.OperationalError, match='locked'):
+        with pool.writer() as conn:
+            conn.execute('INSERT INTO t VALUES (1)')
+    assert pool.scheduler.stats()['timeouts'] == 1
+
+    threading.Timer(0.05, other.execute, args=('COMMIT',)).start()
+    started = time.monotonic()
+    with pool.writer() as conn:
+        conn.execute('INSERT INTO t VALUES (2)')
+    assert time.monotonic() - started < 0.2
+    stats = pool.scheduler.stats()
+    assert stats['contended'] == 2 and stats['lock_wait_ms_max'] >= 50
+    other.close()
+    pool.close()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import multiprocessing
+import pickle
+import time
+
+import numpy as np
+from encoding_store import EncodingStore, migrate_pickle
+from gallery import FaceGallery
+
+
+def _encoding(seed):
+    return np.random.default_rng(seed).normal(0, 0.1, 128).astype(np.float32)
+
+
+def _gallery(store):
+    gallery = FaceGallery()
+    gallery.attach(store.matrix())
+    for record in store.entries.values():
+        gallery.add_row(record['row'], record['key'], record['user_id'])
+    return gallery
+
+
+def test_append_tombstone_and_compact(tmp_path):
+    base = str(tmp_path / 'faces')
+    writer = EncodingStore(base)
+    writer.open()
+    writer.append_many([('S001_0', 'S001', 'Ann', _encoding(0)),
+                        ('S002_0', 'S002', 'Bob', _encoding(1))])
+
+    reader = EncodingStore(base)
+    reader.open()
+    gallery = _gallery(reader)
+    assert isinstance(reader.matrix(), np.memmap)
+    assert gallery.best_match(_encoding(1))[0] == 'S002'
+
+    writer.append('S001_0', 'S001', 'Ann', _encoding(2))
+    writer.read_changes()
+    writer.remove(['S002_0'])
+    assert reader.changed() == 'append'
+    records = reader.read_changes()
+    gallery.attach(reader.matrix())
+    for record in records:
+        if 'del' in record:
+            gallery.remove(record['del'])
+        else:
+            gallery.add_row(record['row'], record['key'], record['user_id'])
+    assert len(gallery) == 1
+    assert gallery.best_match(_encoding(2))[1] < 1e-3
+    assert reader.dead_rows == 2
+
+    writer.compact()
+    assert writer.row_count() == 1
+    assert reader.changed() == 'reopen'
+    reader.open()
+    assert list(reader.entries) == ['S001_0']
+    assert np.allclose(reader.matrix()[0], _encoding(2))
+
+
+def test_migrate_pickle(tmp_path):
+    legacy = {'S003_0': {'encoding': _encoding(3).astype(np.float64), 'name': 'Cy',
+                         'user_id': 'S003', 'timestamp': None}}
+    with open(tmp_path / 'face_encodings.pkl', 'wb') as f:
+        pickle.dump(legacy, f)
+    migrate_pickle(str(tmp_path / 'face_encodings.pkl'), str(tmp_path / 'faces'))
+
+    store = EncodingStore(str(tmp_path / 'faces'))
+    store.open()
+    assert store.entries['S003_0']['name'] == 'Cy'
+    assert np.allclose(store.matrix()[0], _encoding(3))
+
+
+def _slow_load(f, load=pickle.load):
+    time.sleep(0.05)  # widen the window between "no store yet" and creating it
+    return load(f)
+
+
+def _first_start(base_path, barrier, worker):
+    pickle.load = _slow_load  # in the forked worker only
+    store = EncodingStore(base_path)
+    barrier.wait()
+    store.open_migrating()
+    store.append(f'S10{worker}_0', f'S10{worker}', None, _encoding(worker))
+
+
+def test_concurrent_first_start_migrates_once(tmp_path):
+    legacy = {'S003_0': {'encoding': _encoding(3), 'name': 'Cy', 'user_id': 'S003', 'timestamp': None}}
+    with open(tmp_path / 'faces.pkl', 'wb') as f:
+        pickle.dump(legacy, f)
+    ctx = multiprocessing.get_context('fork')
+    barrier = ctx.Barrier(4)
+    workers = [ctx.Process(target=_first_start, args=(str(tmp_path / 'faces'), barrier, i)) for i in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    store = EncodingStore(str(tmp_path / 'faces'))
+    store.open()
+    assert sorted(store.entries) == ['S003_0', 'S100_0', 'S101_0', 'S102_0', 'S103_0']
+    assert store.row_count() == 5 and store.dead_rows == 0
\ No newline at end of file
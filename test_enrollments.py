@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from database import Database
+from gallery import FaceGallery
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'enrollments.db'))
+    db.add_students_bulk([(f'S{i:03d}', f'Student {i}', 'x', '') for i in range(1, 6)])
+    yield db
+    db.close()
+
+
+def _encoding(seed):
+    return np.random.default_rng(seed).normal(0, 0.1, 128)
+
+
+def test_roster_changes_bump_version(db):
+    version, = db.data_versions('roster:Physics')
+    assert db.enroll_students('Physics', ['S001', 'S002', 'S999'], section='A') == 2
+    assert db.enroll_students('Physics', ['S002', 'S003'], section='B') == 2
+    assert db.get_roster('Physics') == ['S001', 'S002', 'S003']
+    assert db.get_roster('Physics', 'A') == ['S001', 'S002']
+    assert db.data_versions('roster:Physics') != [version]
+
+    version, = db.data_versions('roster:Physics')
+    assert db.unenroll_students('Physics', ['S002'], section='A') == 1
+    assert db.get_roster('Physics', 'A') == ['S001'] and db.get_roster('Physics') == ['S001', 'S002', 'S003']
+    db.delete_student('S003')
+    assert db.get_roster('Physics') == ['S001', 'S002']
+    assert db.data_versions('roster:Physics') != [version]
+    assert db.get_enrollment_counts() == [('Physics', 'A', 1), ('Physics', 'B', 1)]
+
+
+def test_roster_rows_restrict_search_and_follow_changes():
+    gallery = FaceGallery()
+    for user in range(6):
+        for i in range(2):
+            gallery.add(f"S{user}_{i}", f"S{user}", _encoding(user) + i * 0.001)
+
+    rows = gallery.roster_rows(('Physics', 1), ['S0', 'S1'])
+    assert len(rows) == 4
+    assert gallery.roster_rows(('Physics', 1), ['S0', 'S1']) is rows
+    assert gallery.best_match(_encoding(4), rows)[0] in ('S0', 'S1')
+    assert gallery.best_match(_encoding(4))[0] == 'S4'
+    assert [user for user, _ in gallery.assign([_encoding(1), _encoding(4)], 0.4, rows)] == ['S1', None]
+
+    gallery.add('S1_2', 'S1', _encoding(1))
+    rows = gallery.roster_rows(('Physics', 1), ['S0', 'S1'])
+    assert len(rows) == 5
+    gallery.remove_user('S0')
+    assert len(gallery.roster_rows(('Physics', 1), ['S0', 'S1'])) == 3
+    assert len(gallery.roster_rows(('Physics', 2), [])) == 0
+
+
+def test_match_encodings_falls_back_to_campus(tmp_path, monkeypatch):
+    from my_face_utils import FaceRecognition
+    monkeypatch.chdir(tmp_path)
+    fr = FaceRecognition(str(tmp_path / 'faces'))
+    for user in range(4):
+        fr.store.append(f"S{user}_0", f"S{user}", f"Student {user}", _encoding(user))
+    roster = (('Physics', None, 1), ('S0', 'S1'))
+    probes = [_encoding(0), _encoding(3)]
+
+    assert [user for user, _ in fr.match_encodings(probes, roster=roster)] == ['S0', 'S3']
+    assert [user for user, _ in fr.match_encodings(probes, roster=roster, fallback=False)] == ['S0', None]
+
+def test_campus_fallback_skips_students_already_assigned(tmp_path, monkeypatch):
+    from my_face_utils import FaceRecognition
+    monkeypatch.chdir(tmp_path)
+    fr = FaceRecognition(str(tmp_path / 'faces'))
+    offset = np.zeros(128)
+    offset[0] = 0.3
+    fr.store.append('S0_0', 'S0', 'On roster', _encoding(0))
+    fr.store.append('S1_0', 'S1', 'Look-alike', _encoding(0) + offset)
+    fr.store.append('S2_0', 'S2', 'Stranger', _encoding(2))
+    roster = (('Physics', None, 1), ('S0',))
+
+    # The second face is nearer S0, who is taken by the first, but still a match for S1
+    probes = [_encoding(0), _encoding(0) + offset * 0.45]
+    assert [user for user, _ in fr.match_encodings(probes, roster=roster)] == ['S0', 'S1']
+    assert [user for user, _ in fr.match_encodings(probes)] == ['S0', 'S1']
\ No newline at end of file
@@ -0,0 +1,74 @@
+import numpy as np
+from face_index import CentroidIndex, IVFIndex, kmeans, robust_centroid
+from gallery import FaceGallery
+
+
+def _faces(users, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(users, 128)).astype(np.float32)
+    centers *= 0.6 / np.linalg.norm(centers, axis=1, keepdims=True)
+    return centers, rng
+
+
+def test_kmeans_separates_clusters():
+    rng = np.random.default_rng(1)
+    points = np.concatenate([rng.normal(-5, 0.1, (50, 2)), rng.normal(5, 0.1, (50, 2))])
+    centroids = np.sort(kmeans(points, 2)[:, 0])
+    assert abs(centroids[0] + 5) < 0.5 and abs(centroids[1] - 5) < 0.5
+
+
+def test_ivf_matches_exact_and_tracks_changes():
+    centers, rng = _faces(400)
+    index = IVFIndex(nprobe=4, min_train=256)
+    gallery = FaceGallery(index=index)
+    for user, center in enumerate(centers):
+        for i in range(2):
+            gallery.add(f"{user}_{i}", user, center + rng.normal(0, 0.02, 128))
+
+    hits = sum(gallery.best_match(center)[0] == user for user, center in enumerate(centers[:100]))
+    assert index.is_trained
+    assert hits >= 95
+
+    gallery.remove_user(7)
+    assert gallery.best_match(centers[7])[0] != 7
+    gallery.add('7_new', 7, centers[7])
+    assert gallery.best_match(centers[7])[0] == 7
+
+    for user in range(300):
+        gallery.remove_user(user)
+    assert len(gallery) == 200
+    assert gallery.best_match(centers[350])[0] == 350
+
+
+def test_robust_centroid_ignores_outlier():
+    rng = np.random.default_rng(2)
+    center = np.full(128, 0.05, dtype=np.float32)
+    images = center + rng.normal(0, 0.01, (4, 128))
+    images[3] = -center
+    centroid, distances = robust_centroid(images)
+    assert np.linalg.norm(centroid - center) < 0.1 < np.linalg.norm(images.mean(axis=0) - center)
+    assert distances.argmax() == 3 and distances[3] > 0.45 > distances[:3].max()
+
+
+def test_centroid_index_matches_exact_and_tracks_changes():
+    centers, rng = _faces(400)
+    index = CentroidIndex(top_k=4, min_users=64)
+    gallery = FaceGallery(index=index)
+    for user, center in enumerate(centers):
+        for i in range(4):
+            gallery.add(f"{user}_{i}", user, center + rng.normal(0, 0.02, 128))
+
+    rows = index.candidates(centers[:1])
+    assert rows is not None and len(rows) == 16
+    hits = sum(gallery.best_match(center)[0] == user for user, center in enumerate(centers[:100]))
+    assert hits == 100
+
+    gallery.remove_user(7)
+    assert gallery.best_match(centers[7])[0] != 7
+    gallery.add('7_new', 7, centers[7])
+    assert gallery.best_match(centers[7])[0] == 7
+
+    for user in range(350):
+        gallery.remove_user(user)
+    assert index.candidates(centers[:1]) is None  # few users left: exact search
+    assert gallery.best_match(centers[380])[0] == 380
\ No newline at end of file
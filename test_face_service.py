@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from face_service import FaceService, FaceStackDisabled
+from recognition_service import RecognitionService
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeGallery:
+    def __len__(self):
+        return 3
+
+
+class FakeRecognizer:
+    gallery = FakeGallery()
+
+    def get_user_encodings_count(self, user_id):
+        return 2
+
+
+def test_loads_on_first_use(monkeypatch):
+    import my_face_utils
+    built = []
+    monkeypatch.setattr(my_face_utils, 'FaceRecognition', lambda path: built.append(path) or FakeRecognizer())
+    face = FaceService(store_path='faces')
+    assert not face.loaded and built == []
+    assert face.get_user_encodings_count('S001') == 2
+    assert face.loaded and built == ['faces']
+    face.get()
+    assert built == ['faces'] and face.status()['load_seconds'] is not None
+
+
+def test_disabled_never_loads():
+    face = FaceService(enabled=False)
+    with pytest.raises(FaceStackDisabled):
+        face.get_user_encodings_count('S001')
+    assert not face.loaded
+
+
+def test_inline_warm_up():
+    service = RecognitionService(workers=0, inline_fr=FakeRecognizer())
+    assert service.stats()['warm_state'] == 'cold'
+    assert service.warm_up() >= 0
+
+
+def test_web_only_import_skips_face_stack(tmp_path):
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import app; "
+            "print(sorted(m for m in ('numpy', 'cv2', 'face_recognition') if m in sys.modules))")
+    env = dict(os.environ, ENABLE_FACE_RECOGNITION='false')
+    output = subprocess.run([sys.executable, '-c', code, ROOT], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == '[]'
+
+def test_recognizer_import_defers_dlib(tmp_path):
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import my_face_utils; "
+            "print('face_recognition' in sys.modules)")
+    output = subprocess.run([sys.executable, '-c', code, ROOT], cwd=tmp_path,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == 'False'
\ No newline at end of file
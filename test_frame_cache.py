@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+from frame_cache import FrameCache, frame_hash, hamming
+
+
+def encode(image):
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def person(background, skin, hair, shirt):
+    """A crude head and shoulders in the middle of ``background``"""
+    image = background.copy()
+    cv2.rectangle(image, (230, 330), (410, 480), shirt, -1)
+    cv2.ellipse(image, (320, 220), (70, 90), 0, 0, 360, skin, -1)
+    cv2.ellipse(image, (320, 150), (75, 40), 0, 180, 360, hair, -1)
+    return image
+
+
+def two_people():
+    """Two different people framed the same way against the same background"""
+    rng = np.random.default_rng(1)
+    background = cv2.resize(rng.integers(90, 170, (6, 8, 3), dtype=np.uint8), (640, 480))
+    return (encode(person(background, (150, 180, 220), (30, 30, 30), (200, 60, 60))),
+            encode(person(background, (120, 150, 200), (60, 40, 20), (60, 160, 60))))
+
+
+def test_frame_hash_tolerates_noise_but_not_new_scenes():
+    rng = np.random.default_rng(0)
+    scene = cv2.resize(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8), (640, 480))
+    noisy = np.clip(scene.astype(np.int16) + rng.integers(-4, 5, scene.shape), 0, 255).astype(np.uint8)
+    other = cv2.resize(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8), (640, 480))
+
+    assert hamming(frame_hash(encode(scene)), frame_hash(encode(noisy))) <= 6
+    assert hamming(frame_hash(encode(scene)), frame_hash(encode(other))) > 6
+    assert frame_hash(b'not an image') is None
+
+
+def test_cache_is_per_session_and_context():
+    cache = FrameCache(threshold=2)
+    cache.put('F001', 'Math', 0b1011, {'student_id': 'S001'})
+
+    assert cache.get('F001', 'Math', 0b1001) == {'student_id': 'S001'}
+    assert cache.get('F001', 'Math', 0b0100) is None
+    assert cache.get('F001', 'Physics', 0b1011) is None
+    assert cache.get('F002', 'Math', 0b1011) is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 3
+
+    cache.ttl = 0
+    assert cache.get('F001', 'Math', 0b1011) is None
+
+
+def test_different_people_on_one_background_are_not_deduped():
+    a, b = two_people()
+    # Only a few bits apart, which is why results that marked someone are never cached
+    assert 1 < hamming(frame_hash(a), frame_hash(b)) <= 6
+    cache = FrameCache()
+    cache.put('F001', 'Math', frame_hash(a), {'success': False})
+    assert cache.get('F001', 'Math', frame_hash(b)) is None
\ No newline at end of file
@@ -0,0 +1,103 @@
+import numpy as np
+from gallery import FaceGallery
+
+
+def _encoding(seed):
+    return np.random.default_rng(seed).normal(0, 0.1, 128)
+
+
+def test_best_match_and_per_user():
+    gallery = FaceGallery(capacity=2)
+    for i in range(3):
+        gallery.add(f"S001_{i}", 'S001', _encoding(i))
+        gallery.add(f"S002_{i}", 'S002', _encoding(10 + i))
+
+    assert len(gallery) == 6
+    user_id, distance = gallery.best_match(_encoding(11))
+    assert user_id == 'S002'
+    assert distance < 1e-3
+
+    users, distances = gallery.best_per_user(_encoding(1))
+    per_user = dict(zip(users, distances))
+    assert per_user['S001'] < 1e-3
+    assert per_user['S002'] > 0.5
+    expected = np.linalg.norm(_encoding(10) - _encoding(1))
+    assert abs(gallery.distances(_encoding(1))[1] - expected) < 1e-4
+
+
+def test_remove_updates_in_place():
+    gallery = FaceGallery()
+    gallery.add('S001_0', 'S001', _encoding(0))
+    gallery.add('S002_0', 'S002', _encoding(1))
+    gallery.add('S002_0', 'S002', _encoding(2))
+    assert gallery.count('S002') == 1
+
+    assert gallery.remove_user('S001') == 1
+    assert gallery.count('S001') == 0
+    assert gallery.best_match(_encoding(0))[0] == 'S002'
+    assert gallery.user_ids == ['S002']
+
+    gallery.compact()
+    assert len(gallery) == 1
+    assert gallery.best_match(_encoding(2))[1] < 1e-3
+
+    gallery.remove('S002_0')
+    assert gallery.best_match(_encoding(2)) == (None, float('inf'))
+
+def test_assign_gives_each_user_one_face():
+    gallery = FaceGallery()
+    gallery.add('S001_0', 'S001', _encoding(0))
+    gallery.add('S002_0', 'S002', _encoding(1))
+
+    near_s001 = _encoding(0) + 0.001
+    nearer_s001 = _encoding(0)
+    stranger = _encoding(99)
+    results = gallery.assign([near_s001, _encoding(1), nearer_s001, stranger], max_distance=0.4)
+
+    assert [user_id for user_id, _ in results] == [None, 'S002', 'S001', None]
+    assert results[2][1] < 1e-3
+    assert results[3][1] > 0.4
+
+
+def test_outliers_flag_inconsistent_images():
+    gallery = FaceGallery()
+    base = _encoding(0)
+    for i in range(3):
+        gallery.add(f"S001_{i}", 'S001', base + np.random.default_rng(i).normal(0, 0.005, 128))
+        gallery.add(f"S002_{i}", 'S002', _encoding(10) + np.random.default_rng(i).normal(0, 0.005, 128))
+    gallery.add('S001_3', 'S001', _encoding(20))
+
+    assert [key for key, _, _ in gallery.outliers()] == ['S001_3']
+    assert gallery.outliers(user_id='S002') == []
+    gallery.remove('S001_3')
+    assert gallery.outliers() == []
+
+def test_concurrent_registration_and_search(tmp_path, monkeypatch):
+    import threading
+    from my_face_utils import FaceRecognition
+    monkeypatch.chdir(tmp_path)
+    fr = FaceRecognition(str(tmp_path / 'faces'))
+    rng = np.random.default_rng(0)
+    encodings = rng.normal(0, 0.1, (400, 128))
+    errors, done = [], threading.Event()
+
+    def search():
+        while not done.is_set():
+            try:
+                matches = fr.match_encodings(encodings[:8])
+                assert len(matches) == 8
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i, encoding in enumerate(encodings):
+        fr.store.append(f"S{i}_0", f"S{i}", f"Student {i}", encoding)
+        fr.refresh()
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [user for user, _ in fr.match_encodings(encodings[:3])] == ['S0', 'S1', 'S2']
\ No newline at end of file
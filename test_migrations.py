@@ -0,0 +1,72 @@
+import multiprocessing
+import sqlite3
+import time
+
+import migrations
+from database import Database
+
+WORKERS = 8
+
+
+def test_fresh_legacy_and_current_databases(tmp_path):
+    db = Database(str(tmp_path / 'fresh.db'))
+    with db.read() as conn:
+        assert migrations.schema_version(conn) == migrations.LATEST
+        assert conn.execute('SELECT COUNT(*) FROM students').fetchone()[0] == 0
+    assert db.seed_sample_data() == {'faculty': 1, 'students': 4, 'attendance': 4}
+    assert db.seed_sample_data() == {'faculty': 0, 'students': 0, 'attendance': 0}
+    db.add_student('S777', 'Kept Student')
+    db.close()
+
+    # Reopening an up-to-date database keeps the data and never takes the write lock
+    db = Database(str(tmp_path / 'fresh.db'))
+    assert db.get_student_name('S777') == 'Kept Student'
+    assert db.pool.scheduler.stats()['transactions'] == 0
+    db.close()
+
+    # A database from before schema_version keeps its rows and gains the new objects
+    legacy = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(legacy)
+    conn.execute('CREATE TABLE attendance (id INTEGER PRIMARY KEY AUTOINCREMENT, student_id TEXT, '
+                 'subject TEXT, date TEXT, time TEXT, marked_by TEXT)')
+    conn.execute('CREATE INDEX idx_attendance_student_id ON attendance(student_id)')
+    conn.execute("INSERT INTO attendance VALUES (NULL, 'S001', 'Math', '2024-01-01', '09:00:00', 'F001')")
+    conn.commit()
+    conn.close()
+    db = Database(legacy)
+    assert db.get_report_summary()['total_records'] == 1
+    with db.read() as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_attendance_student_history' in indexes and 'idx_attendance_student_id' not in indexes
+    db.close()
+
+
+def _boot(path, ready, results):
+    ready.wait()
+    start = time.perf_counter()
+    Database(path).close()
+    results.put(time.perf_counter() - start)
+
+
+def test_cold_start_of_many_workers(tmp_path):
+    path = str(tmp_path / 'workers.db')
+    db = Database(path)
+    db.seed_sample_data()
+    db.close()
+
+    ctx = multiprocessing.get_context('fork')
+    ready, results = ctx.Barrier(WORKERS), ctx.Queue()
+    workers = [ctx.Process(target=_boot, args=(path, ready, results)) for _ in range(WORKERS)]
+    for process in workers:
+        process.start()
+    boot_times = sorted(results.get(timeout=30) for _ in workers)
+    for process in workers:
+        process.join()
+    print(f"{WORKERS} workers: median {boot_times[WORKERS // 2] * 1000:.1f} ms, "
+          f"max {boot_times[-1] * 1000:.1f} ms")
+
+    # No password hashing or write lock on startup: a cold boot is a few milliseconds
+    assert boot_times[-1] < 0.5
+    db = Database(path)
+    assert db.verify_faculty('F001', 'faculty123') is not None
+    db.close()
\ No newline at end of file
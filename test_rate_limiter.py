@@ -0,0 +1,42 @@
+from cache import LRUCache
+from rate_limiter import RateLimiter
+
+
+def test_sliding_window_limits_and_retry_after():
+    limiter = RateLimiter(LRUCache(), {'/login': {'ip': (5, 60)}})
+    assert all(limiter.check('/login', {'ip': '10.0.0.1'}, now=100.0)[0] for _ in range(5))
+    allowed, retry_after = limiter.check('/login', {'ip': '10.0.0.1'}, now=110.0)
+    assert not allowed and retry_after == 10  # until the window starting at 120
+    assert limiter.check('/login', {'ip': '10.0.0.2'}, now=110.0)[0]
+
+    # Half way into the next window, half of the previous 5 still count
+    assert [limiter.check('/login', {'ip': '10.0.0.1'}, now=150.0)[0] for _ in range(3)] == [True, True, False]
+    assert limiter.check('/login', {'ip': '10.0.0.1'}, now=200.0)[0]
+    assert limiter.check('/other', {'ip': '10.0.0.1'}, now=200.0) == (True, 0)
+    assert limiter.stats() == {'allowed': 9, 'rejected': 2}
+
+
+def test_per_principal_limits_and_idle_eviction():
+    store = LRUCache(max_entries=100)
+    limiter = RateLimiter(store, {'/mark_attendance': {'user': (2, 60), 'ip': (3, 60)}})
+    principals = {'ip': '10.0.0.1', 'user': 'F001', 'camera': None}
+    assert limiter.check('/mark_attendance', principals, now=0.0)[0]
+    assert limiter.check('/mark_attendance', principals, now=1.0)[0]
+    assert not limiter.check('/mark_attendance', principals, now=2.0)[0]
+    assert limiter.check('/mark_attendance', dict(principals, user='F002'), now=3.0)[0]
+    assert not limiter.check('/mark_attendance', dict(principals, user='F003'), now=4.0)[0]
+
+    for i in range(1000):
+        limiter.check('/mark_attendance', {'ip': f'10.1.{i // 256}.{i % 256}'}, now=5.0)
+    assert store.stats()['entries'] <= 100
+
+def test_rejection_does_not_charge_other_principals():
+    limiter = RateLimiter(LRUCache(), {'/mark_attendance': {'user': (3, 60), 'ip': (1, 60)}})
+    assert limiter.check('/mark_attendance', {'user': 'F001', 'ip': '10.0.0.1'}, now=0.0)[0]
+    # The ip is throttled; F001's count must stay at 1
+    for i in range(5):
+        assert not limiter.check('/mark_attendance', {'user': 'F001', 'ip': '10.0.0.1'}, now=1.0 + i)[0]
+    assert limiter.check('/mark_attendance', {'user': 'F001', 'ip': '10.0.0.2'}, now=10.0)[0]
+    assert limiter.check('/mark_attendance', {'user': 'F001', 'ip': '10.0.0.3'}, now=11.0)[0]
+    assert not limiter.check('/mark_attendance', {'user': 'F001', 'ip': '10.0.0.4'}, now=12.0)[0]
+    assert limiter.stats() == {'allowed': 6, 'rejected': 6}
\ No newline at end of file
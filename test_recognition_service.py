@@ -0,0 +1,46 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+from recognition_service import RecognitionBusy, RecognitionService
+
+JPEG = cv2.imencode('.jpg', np.zeros((48, 64, 3), np.uint8))[1].tobytes()
+
+
+class FakeRecognizer:
+    def __init__(self, release=None):
+        self.release = release
+        self.started = threading.Event()
+
+    def recognize_face(self, img, profile, roster=None, fallback=True):
+        self.started.set()
+        if self.release:
+            self.release.wait(5)
+        return 'S001', 0.9
+
+
+def test_inline_job_and_invalid_image():
+    service = RecognitionService(workers=0, inline_fr=FakeRecognizer())
+    assert service.run('recognize', JPEG) == {'valid': True, 'user_id': 'S001', 'confidence': 0.9}
+    assert service.run('recognize', b'not a jpeg') == {'valid': False}
+    stats = service.stats()
+    assert stats['completed'] == 2 and stats['in_flight'] == 0
+
+
+def test_full_queue_is_rejected():
+    release = threading.Event()
+    fake = FakeRecognizer(release)
+    service = RecognitionService(workers=0, max_queue=0, inline_fr=fake)
+    worker = threading.Thread(target=service.run, args=('recognize', JPEG))
+    worker.start()
+    fake.started.wait(5)
+
+    with pytest.raises(RecognitionBusy) as busy:
+        service.run('recognize', JPEG)
+    assert busy.value.retry_after >= 1
+    assert service.stats()['rejected'] == 1
+
+    release.set()
+    worker.join()
+    assert service.run('recognize', JPEG)['user_id'] == 'S001'
\ No newline at end of file
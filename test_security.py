@@ -3,6 +3,7 @@ from werkzeug.security import check_password_hash
 
 def test_security():
     db = Database('test_secure.db')
+    db.seed_sample_data()
     
     # Test faculty login
     faculty = db.verify_faculty('F001', 'faculty123')
@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+import time
+
+from cache import LRUCache
+from shared_cache import SQLiteCache
+
+
+def test_shared_cache_values_tags_and_expiry(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    cache, other = SQLiteCache(path), SQLiteCache(path)
+    cache.set(('student', 'S001'), {'name': 'Alice'}, tags=['student:S001'])
+    cache.set('report', [1, 2], tags=['reports'])
+    assert other.get(('student', 'S001')) == {'name': 'Alice'}
+
+    other.invalidate('student:S001')
+    assert cache.get(('student', 'S001'), 'gone') == 'gone'
+    assert cache.get('report') == [1, 2]
+
+    assert cache.add('lock', 1, ttl=0.05) and not other.add('lock', 2)
+    cache.set('short', 'x', ttl=0.01)
+    time.sleep(0.06)
+    assert other.add('lock', 2)
+    assert cache.cleanup() == 1 and cache.get('short') is None
+
+    assert cache.get_or_compute('name', lambda: None, negative_ttl=30) is None
+    assert other.get('name', 'missing') is None
+
+
+def _count(path, n):
+    cache = SQLiteCache(path, table='rate_limits')
+    for _ in range(n):
+        cache.incr('hits', ttl=60)
+
+
+def test_incr_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    SQLiteCache(path, table='rate_limits')
+    ctx = multiprocessing.get_context('fork')
+    workers = [ctx.Process(target=_count, args=(path, 200)) for _ in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    assert SQLiteCache(path, table='rate_limits').incr('hits', 0) == 800
+
+    memory = LRUCache()
+    assert memory.incr('c', ttl=0.01) == 1 and memory.incr('c', 2) == 3
+    time.sleep(0.02)
+    assert memory.incr('c') == 1
\ No newline at end of file
@@ -0,0 +1,28 @@
+from stream_tracker import FaceTracker, iou
+
+
+def test_iou():
+    assert iou((0, 10, 10, 0), (0, 10, 10, 0)) == 1.0
+    assert iou((0, 10, 10, 0), (20, 30, 30, 20)) == 0.0
+    assert abs(iou((0, 10, 10, 0), (0, 15, 10, 5)) - 1 / 3) < 1e-9
+
+
+def test_tracks_only_need_identifying_when_new_or_unsure():
+    tracker = FaceTracker(recheck_every=3)
+    pending = tracker.update([(10, 60, 60, 10), (100, 200, 200, 100)])
+    assert len(pending) == 2
+    tracker.identify(pending[0], 'S001', 0.8)
+    tracker.identify(pending[1], None, 0.3)
+
+    # Boxes drift a little: same tracks, nothing to re-encode yet
+    assert tracker.update([(12, 62, 62, 12), (102, 202, 202, 102)]) == []
+    assert tracker.update([(14, 64, 64, 14), (104, 204, 204, 104)]) == []
+    recheck = tracker.update([(16, 66, 66, 16), (106, 206, 206, 106)])
+    assert [track.id for track in recheck] == [2]
+
+    # The identified face leaves; its track is dropped after max_missed frames
+    for _ in range(tracker.max_missed + 1):
+        tracker.update([(106, 206, 206, 106)])
+    assert [track.id for track in tracker.tracks] == [2]
+
+    assert [track.id for track in tracker.update([(300, 360, 360, 300), (106, 206, 206, 106)])] == [2, 3]
\ No newline at end of file
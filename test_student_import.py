@@ -0,0 +1,53 @@
+import io
+
+from werkzeug.security import check_password_hash
+
+from database import Database
+from student_import import import_students, read_rows
+
+
+def test_csv_import_reports_row_errors(tmp_path):
+    db = Database(str(tmp_path / 'import.db'))
+    db.seed_sample_data()
+    data = io.StringIO('Student_ID,Name,Password,Email\n'
+                       'S101,Asha Rao,secret1,asha@university.edu\n'
+                       's1,Bad Id,,\n'
+                       'S102,Ravi Kumar,,\n'
+                       'S001,Already There,,\n'
+                       'S102,Ravi Again,,\n'
+                       'S103,R2D2,,\n'
+                       'S104,Meera Iyer,,not-an-email\n')
+    report = import_students(db, read_rows(data, 'csv'), workers=2, chunk_size=2)
+    assert report['rows'] == 7 and report['imported'] == 2
+    assert [(e['line'], e['student_id']) for e in report['errors']] == \
+        [(3, 's1'), (5, 'S001'), (6, 'S102'), (7, 'S103'), (8, 'S104')]
+    assert report['errors'][1]['message'] == 'Student ID already exists'
+
+    assert db.verify_student('S101', 'secret1') is not None
+    assert check_password_hash(db.verify_student('S102', 'student123')[2], 'student123')
+    assert db.get_student_name('S102') == 'Ravi Kumar'
+    db.close()
+
+
+def test_jsonl_rows():
+    data = io.StringIO('{"student_id": "S201", "name": "Kiran Das"}\n\nnot json\n[1]\n')
+    rows = list(read_rows(data, 'jsonl'))
+    assert rows[0] == (1, {'student_id': 'S201', 'name': 'Kiran Das'}, None)
+    assert [(line, error is not None) for line, _, error in rows[1:]] == [(3, True), (4, True)]
+
+def test_pool_started_once_and_reused(tmp_path):
+    import student_import
+    db = Database(str(tmp_path / 'import.db'))
+    try:
+        for batch in range(2):
+            data = io.StringIO('student_id,name\n' + ''.join(f'S{batch}{i:02d},Student Name\n' for i in range(20)))
+            report = import_students(db, read_rows(data, 'csv'), workers=2)
+            assert report['imported'] == 20
+            if batch == 0:
+                pool = student_import._pool
+            assert pool is not None and student_import._pool is pool
+        assert db.verify_student('S119', 'student123') is not None
+    finally:
+        student_import.shutdown()
+        db.close()
+    assert student_import._pool is None
\ No newline at end of file
@@ -0,0 +1,63 @@
+import random
+
+import summaries
+from database import Database
+
+
+def test_summaries_follow_inserts_deletes_and_updates(tmp_path):
+    db = Database(str(tmp_path / 'summary.db'))
+    rng = random.Random(0)
+    rows = [(f'S{rng.randrange(20):03d}', rng.choice(['Math', 'Physics', 'Chemistry']),
+             f'2024-01-{rng.randrange(1, 6):02d}', '09:00:00', 'F001') for _ in range(500)]
+    db.insert_attendance_rows(rows)
+    with db.write() as conn:
+        conn.execute("DELETE FROM attendance WHERE id % 7 = 0")
+        conn.execute("UPDATE attendance SET subject = 'Biology' WHERE id % 11 = 0")
+        conn.execute("UPDATE attendance SET time = '10:00:00' WHERE id % 13 = 0")
+
+    with db.read() as conn:
+        assert summaries.check(conn) == []
+        total = conn.execute('SELECT COUNT(*) FROM attendance').fetchone()[0]
+        distinct = conn.execute('SELECT COUNT(DISTINCT student_id) FROM attendance').fetchone()[0]
+
+    report = db.get_report_summary()
+    assert report['total_records'] == total
+    assert report['total_students'] == distinct
+    db.close()
+
+
+def test_rebuild_backfills_existing_attendance(tmp_path):
+    db = Database(str(tmp_path / 'summary.db'))
+    db.seed_sample_data()
+    with db.write() as conn:
+        for table in summaries.SUMMARY_TABLES:
+            conn.execute(f'DELETE FROM {table}')
+    with db.read() as conn:
+        assert summaries.check(conn)
+
+    assert summaries.main(['summaries.py', 'rebuild', db.db_name]) == 0
+    with db.read() as conn:
+        assert summaries.check(conn) == []
+    db.close()
+
+def test_rows_with_null_keys(tmp_path):
+    db = Database(str(tmp_path / 'summary.db'))
+    db.insert_attendance_rows([('S001', None, '2024-01-01', '09:00:00', 'F001'),
+                               (None, 'Math', '2024-01-01', '09:00:00', 'F001'),
+                               ('S001', 'Math', None, '09:00:00', 'F001'),
+                               ('S001', 'Math', '2024-01-01', '09:00:00', 'F001')])
+    with db.write() as conn:
+        conn.execute("INSERT INTO attendance (student_id) VALUES (NULL)")
+        summaries.rebuild(conn)
+    with db.read() as conn:
+        assert summaries.check(conn) == []
+        assert conn.execute("SELECT records FROM attendance_subject_totals WHERE subject = ''").fetchone() == (2,)
+
+    with db.write() as conn:
+        conn.execute("DELETE FROM attendance WHERE subject IS NULL")
+        conn.execute("UPDATE attendance SET date = '2024-01-02' WHERE date IS NULL")
+    with db.read() as conn:
+        assert summaries.check(conn) == []
+    # Rows without a student are not a student
+    assert db.get_report_summary()['total_students'] == 1
+    db.close()
\ No newline at end of file
@@ -0,0 +1,23 @@
+# validators.py - Input validation shared by the web routes and the import CLI
+import re
+
+
+def validate_student_id(student_id):
+    """Validate student ID format"""
+    return bool(re.match(r'^[A-Z0-9]{4,10}$', student_id))
+
+def validate_name(name):
+    """Validate name format"""
+    return bool(re.match(r'^[a-zA-Z\s]{2,50}$', name)) and len(name.strip()) >= 2
+
+def validate_email(email):
+    """Validate email format"""
+    return bool(re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email))
+
+def sanitize_input(data):
+    """Sanitize input data"""
+    if isinstance(data, str):
+        data = re.sub(r'[<>]', '', data)
+        data = re.sub(r'javascript:', '', data, flags=re.IGNORECASE)
+        return data.strip()
+    return data
\ No newline at end of file